@@ -0,0 +1,146 @@
+"""Запросы в секунду и память на соединение: ASGI против WSGI.
+
+Каждый прогон идёт в отдельном процессе manage.py bench_asgi --worker:
+только так режим asgi получает blog.async_views (BLOGICUM_ASYNC_VIEWS=1
+читается при загрузке URL), а пиковая память процесса не смешивается
+между прогонами. Внутри процесса:
+    wsgi — concurrency потоков с django.test.Client, как у
+      многопоточного WSGI-сервера;
+    asgi — concurrency корутин с AsyncClient в одном цикле событий,
+      как у uvicorn или daphne с одним воркером.
+Оба клиента вызывают обработчик Django напрямую, без сокетов, — так
+сравнивается цена пути запроса внутри Django, а не сетевого стека.
+Запросы — анонимные чтения: лента, категория, пост, комментарии.
+"""
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+
+from .runner import Sample
+
+WSGI = 'wsgi'
+ASGI = 'asgi'
+MODES = (WSGI, ASGI)
+
+
+def make_urls(count, random_seed):
+    """Одинаковый для обоих режимов список URL анонимных чтений."""
+    rng = random.Random(random_seed)
+    sample = Sample(rng)
+    urls = []
+    for number in range(count):
+        kind = number % 4
+        if kind == 0:
+            cursor = sample.feed_cursor().get('cursor')
+            urls.append(f'/?cursor={cursor}' if cursor else '/')
+        elif kind == 1:
+            urls.append(f'/category/{rng.choice(sample.category_slugs)}/')
+        elif kind == 2:
+            urls.append(f'/posts/{sample.post().pk}/')
+        else:
+            urls.append(f'/posts/{sample.post().pk}/comments/')
+    return urls
+
+
+def _split(urls, concurrency):
+    return [urls[number::concurrency] for number in range(concurrency)]
+
+
+def _run_wsgi(urls, concurrency):
+    def connection_worker(chunk):
+        client = Client()
+        try:
+            return sum(client.get(url).status_code >= 400 for url in chunk)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        return sum(pool.map(connection_worker, _split(urls, concurrency)))
+
+
+def _run_asgi(urls, concurrency):
+    async def connection_worker(chunk):
+        client = AsyncClient()
+        errors = 0
+        for url in chunk:
+            response = await client.get(url)
+            errors += response.status_code >= 400
+        return errors
+
+    async def main():
+        return sum(await asyncio.gather(*(
+            connection_worker(chunk) for chunk in _split(urls, concurrency)
+        )))
+
+    return asyncio.run(main())
+
+
+def _max_rss_kib():
+    # В Linux ru_maxrss — в килобайтах.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_worker(mode, concurrency, requests, random_seed):
+    """Один прогон в текущем процессе; вызывает bench_asgi --worker."""
+    run_load = _run_asgi if mode == ASGI else _run_wsgi
+    urls = make_urls(requests, random_seed)
+    # Клиенты обращаются к хосту testserver; при DEBUG каждое
+    # соединение копило бы журнал запросов и искажало замер памяти.
+    with override_settings(
+        DEBUG=False,
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+    ):
+        # Прогрев всем списком: кэш лент, страницы БД и mmap заполнены
+        # заранее, и прирост памяти дальше — цена самих соединений.
+        run_load(urls, 1)
+        baseline = _max_rss_kib()
+        started = time.perf_counter()
+        errors = run_load(urls, concurrency)
+        elapsed = time.perf_counter() - started
+    peak = _max_rss_kib()
+    return {
+        'mode': mode,
+        'async_views': settings.ASYNC_VIEWS,
+        'concurrency': concurrency,
+        'requests': requests,
+        'errors': errors,
+        'seconds': elapsed,
+        'requests_per_second': requests / elapsed,
+        'peak_rss_kib': peak,
+        'rss_per_connection_kib': (peak - baseline) / concurrency,
+    }
+
+
+def run(modes=MODES, concurrency=(1, 16, 64), requests=2000,
+        random_seed=42):
+    """Прогнать режимы в отдельных процессах и собрать отчёт."""
+    manage_py = str(settings.BASE_DIR / 'manage.py')
+    results = []
+    for mode in modes:
+        for level in concurrency:
+            env = {
+                **os.environ,
+                'BLOGICUM_ASYNC_VIEWS': '1' if mode == ASGI else '0',
+            }
+            finished = subprocess.run(
+                [
+                    sys.executable, manage_py, 'bench_asgi',
+                    '--worker', mode,
+                    '--concurrency', str(level),
+                    '--requests', str(requests),
+                    '--seed', str(random_seed),
+                ],
+                env=env, capture_output=True, text=True, check=True,
+            )
+            results.append(json.loads(finished.stdout.splitlines()[-1]))
+    return results
@@ -0,0 +1,68 @@
+import argparse
+import json
+
+from django.core.management.base import BaseCommand
+
+from benchmarks import asgi_load
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает запросы в секунду и память на одновременное '
+        'соединение: асинхронные представления под ASGI и синхронные '
+        'под WSGI. Нужны данные из bench_seed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            nargs='+',
+            default=[1, 16, 64],
+            help='Числа одновременных соединений.',
+        )
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument(
+            '--modes',
+            nargs='+',
+            choices=asgi_load.MODES,
+            default=list(asgi_load.MODES),
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='Записать отчёт в JSON-файл.')
+        # Один прогон в этом процессе; выводит JSON для родителя.
+        parser.add_argument(
+            '--worker', choices=asgi_load.MODES, help=argparse.SUPPRESS
+        )
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            result = asgi_load.run_worker(
+                options['worker'],
+                options['concurrency'][0],
+                options['requests'],
+                options['seed'],
+            )
+            self.stdout.write(json.dumps(result))
+            return
+        report = asgi_load.run(
+            options['modes'],
+            concurrency=options['concurrency'],
+            requests=options['requests'],
+            random_seed=options['seed'],
+        )
+        self.stdout.write(
+            f'{"режим":<7}{"соединений":>11}{"запросов/с":>12}'
+            f'{"ошибок":>8}{"пик RSS МиБ":>13}{"КиБ/соед.":>11}'
+        )
+        for result in report:
+            self.stdout.write(
+                f'{result["mode"]:<7}{result["concurrency"]:>11}'
+                f'{result["requests_per_second"]:>12.0f}'
+                f'{result["errors"]:>8}'
+                f'{result["peak_rss_kib"] / 1024:>13.1f}'
+                f'{result["rss_per_connection_kib"]:>11.1f}'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2)
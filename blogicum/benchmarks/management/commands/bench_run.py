@@ -0,0 +1,109 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import runner
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет сценарии нагрузки по наполненной bench_seed базе и '
+        'сравнивает результат с сохранённым baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='Сколько замеряемых запросов на сценарий.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=10,
+            help='Сколько запросов сделать до замера (прогрев кешей).',
+        )
+        parser.add_argument(
+            '--only',
+            nargs='+',
+            choices=sorted(runner.SCENARIOS),
+            help='Прогнать только перечисленные сценарии.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Зерно выбора постов, категорий и профилей.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Записать отчёт в JSON-файл.',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON прошлого прогона для поиска регрессий.',
+        )
+        parser.add_argument(
+            '--save-baseline',
+            action='store_true',
+            help='Перезаписать --baseline текущим отчётом.',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.2,
+            help='Допустимый рост p95 относительно baseline (доля).',
+        )
+
+    def handle(self, *args, **options):
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('--save-baseline требует --baseline.')
+        try:
+            report = runner.run(
+                names=options['only'],
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                random_seed=options['seed'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        self.write_table(report)
+        if options['output']:
+            self.dump(report, options['output'])
+        if not options['baseline']:
+            return
+        if options['save_baseline']:
+            self.dump(report, options['baseline'])
+            self.stdout.write(
+                self.style.SUCCESS(f'Baseline записан: {options["baseline"]}')
+            )
+            return
+        try:
+            with open(options['baseline'], encoding='utf-8') as baseline:
+                regressions = runner.compare(
+                    report, json.load(baseline), options['tolerance']
+                )
+        except FileNotFoundError:
+            raise CommandError(f'Baseline {options["baseline"]} не найден.')
+        if regressions:
+            raise CommandError(
+                'Регрессии относительно baseline:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
+
+    def dump(self, report, path):
+        with open(path, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+
+    def write_table(self, report):
+        self.stdout.write(
+            f'{"сценарий":<18}{"p50 мс":>9}{"p95 мс":>9}{"p99 мс":>9}'
+            f'{"SQL ср.":>9}{"зап./с":>9}{"ошибок":>8}'
+        )
+        for name, row in report['scenarios'].items():
+            self.stdout.write(
+                f'{name:<18}{row["p50_ms"]:>9.1f}{row["p95_ms"]:>9.1f}'
+                f'{row["p99_ms"]:>9.1f}{row["queries_avg"]:>9.1f}'
+                f'{row["throughput_rps"]:>9.1f}{row["errors"]:>8}'
+            )
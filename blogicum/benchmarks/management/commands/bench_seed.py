@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.seed import DEFAULT_SIZES, Seeder, scaled_sizes
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет пустую БД синтетическими пользователями, постами и '
+        'комментариями для нагрузочных замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='Множитель объёмов по умолчанию (1.0 — миллион постов).',
+        )
+        for name, size in DEFAULT_SIZES.items():
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                default=None,
+                help=f'Точное число строк (по умолчанию {size} × scale).',
+            )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.0,
+            help='Показатель Ципфа для авторов, категорий и обсуждений.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Сколько строк вставлять одним bulk_create.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Зерно генератора: одинаковое зерно — одинаковые данные.',
+        )
+
+    def handle(self, *args, **options):
+        sizes = scaled_sizes(
+            options['scale'],
+            **{name: options[name] for name in DEFAULT_SIZES},
+        )
+        seeder = Seeder(
+            sizes,
+            skew=options['skew'],
+            batch_size=options['batch_size'],
+            random_seed=options['seed'],
+            log=self.stdout.write,
+        )
+        try:
+            seeder.run()
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS('Данные для замеров готовы.'))
@@ -0,0 +1,54 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from benchmarks import sqlite_load
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite при одновременных '
+        'чтении и записи: настройки Django по умолчанию и '
+        'core.backends.sqlite3.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument(
+            '--seconds',
+            type=float,
+            default=5.0,
+            help='Длительность прогона каждого режима.',
+        )
+        parser.add_argument(
+            '--modes',
+            nargs='+',
+            choices=sorted(sqlite_load.MODES),
+            default=list(sqlite_load.MODES),
+        )
+        parser.add_argument('--output', help='Записать отчёт в JSON-файл.')
+
+    def handle(self, *args, **options):
+        report = sqlite_load.run(
+            options['modes'],
+            readers=options['readers'],
+            writers=options['writers'],
+            seconds=options['seconds'],
+        )
+        self.stdout.write(
+            f'{"режим":<8}{"чтений/с":>10}{"ошибок":>8}'
+            f'{"записей/с":>11}{"ошибок":>8}{"p95 записи мс":>15}'
+        )
+        for mode, result in report.items():
+            reads, writes = result['reads'], result['writes']
+            p95 = writes['p95_ms']
+            self.stdout.write(
+                f'{mode:<8}{reads["ops_per_second"]:>10.0f}'
+                f'{reads["errors"]:>8}{writes["ops_per_second"]:>11.0f}'
+                f'{writes["errors"]:>8}'
+                f'{"—" if p95 is None else f"{p95:.1f}":>15}'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2)
@@ -0,0 +1,96 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import startup
+
+
+class Command(BaseCommand):
+    help = (
+        'Профилирует холодный старт: импорты по приложениям, ready(), '
+        'middleware, URLconf и шаблоны — и сравнивает с baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Сколько раз запустить процесс; берётся медиана.',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=15,
+            help='Сколько самых долгих модулей показать.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Записать отчёт в JSON-файл.',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON прошлого прогона для поиска регрессий.',
+        )
+        parser.add_argument(
+            '--save-baseline',
+            action='store_true',
+            help='Перезаписать --baseline текущим отчётом.',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.2,
+            help='Допустимый рост относительно baseline (доля).',
+        )
+
+    def handle(self, *args, **options):
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('--save-baseline требует --baseline.')
+        report = startup.run(repeat=options['repeat'], top=options['top'])
+        self.write_report(report)
+        if options['output']:
+            self.dump(report, options['output'])
+        if not options['baseline']:
+            return
+        if options['save_baseline']:
+            self.dump(report, options['baseline'])
+            self.stdout.write(
+                self.style.SUCCESS(f'Baseline записан: {options["baseline"]}')
+            )
+            return
+        try:
+            with open(options['baseline'], encoding='utf-8') as baseline:
+                regressions = startup.compare(
+                    report, json.load(baseline), options['tolerance']
+                )
+        except FileNotFoundError:
+            raise CommandError(f'Baseline {options["baseline"]} не найден.')
+        if regressions:
+            raise CommandError(
+                'Регрессии относительно baseline:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
+
+    def dump(self, report, path):
+        with open(path, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+
+    def write_section(self, title, values):
+        self.stdout.write(title)
+        for name, milliseconds in values:
+            self.stdout.write(f'  {name:<40}{milliseconds:>9.1f} мс')
+
+    def write_report(self, report):
+        self.write_section('Фазы:', report['phases'].items())
+        self.write_section('ready():', sorted(
+            report['ready'].items(), key=lambda item: item[1], reverse=True
+        ))
+        self.write_section('Импорты по группам:', sorted(
+            report['imports'].items(), key=lambda item: item[1],
+            reverse=True,
+        ))
+        self.write_section('Самые долгие модули (собственное время):', (
+            (row['module'], row['self_ms'])
+            for row in report['slowest_imports']
+        ))
@@ -0,0 +1,256 @@
+"""Прогон сценариев через тестовый клиент Django внутри процесса.
+
+Сценарий — имя, тип клиента (аноним, пользователь, админ) и функция,
+которая по выборке данных и генератору случайных чисел возвращает
+(метод, URL, данные). Для каждого сценария считаются перцентили
+задержки, среднее число SQL-запросов и пропускная способность.
+"""
+import platform
+import random
+import time
+from statistics import mean
+from typing import Callable, NamedTuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+
+from blog.models import Category, Post
+from blog.pagination import KeysetPaginator
+from core.metrics import QueryCollector, percentile
+from .seed import ADMIN_USERNAME, USERNAME_PREFIX, WORDS
+
+User = get_user_model()
+
+ANONYMOUS = 'anonymous'
+AUTHENTICATED = 'user'
+ADMIN = 'admin'
+
+SAMPLE_SIZE = 500
+
+
+class Scenario(NamedTuple):
+    name: str
+    client: str
+    make_request: Callable
+
+
+SCENARIOS = {}
+
+
+def scenario(name, client=AUTHENTICATED):
+    """Зарегистрировать сценарий замера."""
+    def decorator(make_request):
+        SCENARIOS[name] = Scenario(name, client, make_request)
+        return make_request
+    return decorator
+
+
+class Sample:
+    """Случайная выборка существующих объектов для построения URL."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.posts = self._sample_posts()
+        self.category_slugs = list(
+            Category.objects.filter(is_published=True).values_list(
+                'slug', flat=True
+            )
+        )
+        self.usernames = list(
+            User.objects.filter(
+                pk__in=[post.author_id for post in self.posts]
+            ).values_list('username', flat=True)
+        )
+        paginator = KeysetPaginator(Post.objects.all(), 1)
+        self.deep_cursors = [
+            paginator.cursor_after(post) for post in self.posts
+        ]
+
+    def _sample_posts(self):
+        # Случайные pk из диапазона вместо ORDER BY RANDOM() по всей
+        # таблице: выборка не должна стоить дороже самого замера.
+        bounds = Post.objects.filter(
+            is_published=True, is_live=True
+        ).order_by('pk').values_list('pk', flat=True)
+        first, last = bounds.first(), bounds.last()
+        if first is None:
+            raise ValueError('В БД нет постов: сначала bench_seed.')
+        candidates = {
+            self.rng.randint(first, last) for _ in range(SAMPLE_SIZE * 2)
+        }
+        return list(Post.objects.filter(
+            pk__in=candidates, is_published=True, is_live=True,
+            category__is_published=True,
+        ).only('pk', 'pub_date', 'author_id')[:SAMPLE_SIZE])
+
+    def post(self):
+        return self.rng.choice(self.posts)
+
+    def feed_cursor(self):
+        """Половина запросов — первая страница, половина — глубокие."""
+        if self.rng.random() < 0.5:
+            return {}
+        return {'cursor': self.rng.choice(self.deep_cursors)}
+
+
+@scenario('index_anonymous', client=ANONYMOUS)
+def _index_anonymous(sample):
+    return 'get', '/', sample.feed_cursor()
+
+
+@scenario('index')
+def _index(sample):
+    return 'get', '/', sample.feed_cursor()
+
+
+@scenario('category_posts')
+def _category_posts(sample):
+    slug = sample.rng.choice(sample.category_slugs)
+    return 'get', f'/category/{slug}/', {}
+
+
+@scenario('profile')
+def _profile(sample):
+    username = sample.rng.choice(sample.usernames)
+    return 'get', f'/profile/{username}/', {}
+
+
+@scenario('post_detail')
+def _post_detail(sample):
+    return 'get', f'/posts/{sample.post().pk}/', {}
+
+
+@scenario('add_comment')
+def _add_comment(sample):
+    return (
+        'post',
+        f'/posts/{sample.post().pk}/comment/',
+        {'text': 'Замер нагрузки комментарием'},
+    )
+
+
+@scenario('admin_posts', client=ADMIN)
+def _admin_posts(sample):
+    return 'get', '/admin/blog/post/', {}
+
+
+@scenario('admin_comments', client=ADMIN)
+def _admin_comments(sample):
+    return 'get', '/admin/blog/comment/', {}
+
+
+@scenario('admin_posts_deep', client=ADMIN)
+def _admin_posts_deep(sample):
+    return 'get', '/admin/blog/post/', {'p': sample.rng.randint(2, 1000)}
+
+
+@scenario('admin_posts_search', client=ADMIN)
+def _admin_posts_search(sample):
+    return 'get', '/admin/blog/post/', {'q': sample.rng.choice(WORDS)}
+
+
+@scenario('admin_autocomplete', client=ADMIN)
+def _admin_autocomplete(sample):
+    return 'get', '/admin/autocomplete/', {
+        'term': sample.rng.choice(WORDS),
+        'app_label': 'blog',
+        'model_name': 'comment',
+        'field_name': 'post',
+    }
+
+
+def _clients():
+    host = {'HTTP_HOST': settings.ALLOWED_HOSTS[0]}
+    anonymous = Client(**host)
+    user = Client(**host)
+    user.force_login(
+        User.objects.filter(username__startswith=USERNAME_PREFIX).exclude(
+            username=ADMIN_USERNAME
+        ).order_by('pk').first()
+    )
+    admin = Client(**host)
+    admin.force_login(User.objects.get(username=ADMIN_USERNAME))
+    return {ANONYMOUS: anonymous, AUTHENTICATED: user, ADMIN: admin}
+
+
+def run_scenario(current, client, sample, iterations, warmup):
+    latencies, queries, errors = [], [], 0
+    for number in range(warmup + iterations):
+        method, url, data = current.make_request(sample)
+        collector = QueryCollector()
+        started = time.perf_counter()
+        with connection.execute_wrapper(collector):
+            response = getattr(client, method)(url, data)
+        elapsed = time.perf_counter() - started
+        if number < warmup:
+            continue
+        latencies.append(elapsed)
+        queries.append(collector.queries)
+        if response.status_code >= 400:
+            errors += 1
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'mean_ms': mean(latencies) * 1000,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'queries_avg': mean(queries),
+        'throughput_rps': len(latencies) / sum(latencies),
+    }
+
+
+def run(names=None, iterations=200, warmup=10, random_seed=42):
+    """Прогнать сценарии и вернуть отчёт, готовый к json.dump."""
+    rng = random.Random(random_seed)
+    sample = Sample(rng)
+    clients = _clients()
+    results = {}
+    for name in names or SCENARIOS:
+        current = SCENARIOS[name]
+        results[name] = run_scenario(
+            current, clients[current.client], sample, iterations, warmup
+        )
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'posts': Post.objects.order_by('-pk').values_list(
+                'pk', flat=True
+            ).first(),
+            'iterations': iterations,
+            'random_seed': random_seed,
+        },
+        'scenarios': results,
+    }
+
+
+def compare(report, baseline, tolerance=0.2):
+    """Список регрессий относительно baseline; пустой — всё в порядке.
+
+    Задержка p95 может вырасти не больше чем на tolerance (доля),
+    а число SQL-запросов не должно расти вовсе.
+    """
+    regressions = []
+    for name, result in report['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        limit = previous['p95_ms'] * (1 + tolerance)
+        if result['p95_ms'] > limit:
+            regressions.append(
+                f'{name}: p95 {result["p95_ms"]:.1f} мс > '
+                f'{limit:.1f} мс (baseline {previous["p95_ms"]:.1f} мс)'
+            )
+        if result['queries_avg'] > previous['queries_avg'] + 0.5:
+            regressions.append(
+                f'{name}: SQL-запросов {result["queries_avg"]:.1f} > '
+                f'{previous["queries_avg"]:.1f}'
+            )
+        if result['errors'] > previous['errors']:
+            regressions.append(
+                f'{name}: ошибок {result["errors"]} > {previous["errors"]}'
+            )
+    return regressions
@@ -0,0 +1,214 @@
+"""Наполнение БД синтетическими данными для нагрузочных замеров.
+
+Авторы, категории и посты для комментариев выбираются с перекосом
+по закону Ципфа: при skew=0 равномерно, при skew=1 у первого автора
+вдвое больше постов, чем у второго, и т. д. Так воспроизводятся
+«горячие» профили и обсуждения.
+"""
+import random
+import time
+from bisect import bisect
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.utils import timezone
+
+from blog.counters import recount_comment_counts
+from blog.models import Category, Comment, Location, Post
+from blog.search import rebuild_index
+from blog.stats import reconcile
+
+User = get_user_model()
+
+DEFAULT_SIZES = {
+    'users': 100_000,
+    'categories': 50,
+    'locations': 500,
+    'posts': 1_000_000,
+    'comments': 10_000_000,
+}
+
+USERNAME_PREFIX = 'bench_'
+ADMIN_USERNAME = 'bench_admin'
+PASSWORD = 'bench-password'
+
+WORDS = (
+    'город утро река дорога ветер книга лето поезд море окно '
+    'сад мост дождь гора свет лес снег кофе музей парк'
+).split()
+
+PUBLICATION_SPAN = timedelta(days=3 * 365)
+
+
+class SkewedPicker:
+    """Случайный элемент последовательности с перекосом Ципфа."""
+
+    def __init__(self, items, skew, rng):
+        self.items = items
+        self.rng = rng
+        self.cumulative = list(accumulate(
+            1 / (rank + 1) ** skew for rank in range(len(items))
+        ))
+
+    def pick(self):
+        point = self.rng.random() * self.cumulative[-1]
+        return self.items[bisect(self.cumulative, point)]
+
+
+def scaled_sizes(scale=1.0, **overrides):
+    sizes = {
+        name: max(1, int(size * scale))
+        for name, size in DEFAULT_SIZES.items()
+    }
+    sizes.update(
+        (name, value) for name, value in overrides.items() if value
+    )
+    return sizes
+
+
+class Seeder:
+    """Заливает данные пачками через bulk_create и пишет скорость."""
+
+    def __init__(self, sizes, skew=1.0, batch_size=5000, random_seed=42,
+                 log=print):
+        self.sizes = sizes
+        self.skew = skew
+        self.batch_size = batch_size
+        self.rng = random.Random(random_seed)
+        self.log = log
+        self.now = timezone.now()
+
+    def run(self):
+        if User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+            raise ValueError(
+                'В БД уже есть данные замеров: наполняйте пустую базу.'
+            )
+        self.seed_users()
+        self.seed_dictionaries()
+        self.seed_posts()
+        self.seed_comments()
+        self._timed('comment_count пересчитан', recount_comment_counts)
+        # bulk_create не шлёт сигналов: индекс поиска строится целиком.
+        self._timed('Индекс поиска построен', rebuild_index)
+        self._timed('Статистика пользователей сверена', reconcile)
+        # Статистика для планировщика и оценки числа строк в админке.
+        self._timed('ANALYZE выполнен', self.analyze)
+
+    def _timed(self, message, step):
+        started = time.perf_counter()
+        step()
+        self.log(f'{message} за {time.perf_counter() - started:.1f} с')
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _bulk(self, model, rows):
+        started = time.perf_counter()
+        batch, created = [], 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                model.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch)
+            created += len(batch)
+        elapsed = time.perf_counter() - started
+        self.log(
+            f'{model._meta.verbose_name_plural}: {created} строк за '
+            f'{elapsed:.1f} с ({created / max(elapsed, 1e-9):.0f} строк/с)'
+        )
+
+    def _text(self, words):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(words))
+
+    def seed_users(self):
+        password = make_password(PASSWORD)
+        User.objects.create_superuser(
+            ADMIN_USERNAME, 'bench@acme.not', PASSWORD
+        )
+        self._bulk(User, (
+            User(username=f'{USERNAME_PREFIX}{number}', password=password)
+            for number in range(self.sizes['users'])
+        ))
+        self.user_ids = list(
+            User.objects.filter(
+                username__startswith=USERNAME_PREFIX
+            ).exclude(username=ADMIN_USERNAME).order_by('pk').values_list(
+                'pk', flat=True
+            )
+        )
+
+    def seed_dictionaries(self):
+        self._bulk(Category, (
+            Category(
+                title=f'Категория {number}',
+                description=self._text(12),
+                slug=f'bench-{number}',
+                # Каждая десятая категория скрыта: фильтр лент работает.
+                is_published=bool(number % 10),
+            )
+            for number in range(self.sizes['categories'])
+        ))
+        self._bulk(Location, (
+            Location(name=f'Место {number}')
+            for number in range(self.sizes['locations'])
+        ))
+        self.category_ids = list(
+            Category.objects.filter(slug__startswith='bench-').values_list(
+                'pk', flat=True
+            )
+        )
+        self.location_ids = list(
+            Location.objects.values_list('pk', flat=True)
+        )
+
+    def _post(self, authors, categories):
+        # Около процента постов отложены, ещё два процента скрыты.
+        offset = self.rng.random() * PUBLICATION_SPAN
+        if self.rng.random() < 0.01:
+            pub_date = self.now + offset / 100
+        else:
+            pub_date = self.now - offset
+        return Post(
+            title=self._text(5),
+            text=self._text(60),
+            pub_date=pub_date,
+            is_live=pub_date <= self.now,
+            is_published=self.rng.random() >= 0.02,
+            author_id=authors.pick(),
+            category_id=categories.pick(),
+            location_id=self.rng.choice(self.location_ids),
+        )
+
+    def seed_posts(self):
+        authors = SkewedPicker(self.user_ids, self.skew, self.rng)
+        categories = SkewedPicker(self.category_ids, self.skew, self.rng)
+        self._bulk(Post, (
+            self._post(authors, categories)
+            for _ in range(self.sizes['posts'])
+        ))
+
+    def seed_comments(self):
+        post_ids = list(
+            Post.objects.order_by('pk').values_list(
+                'pk', flat=True
+            )
+        )
+        # Перемешиваем, чтобы «горячие» посты были разного возраста.
+        self.rng.shuffle(post_ids)
+        posts = SkewedPicker(post_ids, self.skew, self.rng)
+        authors = SkewedPicker(self.user_ids, self.skew, self.rng)
+        self._bulk(Comment, (
+            Comment(
+                text=self._text(8),
+                post_id=posts.pick(),
+                author_id=authors.pick(),
+            )
+            for _ in range(self.sizes['comments'])
+        ))
@@ -0,0 +1,167 @@
+"""Конкурентное чтение и запись в SQLite: до и после настройки.
+
+Отдельный временный файл БД со схемой «посты и комментарии». Писатели
+повторяют add_comment: прочитать пост, вставить комментарий, увеличить
+счётчик — в одной транзакции. Читатели листают ветки комментариев.
+Режим stock соответствует django.db.backends.sqlite3 по умолчанию
+(журнал DELETE, BEGIN DEFERRED, timeout 5 с), режим tuned — PRAGMA и
+transaction_mode из core.backends.sqlite3.
+"""
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from core.backends.sqlite3.base import DEFAULT_PRAGMAS, apply_pragmas
+from core.metrics import percentile
+
+MODES = {
+    'stock': ({'journal_mode': 'DELETE'}, 'DEFERRED'),
+    'tuned': (DEFAULT_PRAGMAS, 'IMMEDIATE'),
+}
+
+POSTS = 1000
+COMMENTS = 20000
+THREAD_PAGE = 50
+
+SCHEMA = """
+CREATE TABLE post (
+    id INTEGER PRIMARY KEY,
+    comment_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE comment (
+    id INTEGER PRIMARY KEY,
+    post_id INTEGER NOT NULL REFERENCES post (id),
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX comment_thread ON comment (post_id, created_at, id);
+"""
+
+
+def _connect(path, pragmas):
+    # Как в Django: автокоммит, транзакции открываются явным BEGIN.
+    connection = sqlite3.connect(
+        path, timeout=5, isolation_level=None, check_same_thread=False
+    )
+    apply_pragmas(connection, pragmas)
+    return connection
+
+
+def _prepare(path, pragmas, rng):
+    connection = _connect(path, pragmas)
+    connection.executescript(SCHEMA)
+    connection.execute('BEGIN')
+    connection.executemany(
+        'INSERT INTO post (id) VALUES (?)',
+        ((number,) for number in range(1, POSTS + 1)),
+    )
+    connection.executemany(
+        'INSERT INTO comment (post_id, text, created_at) VALUES (?, ?, ?)',
+        (
+            (rng.randint(1, POSTS), 'комментарий', time.time())
+            for _ in range(COMMENTS)
+        ),
+    )
+    connection.execute(
+        'UPDATE post SET comment_count = (SELECT COUNT(*) FROM comment '
+        'WHERE comment.post_id = post.id)'
+    )
+    connection.execute('COMMIT')
+    connection.close()
+
+
+class _Worker(threading.Thread):
+    def __init__(self, path, pragmas, begin, deadline, seed):
+        super().__init__(daemon=True)
+        self.connection = _connect(path, pragmas)
+        self.begin = begin
+        self.deadline = deadline
+        self.rng = random.Random(seed)
+        self.latencies = []
+        self.errors = 0
+
+    def run(self):
+        try:
+            while time.perf_counter() < self.deadline:
+                started = time.perf_counter()
+                try:
+                    self.operation()
+                except sqlite3.OperationalError:
+                    self.errors += 1
+                    if self.connection.in_transaction:
+                        self.connection.execute('ROLLBACK')
+                else:
+                    self.latencies.append(time.perf_counter() - started)
+        finally:
+            self.connection.close()
+
+
+class _Writer(_Worker):
+    def operation(self):
+        post_id = self.rng.randint(1, POSTS)
+        execute = self.connection.execute
+        execute(self.begin)
+        execute('SELECT comment_count FROM post WHERE id = ?', (post_id,))
+        execute(
+            'INSERT INTO comment (post_id, text, created_at) '
+            'VALUES (?, ?, ?)',
+            (post_id, 'нагрузка', time.time()),
+        )
+        execute(
+            'UPDATE post SET comment_count = comment_count + 1 '
+            'WHERE id = ?',
+            (post_id,),
+        )
+        execute('COMMIT')
+
+
+class _Reader(_Worker):
+    def operation(self):
+        post_id = self.rng.randint(1, POSTS)
+        self.connection.execute(
+            'SELECT id, text FROM comment WHERE post_id = ? '
+            'ORDER BY created_at, id LIMIT ?',
+            (post_id, THREAD_PAGE),
+        ).fetchall()
+
+
+def _summary(workers, seconds):
+    latencies = [value for worker in workers for value in worker.latencies]
+    return {
+        'ops_per_second': len(latencies) / seconds,
+        'errors': sum(worker.errors for worker in workers),
+        'p95_ms': percentile(latencies, 95) * 1000 if latencies else None,
+    }
+
+
+def run_mode(mode, readers=4, writers=4, seconds=5.0, random_seed=42):
+    pragmas, transaction_mode = MODES[mode]
+    rng = random.Random(random_seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'load.sqlite3')
+        _prepare(path, pragmas, rng)
+        deadline = time.perf_counter() + seconds
+        begin = f'BEGIN {transaction_mode}'
+        read_workers = [
+            _Reader(path, pragmas, begin, deadline, rng.random())
+            for _ in range(readers)
+        ]
+        write_workers = [
+            _Writer(path, pragmas, begin, deadline, rng.random())
+            for _ in range(writers)
+        ]
+        for worker in read_workers + write_workers:
+            worker.start()
+        for worker in read_workers + write_workers:
+            worker.join()
+    return {
+        'reads': _summary(read_workers, seconds),
+        'writes': _summary(write_workers, seconds),
+    }
+
+
+def run(modes=tuple(MODES), **options):
+    return {mode: run_mode(mode, **options) for mode in modes}
@@ -0,0 +1,120 @@
+"""Профиль холодного старта: фазы, ready() приложений, цена импортов.
+
+Каждый прогон — новый процесс python -X importtime -m
+benchmarks.startup_probe. Журнал importtime разбирается и сводится по
+группам: приложения проекта, django.contrib.<app>, остальной django,
+сторонние пакеты по имени и stdlib целиком. Из нескольких прогонов
+берётся медиана каждого числа: первый прогон после правки платит ещё
+и за компиляцию .pyc.
+"""
+import json
+import platform
+import subprocess
+import sys
+from statistics import median
+
+import django
+from django.conf import settings
+
+PROBE_MODULE = 'benchmarks.startup_probe'
+
+# Рост меньше этого порога считается шумом, какой бы ни была доля.
+NOISE_FLOOR_MS = 5.0
+
+STDLIB = 'stdlib'
+
+
+def parse_importtime(log):
+    """[(модуль, собственное время мс, накопленное мс)] из stderr."""
+    modules = []
+    for line in log.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        if not own.strip().isdigit():
+            continue
+        modules.append((
+            name.strip(), int(own) / 1000, int(cumulative) / 1000
+        ))
+    return modules
+
+
+def import_group(module):
+    top = module.split('.')[0]
+    if module.startswith('django.contrib.'):
+        return '.'.join(module.split('.')[:3])
+    if top in sys.stdlib_module_names or top.startswith('_'):
+        return STDLIB
+    return top
+
+
+def _probe():
+    finished = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', PROBE_MODULE],
+        cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(finished.stdout.splitlines()[-1])
+    result['modules'] = parse_importtime(finished.stderr)
+    return result
+
+
+def _medians(dicts):
+    keys = dict.fromkeys(key for values in dicts for key in values)
+    return {
+        key: median(values.get(key, 0.0) for values in dicts)
+        for key in keys
+    }
+
+
+def run(repeat=5, top=20):
+    """Прогнать пробу repeat раз; отчёт в миллисекундах."""
+    probes = [_probe() for _ in range(repeat)]
+    imports = []
+    for probe in probes:
+        groups = {}
+        for module, own, _ in probe['modules']:
+            group = import_group(module)
+            groups[group] = groups.get(group, 0.0) + own
+        imports.append(groups)
+    slowest = sorted(
+        probes[-1]['modules'], key=lambda row: row[1], reverse=True
+    )[:top]
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'repeat': repeat,
+            'collections': median(probe['collections'] for probe in probes),
+        },
+        'phases': {
+            name: seconds * 1000 for name, seconds
+            in _medians([probe['phases'] for probe in probes]).items()
+        },
+        'ready': {
+            label: seconds * 1000 for label, seconds
+            in _medians([probe['ready'] for probe in probes]).items()
+        },
+        'imports': _medians(imports),
+        'slowest_imports': [
+            {'module': module, 'self_ms': own, 'cumulative_ms': cumulative}
+            for module, own, cumulative in slowest
+        ],
+    }
+
+
+def compare(report, baseline, tolerance=0.2):
+    """Регрессии фаз, ready() и групп импортов относительно baseline."""
+    regressions = []
+    for section in ('phases', 'ready', 'imports'):
+        previous_values = baseline.get(section, {})
+        for name, current in report[section].items():
+            previous = previous_values.get(name, 0.0)
+            if (
+                current > previous * (1 + tolerance)
+                and current - previous > NOISE_FLOOR_MS
+            ):
+                regressions.append(
+                    f'{section}/{name}: {current:.1f} мс > '
+                    f'{previous:.1f} мс'
+                )
+    return regressions
@@ -0,0 +1,107 @@
+"""Холодный старт проекта по фазам; запускается в отдельном процессе.
+
+python -X importtime -m benchmarks.startup_probe повторяет путь
+первого запроса: импорт blogicum.wsgi (настройки, django.setup() с
+ready() каждого приложения, обработчик с middleware), URLconf и
+шаблонный движок. Фаза setup вложена в wsgi, gc — время сборщика
+мусора за весь старт. Фазы печатаются в stdout одной строкой JSON,
+журнал импортов интерпретатор пишет в stderr. Модуль нарочно ничего
+не импортирует из Django на уровне модуля — иначе это попало бы вне
+замеров.
+"""
+import gc
+import json
+import time
+
+
+class _GarbageCollectorTimer:
+    """Время в сборщике мусора.
+
+    Паузы поколения 2 видны как «медленный импорт» случайного модуля,
+    на котором сборка сработала.
+    """
+
+    def __init__(self):
+        self.total = 0.0
+        self.collections = 0
+        self._started = None
+
+    def __call__(self, phase, info):
+        if phase == 'start':
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            self.total += time.perf_counter() - self._started
+            self.collections += 1
+
+
+def _timed_ready(app_config, ready_times):
+    original = app_config.ready
+
+    def ready():
+        started = time.perf_counter()
+        try:
+            original()
+        finally:
+            ready_times[app_config.label] = time.perf_counter() - started
+    return ready
+
+
+def main():
+    phases, ready_times = {}, {}
+    collector_timer = _GarbageCollectorTimer()
+    gc.callbacks.append(collector_timer)
+    started = last = time.perf_counter()
+
+    def mark(name):
+        nonlocal last
+        now = time.perf_counter()
+        phases[name] = now - last
+        last = now
+
+    import django
+    from django.apps import AppConfig
+
+    # populate() вызывает ready() после import_models() всех приложений:
+    # подменяем ready у экземпляра, пока до него не дошло.
+    original_import_models = AppConfig.import_models
+    original_setup = django.setup
+
+    def import_models(self):
+        original_import_models(self)
+        self.ready = _timed_ready(self, ready_times)
+
+    def setup(*args, **kwargs):
+        setup_started = time.perf_counter()
+        try:
+            original_setup(*args, **kwargs)
+        finally:
+            phases['setup'] = time.perf_counter() - setup_started
+
+    AppConfig.import_models = import_models
+    django.setup = setup
+    # Точка входа целиком: настройки, setup() и обработчик с middleware.
+    import blogicum.wsgi  # noqa: F401
+    django.setup = original_setup
+    AppConfig.import_models = original_import_models
+    mark('wsgi')
+
+    from django.urls import reverse
+    reverse('blog:index')
+    mark('urlconf')
+
+    from django.template.loader import get_template
+    get_template('blog/index.html')
+    mark('templates')
+
+    phases['total'] = time.perf_counter() - started
+    gc.callbacks.remove(collector_timer)
+    phases['gc'] = collector_timer.total
+    print(json.dumps({
+        'phases': phases,
+        'ready': ready_times,
+        'collections': collector_timer.collections,
+    }))
+
+
+if __name__ == '__main__':
+    main()
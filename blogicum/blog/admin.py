@@ -1,17 +1,153 @@
-"""Настройка админ-зоны."""
-from django.contrib import admin
+"""Настройка админ-зоны.
 
+Списки постов и комментариев рассчитаны на миллионы строк: связанные
+объекты приходят одним JOIN, длинный текст обрезает сама БД, число
+строк берётся из статистики (core.pagination), а внешние ключи
+выбираются автодополнением вместо <select> со всеми строками таблицы.
+Массовые действия модерации — один SQL-запрос каждое (blog.moderation).
+Пользователи удаляются в фоне пачками (blog.deletion).
+"""
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth import get_permission_codename, get_user_model
+from django.contrib.auth.admin import UserAdmin
+from django.db.models.functions import Substr
+
+from core.pagination import EstimatedCountPaginator
+from . import deletion, moderation
 from .models import Category, Location, Post, Comment
+from .search import match_posts
+
+User = get_user_model()
 
 admin.site.empty_value_display = 'Не задано'
 
+# Сколько символов текста показывать в списке.
+TEXT_PREVIEW_LENGTH = 80
+
+
+class TextPreviewChangeList(ChangeList):
+    """Список без полных текстов: БД отдаёт только их начало."""
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer(
+            *self.model_admin.list_deferred
+        ).annotate(
+            # На символ больше: так видно, что текст обрезан.
+            text_preview=Substr('text', 1, TEXT_PREVIEW_LENGTH + 1)
+        )
+
+
+class JoinedAutocompleteSelect(AutocompleteSelect):
+    """Автодополнение, которому выбранный объект передают готовым.
+
+    AutocompleteSelect достаёт выбранное значение отдельным SELECT,
+    в list_editable — на каждую строку. В строке списка объект уже
+    пришёл через list_select_related, его отдаёт ChangeListRowForm.
+    """
+
+    selected_object = None
+
+    def optgroups(self, name, value, attr=None):
+        selected = self.selected_object
+        if selected is None or str(selected.pk) not in map(str, value):
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name, selected.pk, self.choices.field.label_from_instance(
+                selected
+            ), True, len(options),
+        ))
+        return [(None, options, 0)]
+
+
+class ChangeListRowForm(forms.ModelForm):
+    """Форма строки list_editable: связанные объекты берёт у строки."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, field in self.fields.items():
+            # В админке виджет обёрнут в RelatedFieldWidgetWrapper.
+            widget = getattr(field.widget, 'widget', field.widget)
+            if isinstance(widget, JoinedAutocompleteSelect):
+                widget.selected_object = getattr(self.instance, name)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Общие настройки списков больших таблиц с полем text."""
+
+    paginator = EstimatedCountPaginator
+    # Тот же порядок, что по умолчанию у списка, но явный: его берёт
+    # и пагинатор автодополнения.
+    ordering = ('-pk',)
+    # Иначе под списком ещё один COUNT(*) по всей таблице.
+    show_full_result_count = False
+    # Поля, которые список не читает; text заменяет text_preview.
+    list_deferred = ('text',)
+
+    def get_changelist(self, request, **kwargs):
+        return TextPreviewChangeList
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', ChangeListRowForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.get_autocomplete_fields(request):
+            kwargs.setdefault('widget', JoinedAutocompleteSelect(
+                db_field, self.admin_site, using=kwargs.get('using')
+            ))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    @admin.display(description='Текст')
+    def text_preview(self, obj):
+        if len(obj.text_preview) > TEXT_PREVIEW_LENGTH:
+            return obj.text_preview[:TEXT_PREVIEW_LENGTH] + '…'
+        return obj.text_preview
+
+
+def report_affected(model_admin, request, message, count):
+    model_admin.message_user(request, f'{message}: {count}.')
+
+
+class PostActionForm(ActionForm):
+    category = forms.ModelChoiceField(
+        Category.objects.all(),
+        required=False,
+        label='Категория',
+        help_text='Для действия «Перенести в категорию».',
+    )
 
-class PostAdmin(admin.ModelAdmin):
+
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ('title', 'slug', 'is_published')
+    search_fields = ('title',)
+
+
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ('name', 'is_published')
+    search_fields = ('name',)
+    actions = ('unpublish_posts',)
+
+    @admin.action(description='Снять с публикации все посты отсюда')
+    def unpublish_posts(self, request, queryset):
+        report_affected(
+            self, request, 'Снято с публикации постов',
+            moderation.unpublish_locations(queryset),
+        )
+
+
+class PostAdmin(LargeTableAdmin):
     """Класс, улучшающий работу с таблицей Post."""
 
     list_display = (
         'title',
-        'text',
+        'text_preview',
         'pub_date',
         'author',
         'location',
@@ -23,30 +159,111 @@ class PostAdmin(admin.ModelAdmin):
         'is_published',
         'category'
     )
-    search_fields = (
-        'title',
-        'is_published',
-        'category',
-    )
+    list_select_related = ('author', 'location', 'category')
+    autocomplete_fields = ('author', 'location', 'category')
+    # Поиск идёт по полнотекстовому индексу, см. get_search_results.
+    search_fields = ('title',)
     list_filter = ('pub_date',)
     list_display_links = ('title', 'pub_date',)
+    action_form = PostActionForm
+    actions = ('publish', 'unpublish', 'move_to_category')
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return match_posts(queryset, search_term), False
 
+    @admin.action(description='Опубликовать выбранные публикации')
+    def publish(self, request, queryset):
+        report_affected(
+            self, request, 'Опубликовано постов',
+            moderation.set_published(queryset, True),
+        )
 
-class CommentAdmin(admin.ModelAdmin):
+    @admin.action(description='Снять с публикации выбранные публикации')
+    def unpublish(self, request, queryset):
+        report_affected(
+            self, request, 'Снято с публикации постов',
+            moderation.set_published(queryset, False),
+        )
+
+    @admin.action(description='Перенести в категорию')
+    def move_to_category(self, request, queryset):
+        form = self.action_form(request.POST)
+        form.fields['action'].choices = self.get_action_choices(request)
+        if not form.is_valid() or form.cleaned_data['category'] is None:
+            self.message_user(
+                request, 'Выберите категорию под списком действий.',
+                messages.ERROR,
+            )
+            return
+        category = form.cleaned_data['category']
+        report_affected(
+            self, request, f'Перенесено в «{category}» постов',
+            moderation.move_to_category(queryset, category),
+        )
+
+
+class CommentAdmin(LargeTableAdmin):
     list_display = (
-        'text',
+        'text_preview',
         'post',
         'author',
         'created_at',
     )
+    list_select_related = ('post', 'author')
+    list_deferred = ('text', 'post__text')
+    autocomplete_fields = ('post', 'author')
     search_fields = (
-        'author',
-        'post',
+        '=author__username',
     )
     list_filter = ('created_at',)
+    actions = ('purge_authors_comments',)
+
+    @admin.action(description='Удалить все комментарии их авторов')
+    def purge_authors_comments(self, request, queryset):
+        authors = User.objects.filter(pk__in=queryset.values('author'))
+        report_affected(
+            self, request, 'Удалено комментариев',
+            moderation.purge_comments_by_authors(authors),
+        )
+
+
+class BatchedDeleteUserAdmin(UserAdmin):
+    """UserAdmin, удаляющий пользователей через blog.deletion.
+
+    Обычное удаление собирает все посты и комментарии пользователя
+    дважды: для страницы подтверждения и для самого каскада.
+    """
+
+    def get_deleted_objects(self, objs, request):
+        users = list(objs)
+        counts = {User._meta.verbose_name_plural: len(users)}
+        perms_needed = set()
+        for model in (Post, Comment):
+            opts = model._meta
+            count = model.objects.filter(author__in=users).count()
+            if not count:
+                continue
+            counts[opts.verbose_name_plural] = count
+            codename = get_permission_codename('delete', opts)
+            if not request.user.has_perm(f'{opts.app_label}.{codename}'):
+                perms_needed.add(opts.verbose_name)
+        return [str(user) for user in users], counts, perms_needed, []
+
+    def delete_model(self, request, obj):
+        deletion.delete_user(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            deletion.delete_user(user)
 
 
-admin.site.register(Category)
-admin.site.register(Location)
+admin.site.register(Category, CategoryAdmin)
+admin.site.register(Location, LocationAdmin)
 admin.site.register(Post, PostAdmin)
 admin.site.register(Comment, CommentAdmin)
+# Модуль django.contrib.auth.admin уже импортирован выше и User
+# зарегистрировал: autodiscover второй раз его не выполнит.
+admin.site.unregister(User)
+admin.site.register(User, BatchedDeleteUserAdmin)
@@ -5,3 +5,13 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from django.conf import settings
+
+        from . import signals  # noqa: F401
+
+        if settings.PUBLICATION_SCHEDULER_IN_PROCESS:
+            from .publication import start_scheduler
+
+            start_scheduler()
@@ -0,0 +1,60 @@
+"""Асинхронные версии читающих представлений для запуска под ASGI.
+
+В Django 3.2 нет асинхронного ORM, поэтому работа с БД и отрисовка
+шаблона выполняются одним переходом в поток через sync_to_async —
+тем же телом, что у синхронных представлений в blog.views. Выигрыш
+в другом: попадание в кэш ленты отдаётся прямо из цикла событий, без
+потока, а ожидающие БД запросы не держат по потоку на соединение.
+
+Подключаются вместо синхронных в blog/urls.py при ASYNC_VIEWS = True.
+"""
+from asgiref.sync import sync_to_async
+
+from . import views
+from .cache import INDEX_SCOPE, cache_feed_page, category_scope
+
+
+def _in_thread(view):
+    """Представление и отрисовка ответа за один переход в поток.
+
+    TemplateResponse иначе отрисовался бы отдельным sync_to_async уже
+    в обработчике Django, а ленивые запросы шаблона — вместе с ним.
+    thread_sensitive (по умолчанию): все обращения к БД идут через
+    один поток и его соединения, как того требует Django 3.2.
+    """
+    def render(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if not getattr(response, 'is_rendered', True):
+            response.render()
+        return response
+    return sync_to_async(render)
+
+
+_index = _in_thread(views.index.__wrapped__)
+_category_posts = _in_thread(views.category_posts.__wrapped__)
+_post_detail = _in_thread(views.PostDetailView.as_view())
+_comments_fragment = _in_thread(views.comments_fragment)
+
+
+@cache_feed_page(lambda request: INDEX_SCOPE)
+async def index(request):
+    """Главная страница."""
+    return await _index(request)
+
+
+@cache_feed_page(
+    lambda request, category_slug: category_scope(category_slug)
+)
+async def category_posts(request, category_slug):
+    """Лента категории."""
+    return await _category_posts(request, category_slug)
+
+
+async def post_detail(request, post_id):
+    """Страница публикации с первой порцией комментариев."""
+    return await _post_detail(request, post_id=post_id)
+
+
+async def comments_fragment(request, post_id):
+    """Следующая порция комментариев к публикации."""
+    return await _comments_fragment(request, post_id)
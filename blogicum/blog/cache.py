@@ -0,0 +1,200 @@
+"""Кэш отрисованных страниц лент для анонимных посетителей.
+
+Страницы не удаляются из кэша поштучно: в ключ каждой страницы входят
+номера поколений её областей (scope). Сигналы моделей увеличивают
+поколение затронутой области, и все её старые страницы просто
+перестают читаться, а затем вытесняются по таймауту.
+
+Страница для кэша отрисовывается по основной БД: иначе устаревший
+ответ реплики лёг бы под новое поколение и жил бы до таймаута.
+
+С телом хранятся заголовки ответа (тип, ETag, Last-Modified, Vary):
+попадание отдаётся с ними же и на совпадающий If-None-Match или
+If-Modified-Since отвечает 304, как промах через conditional_page.
+
+Счётчики поколений живут FEED_CACHE_TIMEOUT, как и страницы: запрос
+к /category/<любой slug>/ создаёт счётчик ещё до того, как станет
+ясно, что такой категории нет, и без срока такие ключи копились бы.
+Истёкший счётчик начинается заново из часов — старые страницы просто
+перестают читаться.
+
+Области:
+    base — всё, что видно на любой карточке (категории, локации);
+    index — главная лента;
+    category:<slug> — лента категории;
+    author:<id> — посты автора в его профиле. Страниц профиля в кэше
+        нет, по этой области считается их ETag (blog.conditional).
+"""
+import asyncio
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from core.routers import primary_reads
+from .pagination import CURSOR_QUERY_PARAM
+
+BASE_SCOPE = 'base'
+INDEX_SCOPE = 'index'
+CATEGORY_SCOPE = 'category'
+AUTHOR_SCOPE = 'author'
+
+# Заголовки, которые хранятся в кэше вместе с телом страницы.
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Vary')
+
+
+def get_feed_cache():
+    return caches[settings.FEED_CACHE_ALIAS]
+
+
+def category_scope(slug):
+    return f'{CATEGORY_SCOPE}:{slug}'
+
+
+def author_scope(user_id):
+    return f'{AUTHOR_SCOPE}:{user_id}'
+
+
+def _generation_key(scope):
+    return f'feed:gen:{scope}'
+
+
+def _fresh_generation():
+    # Начальное значение берётся из часов, а не 1: если счётчик вытеснят
+    # из кэша, новый не совпадёт со старым и не оживит устаревшие страницы.
+    return time.time_ns()
+
+
+def get_generations(scopes):
+    """Текущие поколения областей одним запросом к кэшу."""
+    cache = get_feed_cache()
+    keys = [_generation_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    generations = []
+    for key in keys:
+        if key not in found:
+            cache.add(key, _fresh_generation(), settings.FEED_CACHE_TIMEOUT)
+            found[key] = cache.get(key)
+        generations.append(found[key])
+    return generations
+
+
+def bump_generations(*scopes):
+    """Сделать недействительными все закэшированные страницы областей."""
+    cache = get_feed_cache()
+    for scope in set(scopes):
+        key = _generation_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _fresh_generation(), settings.FEED_CACHE_TIMEOUT)
+
+
+def _page_key(scopes, generations, request):
+    cursor = request.GET.get(CURSOR_QUERY_PARAM, '')
+    cursor_hash = hashlib.md5(cursor.encode()).hexdigest()
+    versions = '.'.join(str(generation) for generation in generations)
+    return f'feed:response:{scopes[-1]}:{versions}:{cursor_hash}'
+
+
+def _lookup(request, get_scope, args, kwargs):
+    cache = get_feed_cache()
+    scopes = (BASE_SCOPE, get_scope(request, *args, **kwargs))
+    key = _page_key(scopes, get_generations(scopes), request)
+    return cache, key, cache.get(key)
+
+
+def _store(cache, key, response):
+    if response.status_code == 200 and not response.streaming:
+        headers = {
+            name: response[name] for name in STORED_HEADERS
+            if response.has_header(name)
+        }
+        cache.set(
+            key, (response.content, headers), settings.FEED_CACHE_TIMEOUT
+        )
+    return response
+
+
+def _cached_response(request, entry):
+    """Ответ из кэша с его заголовками или 304 по валидаторам."""
+    content, headers = entry
+    response = HttpResponse(content)
+    for name, value in headers.items():
+        response[name] = value
+    last_modified = headers.get('Last-Modified')
+    return get_conditional_response(
+        request,
+        etag=headers.get('ETag'),
+        last_modified=last_modified and parse_http_date_safe(last_modified),
+        response=response,
+    )
+
+
+def _surely_anonymous(request):
+    """Аноним без обращения к БД: у вошедшего всегда есть cookie сессии.
+
+    request.user в асинхронном коде не вычислить — он читает сессию из
+    БД. Запрос с cookie сессии идёт мимо кэша, как у вошедших.
+    """
+    return settings.SESSION_COOKIE_NAME not in request.COOKIES
+
+
+async def _call_cache(func, *args):
+    """Вызвать синхронный API кэша из цикла событий.
+
+    locmem отвечает из памяти процесса быстрее перехода в поток, и его
+    зовём прямо в цикле. Файлы, Redis и Memcached ждут диск или сеть и
+    остановили бы на это время все запросы цикла — их в поток.
+    """
+    if isinstance(get_feed_cache(), LocMemCache):
+        return func(*args)
+    return await sync_to_async(func)(*args)
+
+
+def _async_wrapper(view, get_scope):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET' or not _surely_anonymous(request):
+            return await view(request, *args, **kwargs)
+        cache, key, entry = await _call_cache(
+            _lookup, request, get_scope, args, kwargs
+        )
+        if entry is not None:
+            return _cached_response(request, entry)
+        with primary_reads():
+            response = await view(request, *args, **kwargs)
+        return await _call_cache(_store, cache, key, response)
+    return wrapper
+
+
+def cache_feed_page(get_scope):
+    """Кэшировать страницу ленты для анонимных GET-запросов.
+
+    get_scope(request, *args, **kwargs) возвращает область ленты;
+    область base добавляется ко всем страницам автоматически.
+    Годится и для асинхронных представлений.
+    """
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            return _async_wrapper(view, get_scope)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            cache, key, entry = _lookup(request, get_scope, args, kwargs)
+            if entry is not None:
+                return _cached_response(request, entry)
+            with primary_reads():
+                response = view(request, *args, **kwargs)
+            return _store(cache, key, response)
+        return wrapper
+    return decorator
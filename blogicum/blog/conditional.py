@@ -0,0 +1,114 @@
+"""Условные GET-ответы: ETag и Last-Modified для поста, категории, профиля.
+
+Валидаторы считаются без выборки страницы и без отрисовки шаблона.
+Если браузер прислал совпадающий If-None-Match или If-Modified-Since,
+в ответ уходит 304 и представление не вызывается.
+
+Пост проверяется по отметкам updated_at самого поста и его ветки
+комментариев — это один запрос по индексу. Ленты категории и профиля
+агрегатом по всем своим постам на каждый GET не проверяются: их ETag —
+поколения областей blog.cache (category:<slug> и author:<id>), которые
+сигналы увеличивают при любой правке поста ленты. Такие страницы
+отдают только ETag, без Last-Modified.
+
+Кроме отметок, в ETag входят:
+    — pk зрителя: автор видит свои скрытые посты и кнопки правки;
+    — строка запроса: курсор страницы ленты или ветки комментариев;
+    — поколение области base из blog.cache: его увеличивают правки
+      категорий и локаций, у которых нет своего updated_at, и массовая
+      модерация.
+Правки категорий и локаций Last-Modified поэтому не двигают, но
+браузеры, получившие ETag, проверяют в первую очередь его.
+"""
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from django.contrib.auth import get_user_model
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from core.routers import primary_reads
+from .cache import (
+    BASE_SCOPE, author_scope, category_scope, get_generations,
+)
+from .models import Post
+
+User = get_user_model()
+
+
+def _etag(request, *parts, scopes=()):
+    payload = ':'.join(str(part) for part in (
+        request.user.pk,
+        request.GET.urlencode(),
+        *get_generations((BASE_SCOPE, *scopes)),
+        *parts,
+    ))
+    return f'W/"{hashlib.md5(payload.encode()).hexdigest()}"'
+
+
+def post_validators(request, post_id):
+    """Пост, его ветка комментариев и автор."""
+    row = Post.objects.filter(pk=post_id).annotate(
+        last_comment=Max('comments__updated_at')
+    ).values_list('updated_at', 'last_comment', 'author__username').first()
+    if row is None:
+        return None
+    updated_at, last_comment, _ = row
+    last_modified = max(updated_at, last_comment or updated_at)
+    return _etag(request, *row), last_modified
+
+
+def category_validators(request, category_slug):
+    """Лента категории: поколение её области в кэше, без запроса к БД."""
+    return _etag(request, scopes=(category_scope(category_slug),)), None
+
+
+def profile_validators(request, username):
+    """Профиль, его сводка UserStats и поколение ленты автора."""
+    row = User.objects.filter(username=username).values_list(
+        'pk', 'first_name', 'last_name', 'stats__updated_at'
+    ).first()
+    if row is None:
+        return None
+    return _etag(request, *row, scopes=(author_scope(row[0]),)), None
+
+
+def conditional_page(get_validators):
+    """Как django.views.decorators.http.condition, но за один запрос.
+
+    get_validators(request, *args, **kwargs) возвращает пару
+    (etag, last_modified) или None, если проверять нечего — тогда
+    представление просто вызывается (и, например, отдаёт 404).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            # С отстающей реплики 304 подтвердил бы устаревшую копию.
+            with primary_reads():
+                validators = get_validators(request, *args, **kwargs)
+            if validators is None:
+                return view(request, *args, **kwargs)
+            etag, last_modified = validators
+            timestamp = (
+                timegm(last_modified.utctimetuple()) if last_modified
+                else None
+            )
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is not None:
+                return response
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                response.headers.setdefault('ETag', etag)
+                if timestamp is not None:
+                    response.headers.setdefault(
+                        'Last-Modified', http_date(timestamp)
+                    )
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,88 @@
+"""Пересчёт денормализованных счётчиков блога."""
+from django.db.models import (
+    Case, Count, F, IntegerField, OuterRef, Subquery, Value, When,
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from core.jobs import job
+from .models import Comment, Post
+
+RECOUNT_BATCH_SIZE = 5000
+
+# Ветвей CASE в одном UPDATE: по два параметра на ветвь и id в IN
+# укладываются в 999 параметров SQLite.
+SUBTRACT_BATCH_SIZE = 300
+
+
+def comment_count_subquery(comments=None):
+    """Число комментариев поста как коррелированный подзапрос.
+
+    comments — queryset, среди которых считать; по умолчанию все.
+    """
+    if comments is None:
+        comments = Comment.objects.all()
+    return Coalesce(
+        Subquery(
+            comments.filter(
+                post=OuterRef('pk')
+            ).order_by().values('post').annotate(
+                total=Count('pk')
+            ).values('total'),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def subtract_counts(queryset, field, counts, **extra):
+    """Уменьшить field у строк queryset: counts — {pk: на сколько}.
+
+    Один UPDATE с CASE на пачку вместо UPDATE на каждую строку; ниже
+    нуля счётчик не опускается. extra — прочие поля UPDATE. Вернуть
+    число обновлённых строк.
+    """
+    items = list(counts.items())
+    updated = 0
+    for start in range(0, len(items), SUBTRACT_BATCH_SIZE):
+        batch = dict(items[start:start + SUBTRACT_BATCH_SIZE])
+        by_pk = Case(
+            *(When(pk=pk, then=Value(count)) for pk, count in batch.items()),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        updated += queryset.filter(pk__in=batch).update(
+            **{field: Greatest(F(field) - by_pk, Value(0))}, **extra
+        )
+    return updated
+
+
+@job
+def recount_comment_counts(post_ids=None, batch_size=RECOUNT_BATCH_SIZE,
+                           using=None):
+    """Пересчитать Post.comment_count пачками по диапазонам id.
+
+    Возвращает число обновлённых строк. Обновляются только строки,
+    где сохранённое значение разошлось с реальным. using — алиас БД,
+    по умолчанию её выбирает роутер.
+    """
+    posts = Post.objects.db_manager(using).all()
+    if post_ids is not None:
+        posts = posts.filter(pk__in=post_ids)
+    actual = comment_count_subquery()
+    updated = 0
+    last_pk = 0
+    while True:
+        bounds = list(
+            posts.filter(pk__gt=last_pk).order_by('pk').values_list(
+                'pk', flat=True
+            )[:batch_size]
+        )
+        if not bounds:
+            return updated
+        updated += posts.filter(
+            pk__gte=bounds[0], pk__lte=bounds[-1]
+        ).annotate(actual=actual).exclude(
+            comment_count=actual
+        ).update(comment_count=actual, updated_at=timezone.now())
+        last_pk = bounds[-1]
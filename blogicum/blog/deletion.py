@@ -0,0 +1,175 @@
+"""Удаление постов и пользователей пачками в фоне.
+
+Post.delete() сначала собирает каскад: Collector выбирает в память
+каждый комментарий поста, и на посте со 100 тысячами комментариев
+запрос удаления висит, а SQLite всё это время держит блокировку записи.
+Здесь пост скрывается сразу (deleted_at, его больше не отдаёт
+Post.objects), а задача purge_post удаляет комментарии пачками по
+DELETION_BATCH_SIZE, каждую своей короткой транзакцией, и последним
+сам пост, каскад которого к тому времени мал.
+
+Комментарии удаляются delete_comments: одним DELETE по id пачки, без
+сигналов Comment. То, что сделали бы post_delete по каждой строке,
+делается на пачку разом: один UPDATE счётчиков постов, один — сводок
+UserStats, одна вставка отметок удаления для выгрузки (blog.export) и
+одно событие кэша лент.
+
+Пользователь удаляется так же: он выключается, его посты скрываются,
+а purge_user пачками удаляет его комментарии, комментарии к его постам
+и посты, и только потом строку пользователя — тогда CASCADE по
+Post.author и Comment.author уже нечего собирать. Ход работы задачи
+пишут в Job.progress (manage.py job_stats).
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, router, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from core.jobs import enqueue, job, report_progress
+
+from . import cache, export, stats
+from .counters import subtract_counts
+from .models import Comment, Post
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+
+class _Progress:
+    """Счётчик удалённых строк задачи: в Job.progress и в лог."""
+
+    def __init__(self, subject, total):
+        self.subject = subject
+        self.total = total
+        self.done = 0
+
+    def add(self, count):
+        self.done += count
+        report_progress(self.done, self.total)
+        logger.info(
+            '%s: удалено %s из %s', self.subject, self.done, self.total
+        )
+
+
+def _counts_by(comments, field):
+    return dict(
+        comments.values(field).annotate(count=Count('pk')).order_by()
+        .values_list(field, 'count')
+    )
+
+
+def delete_comments(comment_ids):
+    """Удалить комментарии одним DELETE и поправить счётчики разом.
+
+    Вернуть число удалённых строк. Зависимых строк у Comment нет.
+    """
+    comment_ids = list(comment_ids)
+    if not comment_ids:
+        return 0
+    using = router.db_for_write(Comment)
+    comments = Comment.objects.using(using).filter(pk__in=comment_ids)
+    quote = connections[using].ops.quote_name
+    table = quote(Comment._meta.db_table)
+    column = quote(Comment._meta.pk.column)
+    placeholders = ', '.join(['%s'] * len(comment_ids))
+    with transaction.atomic(using=using):
+        per_post = _counts_by(comments, 'post')
+        per_author = _counts_by(comments, 'author')
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {table} WHERE {column} IN ({placeholders})',
+                comment_ids,
+            )
+            deleted = cursor.rowcount
+        subtract_counts(
+            Post.all_objects.using(using), 'comment_count', per_post,
+            updated_at=timezone.now(),
+        )
+        stats.comments_removed(per_author)
+        export.record_deleted(Comment, comment_ids, using=using)
+    # Ленты скрытых постов уже сброшены: их Post.objects не вернёт.
+    scopes = set()
+    for slug, author_id in Post.objects.filter(pk__in=per_post).values_list(
+        'category__slug', 'author'
+    ):
+        scopes.add(cache.author_scope(author_id))
+        if slug is not None:
+            scopes.add(cache.category_scope(slug))
+    if scopes:
+        cache.bump_generations(cache.INDEX_SCOPE, *scopes)
+    return deleted
+
+
+def _delete_in_batches(queryset, progress):
+    """Удалить строки queryset пачками, каждую в своей транзакции."""
+    label = queryset.model._meta.label
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[
+            :settings.DELETION_BATCH_SIZE
+        ])
+        if not ids:
+            return
+        if queryset.model is Comment:
+            progress.add(delete_comments(ids))
+            continue
+        with transaction.atomic(using=queryset.db):
+            _, deleted = queryset.filter(pk__in=ids).delete()
+        progress.add(deleted.get(label, 0))
+
+
+def delete_post(post):
+    """Скрыть пост сразу и поставить его удаление в очередь."""
+    now = timezone.now()
+    with transaction.atomic():
+        Post.all_objects.filter(pk=post.pk).update(
+            deleted_at=now, updated_at=now
+        )
+        enqueue(purge_post, post.pk, unique=True)
+        stats.refresh([post.author_id], create=False)
+    scopes = [cache.INDEX_SCOPE, cache.author_scope(post.author_id)]
+    if post.category_id is not None:
+        scopes.append(cache.category_scope(post.category.slug))
+    cache.bump_generations(*scopes)
+
+
+def delete_user(user):
+    """Выключить пользователя, скрыть его посты и поставить удаление."""
+    now = timezone.now()
+    with transaction.atomic():
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        Post.objects.filter(author=user).update(
+            deleted_at=now, updated_at=now
+        )
+        enqueue(purge_user, user.pk, unique=True)
+    cache.bump_generations(cache.BASE_SCOPE)
+
+
+@job
+def purge_post(post_id):
+    """Удалить комментарии скрытого поста пачками, затем сам пост."""
+    comments = Comment.objects.filter(post_id=post_id)
+    progress = _Progress(f'Пост {post_id}', comments.count() + 1)
+    _delete_in_batches(comments, progress)
+    _delete_in_batches(Post.all_objects.filter(pk=post_id), progress)
+
+
+@job
+def purge_user(user_id):
+    """Удалить комментарии, посты и затем самого пользователя пачками."""
+    posts = Post.all_objects.filter(author_id=user_id)
+    own_comments = Comment.objects.filter(author_id=user_id)
+    thread_comments = Comment.objects.filter(post__in=posts).exclude(
+        author_id=user_id
+    )
+    progress = _Progress(
+        f'Пользователь {user_id}',
+        own_comments.count() + thread_comments.count() + posts.count() + 1,
+    )
+    # Посты уходят последними: у каждого каскад уже только из копий фото.
+    for queryset in (own_comments, thread_comments, posts):
+        _delete_in_batches(queryset, progress)
+    _delete_in_batches(User.objects.filter(pk=user_id), progress)
@@ -0,0 +1,263 @@
+"""Потоковая выгрузка постов и комментариев в JSONL или CSV.
+
+Строки читаются через values_list().iterator(chunk_size): на PostgreSQL
+это серверный курсор, на SQLite — выборка кусками, и в памяти не бывает
+больше одного куска. Вывод — генератор байтовых блоков, его одинаково
+пишут в файл manage.py export_blog и отдаёт StreamingHttpResponse.
+
+В инкрементальном режиме выгружаются строки с ключом (updated_at, id)
+больше сохранённого в ExportWatermark, то есть и новые, и изменённые
+с прошлой выгрузки: получатель обновляет строки по id. Массовые
+правки (blog.moderation, счётчики комментариев) ставят updated_at
+сами, поэтому тоже попадают в выгрузку. Водяной знак сдвигается,
+только когда генератор дочитан до конца: оборванная выгрузка
+повторится.
+
+updated_at ставится до коммита, и строка долгой транзакции может
+закоммититься позже более новых, уже выгруженных: водяной знак прошёл
+бы мимо неё. Поэтому выгрузка не берёт строки моложе
+EXPORT_SAFETY_WINDOW — за это время их транзакции успевают
+закоммитить, и ключ выгруженных строк растёт без пропусков.
+
+Удаления выгружаются надгробиями: строками с заполненным deleted_at.
+Скрытый пост ждёт очистки (blog.deletion) с deleted_at и свежим
+updated_at и выгружается как есть. Строки, удалённые из таблицы,
+оставляют отметку ExportTombstone (record_deleted), и после строк
+набора выгрузка дописывает их: id, deleted_at и пустые остальные
+колонки. У отметок свой водяной знак, «<имя>:deleted»; старше
+EXPORT_TOMBSTONE_RETENTION они удаляются.
+"""
+import csv
+import itertools
+import zlib
+from datetime import timedelta
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import DateTimeField, Q, Value
+from django.utils import timezone
+
+from core.models import ExportTombstone, ExportWatermark
+from .models import Comment, Post
+
+EXPORT_CHUNK_SIZE = 2000
+BLOCK_SIZE = 64 * 1024
+
+JSONL = 'jsonl'
+CSV = 'csv'
+FORMATS = (JSONL, CSV)
+
+CONTENT_TYPES = {
+    JSONL: 'application/x-ndjson',
+    CSV: 'text/csv; charset=utf-8',
+}
+
+
+class Dataset(NamedTuple):
+    model: type
+    # Пары (колонка выгрузки, путь или выражение для values_list).
+    columns: tuple
+
+    @property
+    def names(self):
+        return [name for name, _ in self.columns]
+
+
+DATASETS = {
+    'posts': Dataset(Post, (
+        ('id', 'id'),
+        ('title', 'title'),
+        ('text', 'text'),
+        ('author', 'author__username'),
+        ('category', 'category__slug'),
+        ('location', 'location__name'),
+        ('pub_date', 'pub_date'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+        ('is_published', 'is_published'),
+        ('is_live', 'is_live'),
+        ('comment_count', 'comment_count'),
+        ('image', 'image'),
+        ('deleted_at', 'deleted_at'),
+    )),
+    'comments': Dataset(Comment, (
+        ('id', 'id'),
+        ('post_id', 'post_id'),
+        ('author', 'author__username'),
+        ('text', 'text'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+        ('deleted_at', Value(None, output_field=DateTimeField())),
+    )),
+}
+
+
+def _dataset_name(model):
+    for name, dataset in DATASETS.items():
+        if dataset.model is model:
+            return name
+    return None
+
+
+def record_deleted(model, ids, using=None):
+    """Отметить удаление строк model для инкрементальной выгрузки."""
+    name = _dataset_name(model)
+    if name is None:
+        return
+    now = timezone.now()
+    ExportTombstone.objects.db_manager(using).bulk_create(
+        ExportTombstone(name=name, object_id=pk, deleted_at=now)
+        for pk in ids
+    )
+
+
+def _after(queryset, since, until, field, pk):
+    """Строки с ключом (field, pk) после водяного знака и до until."""
+    if since is not None and since.last_pk is not None:
+        queryset = queryset.filter(
+            Q(**{f'{field}__gt': since.last_updated_at})
+            | Q(**{field: since.last_updated_at, f'{pk}__gt': since.last_pk})
+        )
+    if until is not None:
+        queryset = queryset.filter(**{f'{field}__lte': until})
+    return queryset.order_by(field, pk)
+
+
+def iter_rows(dataset, since=None, until=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Кортежи строк по возрастанию (updated_at, id)."""
+    # _base_manager видит и скрытые посты, ждущие очистки: это надгробия.
+    queryset = _after(
+        dataset.model._base_manager.all(), since, until, 'updated_at', 'id'
+    )
+    return queryset.values_list(
+        *(path for _, path in dataset.columns)
+    ).iterator(chunk_size=chunk_size)
+
+
+def iter_tombstones(name, since=None, until=None,
+                    chunk_size=EXPORT_CHUNK_SIZE):
+    """Надгробия удалённых строк набора в колонках его строк."""
+    names = DATASETS[name].names
+    queryset = _after(
+        ExportTombstone.objects.filter(name=name), since, until,
+        'deleted_at', 'object_id',
+    )
+    for object_id, deleted_at in queryset.values_list(
+        'object_id', 'deleted_at'
+    ).iterator(chunk_size=chunk_size):
+        row = dict.fromkeys(names)
+        row.update(id=object_id, updated_at=deleted_at, deleted_at=deleted_at)
+        yield tuple(row.values())
+
+
+class _Line:
+    """Файлоподобный приёмник для csv.writer: возвращает строку."""
+
+    def write(self, value):
+        return value
+
+
+def render_lines(dataset, rows, output_format):
+    if output_format == CSV:
+        writer = csv.writer(_Line())
+        yield writer.writerow(dataset.names)
+        for row in rows:
+            yield writer.writerow(row)
+        return
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    names = dataset.names
+    for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + '\n'
+
+
+def _blocks(lines):
+    """Склеить строки в блоки около BLOCK_SIZE байт."""
+    block, size = [], 0
+    for line in lines:
+        data = line.encode()
+        block.append(data)
+        size += len(data)
+        if size >= BLOCK_SIZE:
+            yield b''.join(block)
+            block, size = [], 0
+    if block:
+        yield b''.join(block)
+
+
+def _gzip(blocks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for block in blocks:
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+class _WatermarkTracker:
+    """Запоминает последнюю строку и сдвигает водяной знак в конце."""
+
+    def __init__(self, watermark, updated_at_index):
+        self.watermark = watermark
+        self.updated_at_index = updated_at_index
+        self.last = None
+
+    def rows(self, rows):
+        for row in rows:
+            self.last = row
+            yield row
+
+    def save(self):
+        if self.last is not None:
+            self.watermark.last_updated_at = self.last[self.updated_at_index]
+            self.watermark.last_pk = self.last[0]
+            self.watermark.save()
+
+
+def _saved_after(blocks, trackers):
+    # Сохраняем только после того, как отдан последний байт.
+    yield from blocks
+    for tracker in trackers:
+        tracker.save()
+
+
+def export(name, output_format=JSONL, compress=False, incremental=False,
+           watermark_name=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Генератор байтов выгрузки набора name ('posts' или 'comments')."""
+    dataset = DATASETS[name]
+    if not incremental:
+        rows = iter_rows(dataset, chunk_size=chunk_size)
+        trackers = ()
+    else:
+        now = timezone.now()
+        ExportTombstone.objects.filter(deleted_at__lt=now - timedelta(
+            seconds=settings.EXPORT_TOMBSTONE_RETENTION
+        )).delete()
+        until = now - timedelta(seconds=settings.EXPORT_SAFETY_WINDOW)
+        watermark_name = watermark_name or name
+        updated_at_index = dataset.names.index('updated_at')
+        trackers = tuple(
+            _WatermarkTracker(
+                ExportWatermark.objects.get_or_create(name=key)[0],
+                updated_at_index,
+            )
+            for key in (watermark_name, f'{watermark_name}:deleted')
+        )
+        live, deleted = trackers
+        rows = itertools.chain(
+            live.rows(iter_rows(
+                dataset, live.watermark, until, chunk_size=chunk_size
+            )),
+            deleted.rows(iter_tombstones(
+                name, deleted.watermark, until, chunk_size=chunk_size
+            )),
+        )
+    blocks = _blocks(render_lines(dataset, rows, output_format))
+    if compress:
+        blocks = _gzip(blocks)
+    return _saved_after(blocks, trackers) if trackers else blocks
+
+
+def filename(name, output_format, compress, now):
+    suffix = '.gz' if compress else ''
+    return f'{name}-{now:%Y%m%d-%H%M%S}.{output_format}{suffix}'
@@ -1,7 +1,7 @@
 from django import forms
-from django.core.mail import send_mail
 from django.core.exceptions import ValidationError
 
+from core.mail import enqueue_mail
 from .models import Post, Comment
 
 
@@ -20,16 +20,20 @@ class CommentForm(forms.ModelForm):
         model = Comment
         fields = ('text',)
 
+    def __init__(self, *args, author=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.author_id = author.pk if author else self.instance.author_id
+
     def clean(self):
         super().clean()
         text = self.cleaned_data.get('text', '')
         if text and len(text.split()) == 1:
-            send_mail(
+            enqueue_mail(
                 subject='Однословное сообщение',
                 message=f'Юзер опубликовал однословное сообщение: "{text}"!',
                 from_email='birthday_form@acme.not',
                 recipient_list=['admin@acme.not'],
-                fail_silently=True,
+                dedup_key=f'one-word-comment:{self.author_id}',
             )
             raise ValidationError(
                 'Сообщение должно содержать более одного слова. '
@@ -0,0 +1,99 @@
+"""Уменьшенные копии фото публикаций для лент.
+
+Копии считает задача фоновой очереди (core.jobs), поэтому загрузка
+фото не ждёт Pillow. Пока копий нет, карточка показывает
+исходный файл.
+"""
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+from core.jobs import enqueue, job
+from .models import Post, PostImageVariant
+
+EXTENSIONS = {
+    PostImageVariant.JPEG: 'jpg',
+    PostImageVariant.WEBP: 'webp',
+}
+
+
+def target_widths(original_width):
+    """Ширины копий: стандартные меньше оригинала плюс сам оригинал."""
+    widths = [
+        width for width in settings.POST_IMAGE_WIDTHS
+        if width < original_width
+    ]
+    if original_width <= max(settings.POST_IMAGE_WIDTHS):
+        widths.append(original_width)
+    return widths
+
+
+@job
+def generate_variants(post_id, force=False):
+    """Построить копии фото поста. Вернуть созданные PostImageVariant."""
+    # Pillow нужен только здесь, в фоне: не платить за него при старте.
+    from PIL import Image, ImageOps
+
+    post = Post.objects.filter(pk=post_id).only('pk', 'image').first()
+    if post is None:
+        return []
+    variants = PostImageVariant.objects.filter(post_id=post_id)
+    if force:
+        stale = variants
+    else:
+        stale = variants.exclude(source=post.image.name or '')
+    # Файлы удалит сигнал post_delete PostImageVariant.
+    stale.delete()
+    if not post.image or variants.exists():
+        return []
+
+    with post.image.open('rb') as image_file:
+        original = ImageOps.exif_transpose(Image.open(image_file))
+        original.load()
+    stem = os.path.splitext(os.path.basename(post.image.name))[0]
+    created = []
+    for width in target_widths(original.width):
+        height = max(1, round(original.height * width / original.width))
+        resized = original.resize(
+            (width, height), Image.Resampling.LANCZOS
+        )
+        for image_format, extension in EXTENSIONS.items():
+            if image_format == PostImageVariant.JPEG:
+                frame = resized.convert('RGB')
+            else:
+                frame = resized
+            buffer = BytesIO()
+            frame.save(
+                buffer, image_format, quality=settings.POST_IMAGE_QUALITY
+            )
+            variant = PostImageVariant(
+                post_id=post_id,
+                source=post.image.name,
+                format=image_format,
+                width=width,
+                height=height,
+            )
+            variant.image.save(
+                f'{stem}_{width}.{extension}',
+                ContentFile(buffer.getvalue()),
+                save=False,
+            )
+            created.append(variant)
+    created = PostImageVariant.objects.bulk_create(created)
+    # Карточки и ETag поста должны увидеть srcset.
+    Post.objects.filter(pk=post_id).update(updated_at=timezone.now())
+    return created
+
+
+def schedule_variants(post_id):
+    """Поставить построение копий в очередь в текущей транзакции."""
+    enqueue(generate_variants, post_id, unique=True)
+
+
+def srcset(variants):
+    return ', '.join(
+        f'{variant.image.url} {variant.width}w' for variant in variants
+    )
@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog.images import generate_variants
+from blog.models import Post
+
+
+def _generate(post_id, force):
+    try:
+        return len(generate_variants(post_id, force=force))
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Строит уменьшенные копии и WebP для уже загруженных фото.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.JOBS_WORKERS,
+            help='Сколько фото обрабатывать параллельно.',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать копии, даже если они уже есть.',
+        )
+
+    def handle(self, *args, **options):
+        post_ids = Post.objects.exclude(image='').values_list(
+            'pk', flat=True
+        ).order_by('pk').iterator(chunk_size=1000)
+        done = failed = variants = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {
+                pool.submit(_generate, post_id, options['force']): post_id
+                for post_id in post_ids
+            }
+            for future in as_completed(futures):
+                try:
+                    variants += future.result()
+                    done += 1
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(
+                        f'Пост {futures[future]}: {error}'
+                    )
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано постов: {done}, ошибок: {failed}, '
+            f'создано копий: {variants}'
+        ))
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+
+from blog import export
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты или комментарии в JSONL/CSV потоком, '
+        'не загружая таблицу в память.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(export.DATASETS))
+        parser.add_argument('output', help='Файл, куда писать выгрузку.')
+        parser.add_argument(
+            '--format',
+            choices=export.FORMATS,
+            default=export.JSONL,
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжать вывод gzip.',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Только изменённые после водяного знака; затем сдвинуть его.',
+        )
+        parser.add_argument(
+            '--watermark',
+            help='Имя водяного знака (по умолчанию — имя набора).',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=export.EXPORT_CHUNK_SIZE,
+            help='Сколько строк читать из БД за раз.',
+        )
+
+    def handle(self, *args, **options):
+        written = 0
+        with open(options['output'], 'wb') as output:
+            for block in export.export(
+                options['dataset'],
+                output_format=options['format'],
+                compress=options['gzip'],
+                incremental=options['incremental'],
+                watermark_name=options['watermark'],
+                chunk_size=options['chunk_size'],
+            ):
+                output.write(block)
+                written += len(block)
+        self.stdout.write(self.style.SUCCESS(
+            f'Записано {written} байт в {options["output"]}'
+        ))
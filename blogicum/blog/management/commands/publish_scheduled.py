@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from blog.publication import PublicationScheduler, publish_due
+
+
+class Command(BaseCommand):
+    help = (
+        'Публикует посты, чья дата публикации наступила. '
+        'С --loop работает постоянно и просыпается к каждой pub_date.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать следующих публикаций.',
+        )
+        parser.add_argument(
+            '--max-sleep',
+            type=int,
+            default=None,
+            help='Максимальная пауза между проверками, в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            published = publish_due()
+            self.stdout.write(
+                self.style.SUCCESS(f'Опубликовано постов: {published}')
+            )
+            return
+        scheduler = PublicationScheduler(max_sleep=options['max_sleep'])
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            scheduler.stop()
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from blog.stats import RECONCILE_BATCH_SIZE, reconcile
+from core.jobs import enqueue
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет статистику пользователей (UserStats) с постами и '
+        'комментариями. Запускать по расписанию.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RECONCILE_BATCH_SIZE,
+            help='Сколько пользователей сверять за проход (не больше 999).',
+        )
+        parser.add_argument(
+            '--background',
+            action='store_true',
+            help='Не сверять сейчас, а поставить задачу в очередь run_jobs.',
+        )
+
+    def handle(self, *args, **options):
+        if options['background']:
+            queued = enqueue(reconcile, options['batch_size'], unique=True)
+            self.stdout.write(self.style.SUCCESS(f'В очереди: {queued}'))
+            return
+        fixed = reconcile(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Исправлено строк: {fixed}'))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from blog.counters import RECOUNT_BATCH_SIZE, recount_comment_counts
+from core.jobs import enqueue
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count по таблице комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RECOUNT_BATCH_SIZE,
+            help='Сколько постов обновлять одним запросом.',
+        )
+        parser.add_argument(
+            '--background',
+            action='store_true',
+            help='Не считать сейчас, а поставить задачу в очередь run_jobs.',
+        )
+
+    def handle(self, *args, **options):
+        if options['background']:
+            queued = enqueue(
+                recount_comment_counts, None, options['batch_size'],
+                unique=True,
+            )
+            self.stdout.write(self.style.SUCCESS(f'В очереди: {queued}'))
+            return
+        updated = recount_comment_counts(batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено счётчиков: {updated}')
+        )
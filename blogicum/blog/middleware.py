@@ -0,0 +1,25 @@
+"""Промежуточные слои блога."""
+from asgiref.sync import sync_to_async
+
+from core.middleware import HybridMiddleware
+from . import publication
+
+
+class PublishDueMiddleware(HybridMiddleware):
+    """Открывает созревшие отложенные посты до обработки запроса.
+
+    Без этого пост с будущей pub_date так и оставался бы скрытым, если
+    планировщик публикаций не запущен (см. blog.publication.DueCheck).
+    Стоит в MIDDLEWARE перед ReplicaRoutingMiddleware: публикация — не
+    запись посетителя, она не должна прилеплять его к основной БД и
+    попадать в бюджет запросов представления.
+    """
+
+    def before(self, request):
+        if publication.due_check.needed():
+            publication.due_check.run()
+
+    async def _acall(self, request):
+        if publication.due_check.needed():
+            await sync_to_async(publication.due_check.run)()
+        return await self.get_response(request)
@@ -0,0 +1,63 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_search_table(apps, schema_editor):
+    """FTS5 в SQLite, tsvector + GIN в PostgreSQL; сразу наполняется."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE blog_post_search USING fts5('
+            "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            'INSERT INTO blog_post_search (rowid, title, text) '
+            'SELECT id, title, text FROM blog_post'
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE TABLE blog_post_search ('
+            'rowid bigint PRIMARY KEY '
+            'REFERENCES blog_post (id) ON DELETE CASCADE, '
+            'document tsvector NOT NULL)'
+        )
+        schema_editor.execute(
+            'INSERT INTO blog_post_search (rowid, document) '
+            "SELECT id, setweight(to_tsvector('russian', title), 'A') || "
+            "setweight(to_tsvector('russian', text), 'B') FROM blog_post"
+        )
+        schema_editor.execute(
+            'CREATE INDEX blog_post_search_document_idx '
+            'ON blog_post_search USING gin (document)'
+        )
+    else:
+        raise NotImplementedError(
+            f'Полнотекстовый индекс не поддержан для {vendor}.'
+        )
+
+
+def drop_search_table(apps, schema_editor):
+    schema_editor.execute('DROP TABLE blog_post_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_export_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchDocument',
+            fields=[
+                ('post', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='blog.post')),
+            ],
+            options={
+                'db_table': 'blog_post_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
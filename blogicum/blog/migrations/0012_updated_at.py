@@ -0,0 +1,33 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:00
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    """Старые строки не менялись с момента создания."""
+    for name in ('Post', 'Comment'):
+        apps.get_model('blog', name).objects.update(
+            updated_at=F('created_at')
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Меняется и при обновлении счётчика комментариев и публикации по расписанию; по нему считаются ETag и Last-Modified.', verbose_name='Изменено'),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Пост скрыт и ждёт, пока фоновая задача удалит его комментарии пачками (см. blog.deletion).', null=True, verbose_name='Удалено'),
+        ),
+    ]
@@ -54,6 +54,13 @@ class Location(PublishedModel):
         return self.name
 
 
+class PostManager(models.Manager):
+    """Посты без удалённых: их строки ждут фоновой очистки."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Post(PublishedModel):
     """Класс, создающий таблицу Пост."""
 
@@ -89,17 +96,100 @@ class Post(PublishedModel):
         related_name='posts'
     )
     image = models.ImageField('Фото', upload_to='posts_images', blank=True)
+    is_live = models.BooleanField(
+        'Дата публикации наступила',
+        default=False,
+        editable=False,
+        help_text=(
+            "Выставляется при сохранении и планировщиком публикаций "
+            "(manage.py publish_scheduled) в момент pub_date."
+        ),
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+        help_text=(
+            "Поддерживается сигналами комментариев; "
+            "пересчитать: manage.py recount_comments."
+        ),
+    )
+    # QuerySet.update() auto_now не ставит: отметку передают явно.
+    updated_at = models.DateTimeField(
+        'Изменено',
+        auto_now=True,
+        help_text=(
+            "Меняется и при обновлении счётчика комментариев и публикации "
+            "по расписанию; по нему считаются ETag и Last-Modified."
+        ),
+    )
+    deleted_at = models.DateTimeField(
+        'Удалено',
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=(
+            "Пост скрыт и ждёт, пока фоновая задача удалит его "
+            "комментарии пачками (см. blog.deletion)."
+        ),
+    )
+
+    # Первым объявлен — менеджер по умолчанию: удалённые посты не видны
+    # ни лентам, ни get_object_or_404, ни админке. Каскад Collector
+    # идёт через _base_manager и удалённые посты видит.
+    objects = PostManager()
+    all_objects = models.Manager()
 
     class Meta:
         """Абстрактный класс Meta."""
 
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        # Индексы под ленты: главная, категория и профиль автора.
+        # Порядок полей совпадает с ключом пагинации (-pub_date, -id).
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_feed_idx',
+                condition=models.Q(is_published=True, is_live=True),
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                name='post_category_feed_idx',
+                condition=models.Q(is_published=True, is_live=True),
+            ),
+            # Без условия: автор видит в профиле и снятые с публикации посты.
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+            # Очередь планировщика: только ещё не наступившие публикации.
+            models.Index(
+                fields=('pub_date',),
+                name='post_scheduled_idx',
+                condition=models.Q(is_live=False),
+            ),
+            # Инкрементальная выгрузка: ключ водяного знака (updated_at, id).
+            models.Index(
+                fields=('updated_at', 'id'),
+                name='post_export_idx',
+            ),
+        )
 
     def __str__(self):
         """Магический метод str."""
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.is_live = self.pub_date <= timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = {*update_fields, 'updated_at'}
+            if 'pub_date' in update_fields:
+                update_fields.add('is_live')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     text = models.TextField('Комментарий к посту')
@@ -116,10 +206,127 @@ class Comment(models.Model):
         related_name='comments'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
 
     class Meta:
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            # Ключ пагинации ветки комментариев: (created_at, id).
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_thread_idx',
+            ),
+            models.Index(
+                fields=('updated_at', 'id'),
+                name='comment_export_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text
+
+
+class PostImageVariant(models.Model):
+    """Уменьшенная копия Post.image для srcset в лентах."""
+
+    JPEG = 'JPEG'
+    WEBP = 'WEBP'
+    FORMAT_CHOICES = (
+        (JPEG, 'JPEG'),
+        (WEBP, 'WebP'),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Публикация',
+        related_name='image_variants'
+    )
+    source = models.CharField(
+        'Исходный файл',
+        max_length=LENGTH_NAME,
+        help_text='Post.image.name, из которого сделана копия.',
+    )
+    format = models.CharField(
+        'Формат', max_length=4, choices=FORMAT_CHOICES
+    )
+    width = models.PositiveIntegerField('Ширина')
+    height = models.PositiveIntegerField('Высота')
+    image = models.ImageField(
+        'Файл', upload_to='posts_images/variants', max_length=LENGTH_NAME
+    )
+
+    class Meta:
+        verbose_name = 'размер фото'
+        verbose_name_plural = 'Размеры фото'
+        ordering = ('width',)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('post', 'format', 'width'),
+                name='unique_post_image_variant',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.image.name} ({self.width}x{self.height})'
+
+
+class PostSearchDocument(models.Model):
+    """Строка полнотекстового индекса поста (см. blog.search).
+
+    Таблицу создаёт миграция под конкретную СУБД: в SQLite это
+    виртуальная таблица FTS5, в PostgreSQL — tsvector с GIN-индексом.
+    Ключ в обоих случаях — колонка rowid, равная id поста.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_document'
+    )
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_search'
+
+
+class UserStats(models.Model):
+    """Сводка активности пользователя для профиля (см. blog.stats).
+
+    Считается по постам, видимым всем, как в лентах. Поддерживается
+    сигналами Post и Comment; массовые правки мимо сигналов исправляет
+    manage.py reconcile_user_stats.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name='Пользователь',
+        related_name='stats'
+    )
+    post_count = models.PositiveIntegerField('Публикаций', default=0)
+    comment_count = models.PositiveIntegerField('Комментариев', default=0)
+    first_post_at = models.DateTimeField(
+        'Первая публикация', null=True, blank=True
+    )
+    last_post_at = models.DateTimeField(
+        'Последняя публикация', null=True, blank=True
+    )
+    top_categories = models.JSONField(
+        'Частые категории',
+        default=list,
+        blank=True,
+        help_text='[{"slug": …, "title": …, "count": …}] по убыванию count.'
+    )
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'статистика пользователя'
+        verbose_name_plural = 'Статистика пользователей'
+
+    def __str__(self):
+        return str(self.user)
@@ -0,0 +1,78 @@
+"""Массовая модерация одним SQL-запросом на действие.
+
+save() и delete() по строке означают форму, сигналы и сброс кэша на
+каждый пост; здесь каждое действие — один UPDATE или DELETE по
+множеству строк. Сигналы при этом не отправляются, поэтому то, что
+обычно делают они, делается здесь же: ставится updated_at (по нему
+считаются ETag и ключи карточек), пересчитываются счётчики и строки
+UserStats затронутых авторов, а кэш лент сбрасывается одним событием —
+новым поколением области base.
+Комментарии удаляются пачками по DELETION_BATCH_SIZE через
+blog.deletion.delete_comments: DELETE по id пачки, а счётчики постов,
+сводки UserStats и кэш лент правятся на пачку разом.
+Каждая функция возвращает число затронутых строк.
+"""
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import cache, deletion, stats
+from .models import Comment, Post
+
+logger = logging.getLogger(__name__)
+
+
+def _author_ids(posts):
+    """Авторы постов queryset: их сводки пересчитываются после правки."""
+    return set(posts.values_list('author', flat=True).order_by())
+
+
+def set_published(posts, is_published):
+    """Опубликовать или снять с публикации посты queryset."""
+    posts = posts.exclude(is_published=is_published)
+    authors = _author_ids(posts)
+    changed = posts.update(
+        is_published=is_published, updated_at=timezone.now()
+    )
+    stats.refresh(authors)
+    cache.bump_generations(cache.BASE_SCOPE)
+    logger.info(
+        'Постов %s: %s',
+        'опубликовано' if is_published else 'снято с публикации',
+        changed,
+    )
+    return changed
+
+
+def move_to_category(posts, category):
+    """Перенести посты queryset в категорию category."""
+    posts = posts.exclude(category=category)
+    authors = _author_ids(posts)
+    moved = posts.update(category=category, updated_at=timezone.now())
+    stats.refresh(authors)
+    cache.bump_generations(cache.BASE_SCOPE)
+    logger.info('Постов перенесено в «%s»: %s', category, moved)
+    return moved
+
+
+def purge_comments_by_authors(authors):
+    """Удалить все комментарии авторов queryset пользователей."""
+    comments = Comment.objects.filter(author__in=authors)
+    purged = 0
+    while True:
+        # Сначала id, потом DELETE по ним: DELETE с подзапросом к той же
+        # таблице MySQL не выполняет.
+        ids = list(comments.values_list('pk', flat=True)[
+            :settings.DELETION_BATCH_SIZE
+        ])
+        if not ids:
+            break
+        purged += deletion.delete_comments(ids)
+    logger.info('Удалено комментариев: %s', purged)
+    return purged
+
+
+def unpublish_locations(locations):
+    """Снять с публикации все посты из местоположений queryset."""
+    return set_published(Post.objects.filter(location__in=locations), False)
@@ -0,0 +1,200 @@
+"""Курсорная (keyset) пагинация лент публикаций."""
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+CURSOR_QUERY_PARAM = 'cursor'
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+_CURSOR_SCALARS = (str, int, float)
+
+
+class InvalidCursor(Exception):
+    """Курсор не удалось разобрать."""
+
+
+class KeysetPage(Sequence):
+    """Страница курсорной пагинации.
+
+    В отличие от django.core.paginator.Page не знает ни своего номера,
+    ни общего количества страниц: вместо этого отдаёт непрозрачные
+    курсоры на соседние страницы.
+    """
+
+    def __init__(self, object_list, paginator,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    @property
+    def last_cursor(self):
+        """Курсор последней страницы ленты."""
+        return self.paginator.last_cursor
+
+
+class KeysetPaginator:
+    """Пагинатор по ключу сортировки, без COUNT(*) и OFFSET.
+
+    Каждая страница выбирается условием «строго после/до граничной
+    записи» по полям ordering, поэтому стоимость запроса не зависит
+    от глубины страницы. Последнее поле ordering должно быть
+    уникальным (обычно id), чтобы порядок был строгим.
+    """
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self._fields = [
+            (name.lstrip('-'), name.startswith('-'))
+            for name in self.ordering
+        ]
+
+    @property
+    def last_cursor(self):
+        return self._encode(BACKWARD, None)
+
+    def cursor_after(self, obj):
+        """Курсор страницы, которая начинается сразу после obj."""
+        return self._encode(FORWARD, self._key(obj))
+
+    def get_page(self, cursor=None):
+        """Вернуть страницу по курсору; битый курсор даёт первую страницу."""
+        try:
+            direction, values = self._decode(cursor)
+        except InvalidCursor:
+            direction, values = FORWARD, None
+        if direction == BACKWARD:
+            return self._page_backward(values)
+        return self._page_forward(values)
+
+    def _page_forward(self, values):
+        queryset = self.object_list.order_by(*self.ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, FORWARD))
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return self._make_page(
+            rows,
+            has_next=has_next,
+            has_previous=values is not None,
+        )
+
+    def _page_backward(self, values):
+        reversed_ordering = [
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        ]
+        queryset = self.object_list.order_by(*reversed_ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, BACKWARD))
+        rows = list(queryset[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return self._make_page(
+            rows,
+            has_next=values is not None,
+            has_previous=has_previous,
+        )
+
+    def _make_page(self, rows, has_next, has_previous):
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self._encode(FORWARD, self._key(rows[-1]))
+        if rows and has_previous:
+            previous_cursor = self._encode(BACKWARD, self._key(rows[0]))
+        return KeysetPage(rows, self, next_cursor, previous_cursor)
+
+    def _seek(self, values, direction):
+        """Условие «после values» для составного ключа сортировки.
+
+        Для (a DESC, b DESC) вперёд это a < x OR (a = x AND b < y).
+        """
+        condition = Q()
+        for position, (name, descending) in enumerate(self._fields):
+            lookup = 'lt' if descending == (direction == FORWARD) else 'gt'
+            term = Q(**{f'{name}__{lookup}': values[position]})
+            for prev_position, (prev_name, _) in enumerate(
+                self._fields[:position]
+            ):
+                term &= Q(**{prev_name: values[prev_position]})
+            condition |= term
+        return condition
+
+    def _key(self, obj):
+        return [getattr(obj, name) for name, _ in self._fields]
+
+    def _encode(self, direction, values):
+        if values is not None:
+            # isoformat() вместо DjangoJSONEncoder: тот обрезает
+            # микросекунды, и граница страницы съезжала бы.
+            values = [
+                value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in values
+            ]
+        payload = json.dumps([direction, values])
+        return base64.urlsafe_b64encode(
+            payload.encode()
+        ).decode().rstrip('=')
+
+    def _decode(self, cursor):
+        if not cursor:
+            return FORWARD, None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, raw_values = json.loads(
+                base64.urlsafe_b64decode(padded.encode())
+            )
+        except (ValueError, TypeError, binascii.Error):
+            raise InvalidCursor(cursor)
+        if direction not in (FORWARD, BACKWARD):
+            raise InvalidCursor(cursor)
+        if raw_values is None:
+            return direction, None
+        # Курсор приходит от клиента: ключ — список JSON-скаляров
+        # по одному на поле сортировки, без null (с None не сравнить).
+        if not isinstance(raw_values, list) or len(raw_values) != len(
+            self._fields
+        ) or not all(
+            isinstance(value, _CURSOR_SCALARS) for value in raw_values
+        ):
+            raise InvalidCursor(cursor)
+        model = self.object_list.model
+        try:
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self._fields, raw_values)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise InvalidCursor(cursor)
+        if None in values:
+            raise InvalidCursor(cursor)
+        return direction, values
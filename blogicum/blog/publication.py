@@ -0,0 +1,169 @@
+"""Планировщик отложенных публикаций.
+
+Видимость поста по времени хранится в Post.is_live, поэтому ленты
+фильтруют по стабильному условию, а не по pub_date <= now(), и их
+можно кэшировать. Планировщик переключает is_live в момент pub_date
+и тут же сбрасывает кэш затронутых лент.
+
+Планировщик — отдельный поток или процесс (manage.py publish_scheduled
+--loop), и его могут не запустить. Поэтому посты открывает и сам сайт:
+blog.middleware.PublishDueMiddleware перед запросом сверяет часы с
+ближайшей pub_date, которую процесс держит в памяти (DueCheck).
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Min
+from django.utils import timezone
+
+from . import cache, stats
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+
+def publish_due(now=None, using=None):
+    """Открыть посты, чья дата публикации наступила. Вернуть их число."""
+    now = now or timezone.now()
+    posts = Post.objects.db_manager(using)
+    due = list(
+        posts.filter(is_live=False, pub_date__lte=now).values_list(
+            'pk', 'category__slug', 'author'
+        )
+    )
+    if not due:
+        return 0
+    published = posts.filter(
+        pk__in=[pk for pk, _, _ in due], is_live=False
+    ).update(is_live=True, updated_at=now)
+    cache.bump_generations(
+        cache.INDEX_SCOPE,
+        *(cache.category_scope(slug) for _, slug, _ in due if slug),
+        *(cache.author_scope(author) for _, _, author in due),
+    )
+    # Сводка профиля считает только наступившие публикации.
+    stats.refresh((author for _, _, author in due), using=using)
+    logger.info('Опубликовано отложенных постов: %s', published)
+    return published
+
+
+def next_publication_at():
+    """Ближайший момент, когда какой-нибудь пост станет видимым."""
+    return Post.objects.filter(is_live=False).aggregate(
+        next_at=Min('pub_date')
+    )['next_at']
+
+
+class DueCheck:
+    """Открытие созревших постов при обращении к сайту.
+
+    Ближайшая pub_date хранится в памяти процесса, и запрос лишь
+    сравнивает её с часами. БД спрашивается, когда срок наступил или
+    прошло PUBLICATION_DUE_CHECK_INTERVAL секунд с прошлой проверки:
+    отложенный пост мог сохранить другой процесс.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_at = None
+        self._checked_at = None
+
+    def needed(self, now=None):
+        if not settings.PUBLICATION_ON_REQUEST:
+            return False
+        if self._checked_at is None or (
+            time.monotonic() - self._checked_at
+            >= settings.PUBLICATION_DUE_CHECK_INTERVAL
+        ):
+            return True
+        next_at = self._next_at
+        return next_at is not None and (now or timezone.now()) >= next_at
+
+    def run(self):
+        """Открыть созревшие посты и запомнить следующий срок."""
+        # Проверку уже делает другой поток — этот запрос её не ждёт.
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            publish_due()
+            self._next_at = next_publication_at()
+            self._checked_at = time.monotonic()
+        except Exception:
+            logger.exception('Сбой открытия отложенных публикаций')
+        finally:
+            self._lock.release()
+
+    def expect(self, pub_date):
+        """Учесть отложенный пост, сохранённый в этом процессе."""
+        next_at = self._next_at
+        if next_at is None or pub_date < next_at:
+            self._next_at = pub_date
+
+
+due_check = DueCheck()
+
+
+class PublicationScheduler(threading.Thread):
+    """Поток, который спит до ближайшей pub_date и публикует посты.
+
+    Спит не дольше max_sleep: пост с более ранней датой мог появиться
+    после того, как поток заснул. wake() будит поток досрочно.
+    """
+
+    def __init__(self, max_sleep=None):
+        super().__init__(name='publication-scheduler', daemon=True)
+        self.max_sleep = timedelta(
+            seconds=max_sleep or settings.PUBLICATION_SCHEDULER_MAX_SLEEP
+        )
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def run_once(self):
+        """Опубликовать созревшие посты и вернуть, сколько спать."""
+        close_old_connections()
+        try:
+            publish_due()
+            next_at = next_publication_at()
+        except Exception:
+            logger.exception('Сбой планировщика публикаций')
+            next_at = None
+        finally:
+            close_old_connections()
+        sleep = self.max_sleep
+        if next_at is not None:
+            sleep = min(sleep, max(next_at - timezone.now(), timedelta()))
+        return sleep.total_seconds()
+
+    def run(self):
+        while not self._stopped.is_set():
+            timeout = self.run_once()
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+
+
+_scheduler = None
+
+
+def start_scheduler():
+    """Запустить планировщик внутри процесса (один на процесс)."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = PublicationScheduler()
+        _scheduler.start()
+    return _scheduler
+
+
+def wake_scheduler():
+    if _scheduler is not None:
+        _scheduler.wake()
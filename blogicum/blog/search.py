@@ -0,0 +1,179 @@
+"""Полнотекстовый поиск по заголовкам и текстам постов.
+
+Индекс — отдельная таблица blog_post_search (модель PostSearchDocument):
+    SQLite — FTS5, ранжирование bm25 с весом заголовка 10 к 1;
+    PostgreSQL — tsvector (заголовок с весом A, текст с весом B)
+    под GIN-индексом, ранжирование ts_rank.
+Запрос соединяет индекс с постами по первичному ключу, поэтому план
+начинается с инвертированного индекса, а не с перебора blog_post.
+Строки индекса обновляют сигналы Post, целиком его пересобирает
+manage.py rebuild_search_index.
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import BooleanField, Expression, F, FloatField
+
+from .models import Post
+
+SEARCH_TABLE = 'blog_post_search'
+SEARCH_CONFIG = 'russian'
+REBUILD_BATCH_SIZE = 5000
+
+_WORD = re.compile(r'\w+')
+
+_POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('{config}', title), 'A') || "
+    "setweight(to_tsvector('{config}', text), 'B')"
+).format(config=SEARCH_CONFIG)
+
+
+def fts5_query(text):
+    """Слова запроса как префиксы через AND; синтаксис FTS5 не пропускаем."""
+    return ' '.join(f'"{word}"*' for word in _WORD.findall(text))
+
+
+class _SearchExpression(Expression):
+    """Выражение над соединённой строкой индекса поста."""
+
+    def __init__(self, query):
+        super().__init__()
+        self.query = query
+        self.document = F('search_document__pk')
+
+    def get_source_expressions(self):
+        return [self.document]
+
+    def set_source_expressions(self, exprs):
+        self.document, = exprs
+
+    def as_sql(self, compiler, connection):
+        raise NotImplementedError(
+            f'Полнотекстовый поиск не поддержан для {connection.vendor}.'
+        )
+
+    def _alias(self, compiler):
+        return compiler.quote_name_unless_alias(self.document.alias)
+
+    def _table_column(self, compiler):
+        # В FTS5 скрытая колонка с именем таблицы означает «все поля».
+        return (
+            f'{self._alias(compiler)}.'
+            f'{compiler.connection.ops.quote_name(SEARCH_TABLE)}'
+        )
+
+
+class SearchMatch(_SearchExpression):
+    conditional = True
+    output_field = BooleanField()
+
+    def as_sqlite(self, compiler, connection):
+        return f'{self._table_column(compiler)} MATCH %s', [
+            fts5_query(self.query)
+        ]
+
+    def as_postgresql(self, compiler, connection):
+        return (
+            f'{self._alias(compiler)}.document @@ '
+            f"plainto_tsquery('{SEARCH_CONFIG}', %s)"
+        ), [self.query]
+
+
+class SearchRank(_SearchExpression):
+    """Релевантность: чем больше, тем выше в выдаче."""
+
+    output_field = FloatField()
+
+    def as_sqlite(self, compiler, connection):
+        # bm25 меньше у лучших совпадений, поэтому знак меняется.
+        return f'-bm25({self._table_column(compiler)}, 10.0, 1.0)', []
+
+    def as_postgresql(self, compiler, connection):
+        return (
+            f'ts_rank({self._alias(compiler)}.document, '
+            f"plainto_tsquery('{SEARCH_CONFIG}', %s))"
+        ), [self.query]
+
+
+def match_posts(queryset, query):
+    """Оставить в queryset посты, подходящие под запрос; порядок прежний."""
+    if not _WORD.search(query):
+        return queryset.none()
+    return queryset.filter(
+        # INNER JOIN: соединение идёт от индекса к постам.
+        search_document__isnull=False
+    ).filter(SearchMatch(query))
+
+
+def search_posts(queryset, query):
+    """Отфильтровать посты queryset по запросу и упорядочить по рангу."""
+    return match_posts(queryset, query).annotate(
+        search_rank=SearchRank(query)
+    ).order_by('-search_rank', '-pub_date')
+
+
+def _delete_sql(where):
+    return f'DELETE FROM {SEARCH_TABLE} WHERE {where}'
+
+
+def _insert_sql(where, vendor=None):
+    if (vendor or connection.vendor) == 'postgresql':
+        return (
+            f'INSERT INTO {SEARCH_TABLE} (rowid, document) '
+            f'SELECT id, {_POSTGRES_DOCUMENT} FROM blog_post WHERE {where}'
+        )
+    return (
+        f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+        f'SELECT id, title, text FROM blog_post WHERE {where}'
+    )
+
+
+def index_posts(post_ids):
+    """Переписать строки индекса для постов post_ids."""
+    post_ids = list(post_ids)
+    if not post_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(post_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(_delete_sql(f'rowid IN ({placeholders})'), post_ids)
+        cursor.execute(_insert_sql(f'id IN ({placeholders})'), post_ids)
+
+
+def remove_posts(post_ids):
+    post_ids = list(post_ids)
+    if not post_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(post_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(_delete_sql(f'rowid IN ({placeholders})'), post_ids)
+
+
+def rebuild_index(batch_size=REBUILD_BATCH_SIZE, using=DEFAULT_DB_ALIAS):
+    """Пересобрать индекс целиком пачками по диапазонам id.
+
+    Очистка и вставка идут одной транзакцией: поиск до её конца видит
+    прежний индекс, а не пустой или наполовину собранный. Возвращает
+    число вставленных строк — с постами, которые ещё удаляются в фоне
+    (blog.deletion) и потому не видны через Post.objects. using — алиас
+    БД, где лежат посты и индекс.
+    """
+    indexed = 0
+    db = connections[using]
+    with transaction.atomic(using=using), db.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        last_id = Post.all_objects.using(using).order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        for start in range(0, last_id, batch_size):
+            cursor.execute(
+                _insert_sql('id > %s AND id <= %s', db.vendor),
+                [start, start + batch_size],
+            )
+            indexed += cursor.rowcount
+    if db.vendor == 'sqlite':
+        with db.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) "
+                "VALUES ('optimize')"
+            )
+    return indexed
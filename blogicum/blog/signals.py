@@ -0,0 +1,201 @@
+"""Обработчики сигналов моделей блога."""
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.signals import objects_loaded
+
+from . import cache, counters, export, images, publication, search, stats
+from .models import Category, Comment, Location, Post, PostImageVariant
+
+
+def _post_feeds(post_id):
+    """Категории и автор поста; None — поста нет (удалён или удаляется)."""
+    row = Post.objects.filter(pk=post_id).values_list(
+        'category__slug', 'author'
+    ).first()
+    if row is None:
+        return None
+    slug, author_id = row
+    return {slug} - {None}, {author_id}
+
+
+def _bump_post_feeds(category_slugs, author_ids):
+    cache.bump_generations(
+        cache.INDEX_SCOPE,
+        *(cache.category_scope(slug) for slug in category_slugs),
+        *(cache.author_scope(author_id) for author_id in author_ids),
+    )
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    """Увеличить счётчик комментариев поста атомарным UPDATE."""
+    if created and instance.post_id is not None:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1,
+            updated_at=timezone.now(),
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Уменьшить счётчик; при каскадном удалении поста строка уже уходит."""
+    if instance.post_id is not None:
+        Post.objects.filter(
+            pk=instance.post_id, comment_count__gt=0
+        ).update(
+            comment_count=F('comment_count') - 1,
+            updated_at=timezone.now(),
+        )
+
+
+@receiver(post_save, sender=Comment)
+def count_user_comment(sender, instance, created, **kwargs):
+    if created and instance.author_id is not None:
+        stats.comment_added(instance.author_id)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_user_comment(sender, instance, **kwargs):
+    if instance.author_id is not None:
+        stats.comment_removed(instance.author_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_feeds(sender, instance, **kwargs):
+    """Счётчик комментариев виден только в лентах самого поста."""
+    if instance.post_id is None:
+        return
+    feeds = _post_feeds(instance.post_id)
+    # blog.deletion удаляет комментарии скрытого поста пачками: его
+    # ленты уже сброшены, и тысячи новых поколений кэша ни к чему.
+    if feeds is not None:
+        _bump_post_feeds(*feeds)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_state(sender, instance, **kwargs):
+    """Запомнить прежние ленты, фото и вклад поста в сводку автора."""
+    previous = None
+    if instance.pk:
+        previous = Post.objects.select_related('category').filter(
+            pk=instance.pk
+        ).only(
+            'author', 'image', 'pub_date', 'is_published', 'is_live',
+            'deleted_at', 'category__slug', 'category__title',
+            'category__is_published',
+        ).first()
+    if previous is None:
+        instance._feed_category_slugs = set()
+        instance._feed_author_ids = set()
+        instance._previous_image = ''
+        instance._previous_stamp = None
+    else:
+        instance._feed_category_slugs = (
+            {previous.category.slug} if previous.category_id else set()
+        )
+        instance._feed_author_ids = {previous.author_id}
+        instance._previous_image = previous.image.name
+        instance._previous_stamp = stats.post_stamp(previous)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    slugs = set(getattr(instance, '_feed_category_slugs', ()))
+    if instance.category_id is not None:
+        slugs.add(instance.category.slug)
+    author_ids = set(getattr(instance, '_feed_author_ids', ()))
+    author_ids.add(instance.author_id)
+    _bump_post_feeds(slugs, author_ids)
+
+
+@receiver(post_save, sender=Post)
+def wake_publication_scheduler(sender, instance, **kwargs):
+    """Отложенный пост мог стать ближайшим — пересчитать сон."""
+    if not instance.is_live:
+        publication.due_check.expect(instance.pub_date)
+        transaction.on_commit(publication.wake_scheduler)
+
+
+@receiver(post_save, sender=Post)
+def schedule_image_variants(sender, instance, **kwargs):
+    if instance.image.name != getattr(instance, '_previous_image', ''):
+        images.schedule_variants(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def index_post_text(sender, instance, **kwargs):
+    search.index_posts([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_index(sender, instance, **kwargs):
+    search.remove_posts([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+def count_author_post(sender, instance, **kwargs):
+    stats.post_changed(
+        getattr(instance, '_previous_stamp', None),
+        stats.post_stamp(instance),
+    )
+
+
+@receiver(post_delete, sender=Post)
+def uncount_author_post(sender, instance, **kwargs):
+    stats.post_changed(stats.post_stamp(instance), None)
+
+
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Post)
+def record_export_tombstone(sender, instance, using, **kwargs):
+    export.record_deleted(sender, [instance.pk], using=using)
+
+
+@receiver(post_delete, sender=PostImageVariant)
+def delete_image_variant_file(sender, instance, **kwargs):
+    transaction.on_commit(lambda: instance.image.delete(save=False))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_all_feeds(sender, instance, **kwargs):
+    cache.bump_generations(cache.BASE_SCOPE)
+
+
+@receiver(objects_loaded)
+def publish_loaded_posts(sender, models, using, **kwargs):
+    """bulk_create не вызывает Post.save(), и is_live не выставлен."""
+    if Post in models:
+        publication.publish_due(using=using)
+
+
+@receiver(objects_loaded)
+def index_loaded_posts(sender, models, using, **kwargs):
+    if Post in models:
+        search.rebuild_index(using=using)
+
+
+@receiver(objects_loaded)
+def recount_loaded_comments(sender, models, using, **kwargs):
+    if models & {Post, Comment}:
+        counters.recount_comment_counts(using=using)
+
+
+@receiver(objects_loaded)
+def reconcile_loaded_user_stats(sender, models, using, **kwargs):
+    if models & {Post, Comment}:
+        stats.reconcile(using=using)
+
+
+@receiver(objects_loaded)
+def invalidate_feeds_after_load(sender, models, **kwargs):
+    if models & {Category, Location, Post, Comment}:
+        cache.bump_generations(cache.BASE_SCOPE)
@@ -0,0 +1,286 @@
+"""Статистика пользователей для профиля (модель UserStats).
+
+Число постов, даты первой и последней публикации и частые категории
+агрегатами на каждое открытие профиля обходятся дорого, поэтому они
+лежат в строке UserStats, которую профиль читает по первичному ключу.
+Строку поддерживают сигналы (blog.signals):
+    комментарии — атомарным UPDATE comment_count ± 1;
+    посты — разницей post_changed: пост, появившийся в профиле или
+        ушедший из него, меняет число постов, крайние даты и счётчик
+        своей категории. Правка, не меняющая видимости, даты и
+        категории, строку не трогает. Полный пересчёт автора нужен,
+        только когда разницы не хватает: ушёл первый или последний
+        пост, в тройку могла войти другая категория.
+Планировщик публикаций, фоновое удаление и массовая модерация
+(blog.moderation) пересчитывают строки своих авторов сами. Снятие
+категории с публикации и правки через QuerySet.update() догоняет
+reconcile — пересчёт пачками по id пользователей,
+manage.py reconcile_user_stats по расписанию.
+"""
+from typing import NamedTuple
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, Max, Min, Q
+from django.utils import timezone
+
+from core.jobs import job
+from .counters import subtract_counts
+from .models import Comment, Post, UserStats
+
+User = get_user_model()
+
+TOP_CATEGORIES = 3
+
+# Не больше 999: столько параметров в запросе допускает SQLite.
+RECONCILE_BATCH_SIZE = 500
+
+FIELDS = (
+    'post_count',
+    'comment_count',
+    'first_post_at',
+    'last_post_at',
+    'top_categories',
+)
+
+# Посты, видимые всем, как в views.get_base_request.
+_VISIBLE = Q(is_published=True, is_live=True, category__is_published=True)
+
+
+class PostStamp(NamedTuple):
+    """То, что видимый пост вносит в строку автора."""
+
+    author_id: int
+    pub_date: object
+    category_slug: str
+    category_title: str
+
+
+def post_stamp(post):
+    """Вклад поста в сводку автора; None — пост в ней не учитывается."""
+    if (
+        post.deleted_at is not None
+        or not (post.is_published and post.is_live)
+        or post.category_id is None
+        or not post.category.is_published
+    ):
+        return None
+    return PostStamp(
+        post.author_id, post.pub_date,
+        post.category.slug, post.category.title,
+    )
+
+
+def _compute(user_ids, using=None):
+    """{id пользователя: {поле: значение}} по постам и комментариям."""
+    actual = {
+        user_id: {
+            'post_count': 0,
+            'comment_count': 0,
+            'first_post_at': None,
+            'last_post_at': None,
+            'top_categories': [],
+        }
+        for user_id in user_ids
+    }
+    posts = Post.objects.db_manager(using).filter(
+        _VISIBLE, author__in=user_ids
+    ).order_by()
+    for row in posts.values('author').annotate(
+        post_count=Count('pk'),
+        first_post_at=Min('pub_date'),
+        last_post_at=Max('pub_date'),
+    ):
+        actual[row.pop('author')].update(row)
+    for row in posts.values(
+        'author', 'category__slug', 'category__title'
+    ).annotate(count=Count('pk')).order_by(
+        'author', '-count', 'category__title'
+    ):
+        top = actual[row['author']]['top_categories']
+        if len(top) < TOP_CATEGORIES:
+            top.append({
+                'slug': row['category__slug'],
+                'title': row['category__title'],
+                'count': row['count'],
+            })
+    for user_id, count in Comment.objects.db_manager(using).filter(
+        author__in=user_ids
+    ).values('author').annotate(count=Count('pk')).order_by().values_list(
+        'author', 'count'
+    ):
+        actual[user_id]['comment_count'] = count
+    return actual
+
+
+def refresh(user_ids, create=True, using=None):
+    """Пересчитать строки пользователей. Вернуть число исправленных.
+
+    Пользователи берутся пачками по RECONCILE_BATCH_SIZE.
+    create=False — только обновлять существующие строки: так сигналы
+    удаления не создают строку пользователю, которого удаляют каскадом.
+    using — алиас БД, по умолчанию её выбирает роутер.
+    """
+    user_ids = sorted(set(user_ids))
+    return sum(
+        _refresh_batch(
+            user_ids[start:start + RECONCILE_BATCH_SIZE], create, using
+        )
+        for start in range(0, len(user_ids), RECONCILE_BATCH_SIZE)
+    )
+
+
+def _refresh_batch(user_ids, create, using):
+    manager = UserStats.objects.db_manager(using)
+    stored = manager.in_bulk(user_ids)
+    now = timezone.now()
+    changed, missing = [], []
+    for user_id, fields in _compute(user_ids, using).items():
+        row = stored.get(user_id)
+        if row is None:
+            missing.append(UserStats(user_id=user_id, **fields))
+        elif any(
+            getattr(row, name) != value for name, value in fields.items()
+        ):
+            for name, value in fields.items():
+                setattr(row, name, value)
+            # bulk_update не ставит auto_now.
+            row.updated_at = now
+            changed.append(row)
+    manager.bulk_update(changed, (*FIELDS, 'updated_at'))
+    if not create:
+        return len(changed)
+    # Строку мог только что создать параллельный запрос — его значения
+    # посчитаны так же.
+    manager.bulk_create(missing, ignore_conflicts=True)
+    return len(changed) + len(missing)
+
+
+def _sort_key(category):
+    return -category['count'], category['title']
+
+
+def _apply(row, stamp, sign):
+    """Учесть в row пост stamp (sign=1) или его уход (sign=-1).
+
+    Вернуть False, если разницы не хватает и строку надо пересчитать.
+    """
+    row.post_count += sign
+    if row.post_count < 0:
+        return False
+    if sign > 0:
+        row.first_post_at = min(
+            filter(None, (row.first_post_at, stamp.pub_date))
+        )
+        row.last_post_at = max(
+            filter(None, (row.last_post_at, stamp.pub_date))
+        )
+    elif stamp.pub_date in (row.first_post_at, row.last_post_at):
+        return False
+    top = row.top_categories
+    full = len(top) >= TOP_CATEGORIES
+    entry = next(
+        (category for category in top
+         if category['slug'] == stamp.category_slug),
+        None,
+    )
+    if entry is None:
+        # Вне полной тройки: уход ничего не меняет, а новый пост мог
+        # поднять категорию, чьё число неизвестно. В неполной тройке
+        # все категории автора, и новая начинается с одного поста.
+        if not full:
+            if sign < 0:
+                return False
+            top.append({
+                'slug': stamp.category_slug,
+                'title': stamp.category_title,
+                'count': 1,
+            })
+        elif sign > 0:
+            return False
+    else:
+        lowest = min(category['count'] for category in top)
+        entry['count'] += sign
+        # Категории вне тройки набрали не больше последней в ней.
+        if sign < 0 and full and entry['count'] <= lowest:
+            return False
+        if not entry['count']:
+            top.remove(entry)
+    top.sort(key=_sort_key)
+    return True
+
+
+def post_changed(before, after):
+    """Учесть правку поста: before и after — его PostStamp или None.
+
+    Строка записывается, только если её не изменили с момента чтения;
+    иначе, как и когда разницы не хватает, строка пересчитывается.
+    """
+    if before == after:
+        return
+    changes = {}
+    for stamp, sign in ((before, -1), (after, 1)):
+        if stamp is not None:
+            changes.setdefault(stamp.author_id, []).append((stamp, sign))
+    for user_id, deltas in changes.items():
+        row = UserStats.objects.filter(pk=user_id).first()
+        if row is None:
+            # Строки ещё нет или автора удаляют каскадом.
+            if any(sign > 0 for _, sign in deltas):
+                refresh([user_id])
+            continue
+        read_at = row.updated_at
+        if not all(_apply(row, stamp, sign) for stamp, sign in deltas):
+            refresh([user_id])
+            continue
+        updated = UserStats.objects.filter(
+            pk=user_id, updated_at=read_at
+        ).update(
+            updated_at=timezone.now(),
+            **{name: getattr(row, name) for name in FIELDS
+               if name != 'comment_count'},
+        )
+        if not updated:
+            refresh([user_id])
+
+
+def comment_added(user_id):
+    """Учесть новый комментарий пользователя."""
+    if not UserStats.objects.filter(pk=user_id).update(
+        comment_count=F('comment_count') + 1, updated_at=timezone.now()
+    ):
+        refresh([user_id])
+
+
+def comments_removed(counts):
+    """Учесть пачку удалённых комментариев: {id пользователя: сколько}."""
+    subtract_counts(
+        UserStats.objects.all(), 'comment_count', counts,
+        updated_at=timezone.now(),
+    )
+
+
+def comment_removed(user_id):
+    """Учесть удалённый комментарий пользователя."""
+    UserStats.objects.filter(pk=user_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1, updated_at=timezone.now()
+    )
+
+
+@job
+def reconcile(batch_size=RECONCILE_BATCH_SIZE, using=None):
+    """Сверить UserStats всех пользователей пачками по диапазонам id.
+
+    Возвращает число исправленных и созданных строк.
+    """
+    fixed = 0
+    last_pk = 0
+    while True:
+        user_ids = list(
+            User.objects.db_manager(using).filter(pk__gt=last_pk).order_by(
+                'pk'
+            ).values_list('pk', flat=True)[:batch_size]
+        )
+        if not user_ids:
+            return fixed
+        fixed += refresh(user_ids, using=using)
+        last_pk = user_ids[-1]
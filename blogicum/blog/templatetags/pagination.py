@@ -0,0 +1,33 @@
+from django import template
+
+register = template.Library()
+
+PAGE_WINDOW_ON_EACH_SIDE = 2
+PAGE_WINDOW_ON_ENDS = 1
+
+
+@register.simple_tag
+def page_window(page_obj, on_each_side=PAGE_WINDOW_ON_EACH_SIDE,
+                on_ends=PAGE_WINDOW_ON_ENDS):
+    """Номера страниц вокруг текущей и по краям, пропуски — многоточие.
+
+    Число ссылок не зависит от общего количества страниц.
+    """
+    return list(page_obj.paginator.get_elided_page_range(
+        page_obj.number, on_each_side=on_each_side, on_ends=on_ends
+    ))
+
+
+@register.simple_tag(takes_context=True)
+def query_string(context, **params):
+    """GET-параметры текущего запроса с заменой переданных.
+
+    Нужна, чтобы ссылки пагинатора не теряли, например, поисковый запрос.
+    """
+    query = context['request'].GET.copy()
+    for key, value in params.items():
+        if value is None:
+            query.pop(key, None)
+        else:
+            query[key] = value
+    return f'?{query.urlencode()}'
@@ -0,0 +1,49 @@
+"""Карточки постов из кэша фрагментов.
+
+Ключ карточки — id поста и версия: updated_at поста, имя автора и
+поколение области base из blog.cache (её увеличивают правки категорий
+и локаций). Версия меняется вместе с любым полем, видимым на карточке,
+поэтому карточки не удаляются поштучно: старые вытесняются по таймауту.
+"""
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from blog.cache import BASE_SCOPE, get_feed_cache, get_generations
+
+register = template.Library()
+
+CARD_TEMPLATE = 'includes/post_card.html'
+
+
+def card_key(post, base_generation):
+    version = ':'.join((
+        post.updated_at.isoformat(),
+        post.author.username,
+        str(base_generation),
+    ))
+    digest = hashlib.md5(version.encode()).hexdigest()
+    return f'feed:card:{post.pk}:{digest}'
+
+
+@register.simple_tag
+def post_cards(posts):
+    """HTML карточек в порядке posts; кэш читается одним get_many."""
+    posts = list(posts)
+    if not posts:
+        return []
+    cache = get_feed_cache()
+    base_generation, = get_generations((BASE_SCOPE,))
+    keys = [card_key(post, base_generation) for post in posts]
+    found = cache.get_many(keys)
+    missing = {}
+    card_template = get_template(CARD_TEMPLATE)
+    for key, post in zip(keys, posts):
+        if key not in found:
+            missing[key] = found[key] = card_template.render({'post': post})
+    if missing:
+        cache.set_many(missing, settings.POST_CARD_CACHE_TIMEOUT)
+    return [mark_safe(found[key]) for key in keys]
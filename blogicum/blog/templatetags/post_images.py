@@ -0,0 +1,28 @@
+from django import template
+
+from blog.images import srcset
+from blog.models import PostImageVariant
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post):
+    """Фото карточки с srcset; варианты берутся из prefetch_related."""
+    variants = [
+        variant for variant in post.image_variants.all()
+        if variant.source == post.image.name
+    ]
+    jpeg = [v for v in variants if v.format == PostImageVariant.JPEG]
+    webp = [v for v in variants if v.format == PostImageVariant.WEBP]
+    context = {'post': post}
+    if jpeg:
+        largest = jpeg[-1]
+        context.update(
+            src=largest.image.url,
+            width=largest.width,
+            height=largest.height,
+            jpeg_srcset=srcset(jpeg),
+            webp_srcset=srcset(webp),
+        )
+    return context
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth import get_user_model
 
@@ -8,17 +9,25 @@ from .views import (
     ProfileUpdateView,
     PostDetailView)
 
+if settings.ASYNC_VIEWS:
+    from .async_views import (
+        category_posts, comments_fragment, index, post_detail
+    )
+else:
+    from .views import category_posts, comments_fragment, index
+    post_detail = PostDetailView.as_view()
 
 app_name = 'blog'
 
 User = get_user_model()
 
 urlpatterns = [
-    path('', views.index, name='index'),
-    path('posts/<int:post_id>/', PostDetailView.as_view(), name='post_detail'),
+    path('', index, name='index'),
+    path('search/', views.search, name='search'),
+    path('posts/<int:post_id>/', post_detail, name='post_detail'),
     path(
         'category/<slug:category_slug>/',
-        views.category_posts,
+        category_posts,
         name='category_posts'
     ),
     path('posts/create/', PostCreateView.as_view(), name='create_post'),
@@ -32,6 +41,11 @@ urlpatterns = [
         ProfileUpdateView.as_view(),
         name='edit_profile'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        comments_fragment,
+        name='comments'
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment,
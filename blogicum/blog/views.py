@@ -1,6 +1,5 @@
 """Файл для обработки запросов."""
 from django.shortcuts import render, get_object_or_404, redirect
-from django.utils import timezone
 from django.views.generic import (
     DetailView,
     ListView,
@@ -8,17 +7,31 @@ from django.views.generic import (
     UpdateView,
 )
 from django.contrib.auth import get_user_model
-from django.core.paginator import Paginator
 from django.urls import reverse_lazy
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.forms import UserChangeForm
-from django.db.models import Count
-from django.http import Http404
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import transaction
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
 from django.conf import settings
-
-from blog.models import Post, Category, Comment
+from django.core.paginator import Paginator
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+
+from core.routers import primary_reads
+from blog.models import Post, Category, Comment, UserStats
+from . import deletion
+from .cache import INDEX_SCOPE, cache_feed_page, category_scope
+from .conditional import (
+    category_validators,
+    conditional_page,
+    post_validators,
+    profile_validators,
+)
 from .forms import PostForm, CommentForm
+from .pagination import CURSOR_QUERY_PARAM, KeysetPaginator
+from .search import search_posts
 
 User = get_user_model()
 
@@ -27,18 +40,15 @@ def get_base_request(add_conditions=False, add_sorting=False):
     """Базовая функция, возвращающая список с определенными условиями."""
     post_set = Post.objects.select_related(
         'author', 'location', 'category'
-    )
+    ).prefetch_related('image_variants')
     if add_conditions:
-        now = timezone.now()
         post_set = post_set.filter(
             is_published=True,
             category__is_published=True,
-            pub_date__lte=now,
+            is_live=True,
         )
     if add_sorting:
-        post_set = post_set.order_by(
-            '-pub_date'
-        ).annotate(comment_count=Count('comments'))
+        post_set = post_set.order_by('-pub_date')
     return post_set
 
 
@@ -59,6 +69,7 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
+@method_decorator(conditional_page(profile_validators), name='get')
 class ProfileDetailView(ListView):
     """CBV-класс, показывающий данные пользователя."""
 
@@ -73,8 +84,22 @@ class ProfileDetailView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['profile'] = self.get_object()
+        # Сводку держат в актуальном виде сигналы (blog.stats): здесь
+        # только чтение строки по первичному ключу.
+        context['stats'] = UserStats.objects.filter(
+            pk=context['profile'].pk
+        ).first()
         return context
 
+    def paginate_queryset(self, queryset, page_size):
+        page_obj = paginate_view(self.request, queryset, page_size)
+        return (
+            page_obj.paginator,
+            page_obj,
+            page_obj.object_list,
+            page_obj.has_other_pages(),
+        )
+
     def get_queryset(self):
         user = self.get_object()
 
@@ -107,12 +132,13 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
 def add_comment(request, post_id):
     """Функция для добавления комментария."""
     post = get_object_or_404(Post, pk=post_id)
-    form = CommentForm(request.POST)
+    form = CommentForm(request.POST, author=request.user)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        with transaction.atomic():
+            comment.save()
 
     return redirect('blog:post_detail', post_id=post.id)
 
@@ -129,7 +155,8 @@ def delete_comment(request, post_id, comment_id):
         'comment': comment_obj
     }
     if request.method == 'POST':
-        comment_obj.delete()
+        with transaction.atomic():
+            comment_obj.delete()
         return redirect('blog:profile', username=request.user.username)
     return render(request, template_name, context)
 
@@ -148,6 +175,7 @@ def edit_comment(request, post_id, comment_id):
     return render(request, 'blog/comment.html', context)
 
 
+@method_decorator(conditional_page(post_validators), name='get')
 class PostDetailView(DetailView):
     """CBV-класс, показывающий данные публикации."""
 
@@ -164,29 +192,58 @@ class PostDetailView(DetailView):
         )
 
     def get_object(self, queryset=None):
-        post = super().get_object(queryset)
-
-        is_author = post.author == self.request.user
-        is_published = post.is_published
-        is_category_published = post.category and post.category.is_published
-        is_future_post = post.pub_date > timezone.now()
-
-        if not (is_author or is_published and (
-            is_category_published or not is_future_post)
-        ):
-            raise Http404('Вы не можете просматривать этот пост.')
-
+        try:
+            post = super().get_object(queryset)
+        except Http404:
+            # Пост мог появиться после последней синхронизации реплики.
+            with primary_reads():
+                post = super().get_object(queryset)
+        check_post_access(post, self.request.user)
         return post
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm(self.request.GET or None)
-        context['comments'] = self.object.comments.select_related(
-            'author'
-        ).order_by('created_at')
+        context['comments'] = paginate_comments(self.request, self.object)
         return context
 
 
+def check_post_access(post, user):
+    """Бросить 404, если пользователю нельзя видеть публикацию."""
+    is_author = post.author_id == user.pk
+    is_published = post.is_published
+    is_category_published = post.category and post.category.is_published
+    is_future_post = not post.is_live
+
+    if not (is_author or is_published and (
+        is_category_published or not is_future_post)
+    ):
+        raise Http404('Вы не можете просматривать этот пост.')
+
+
+def paginate_comments(request, post):
+    """Одна порция ветки комментариев, от старых к новым."""
+    paginator = KeysetPaginator(
+        post.comments.select_related('author'),
+        settings.COUNT_COMMENTS_ON_PAGE,
+        ordering=('created_at', 'id'),
+    )
+    return paginator.get_page(request.GET.get(CURSOR_QUERY_PARAM))
+
+
+def comments_fragment(request, post_id):
+    """HTML следующей порции комментариев для подгрузки на странице поста."""
+    post = get_object_or_404(
+        Post.objects.select_related('category'), pk=post_id
+    )
+    check_post_access(post, request.user)
+    context = {
+        'post': post,
+        'comments': paginate_comments(request, post),
+    }
+    return render(request, 'includes/comment_list.html', context)
+
+
 @login_required
 def edit_post(request, post_id):
     """Функция для редактирования публикации."""
@@ -219,7 +276,8 @@ def post_delete(request, post_id):
     }
 
     if request.method == 'POST':
-        post_obj.delete()
+        # Комментарии удаляются в фоне пачками, пост скрыт уже сейчас.
+        deletion.delete_post(post_obj)
         return redirect('blog:index')
     return render(request, template_name, context)
 
@@ -229,13 +287,15 @@ def paginate_view(
     some_object,
     paginate_value=settings.COUNT_OBJECT_ON_PAGE
 ):
-    paginator = Paginator(some_object, paginate_value)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    """Курсорная пагинация ленты по ключу (pub_date, id)."""
+    paginator = KeysetPaginator(some_object, paginate_value)
+    cursor = request.GET.get(CURSOR_QUERY_PARAM)
+    page_obj = paginator.get_page(cursor)
 
     return page_obj
 
 
+@cache_feed_page(lambda request: INDEX_SCOPE)
 def index(request):
     """Функция для запроса главной страницы."""
     template_name = 'blog/index.html'
@@ -247,6 +307,12 @@ def index(request):
     return render(request, template_name, context)
 
 
+# Кэш снаружи: попадание для анонима обходится без SQL и само отвечает
+# 304 по сохранённым с телом ETag и Last-Modified.
+@cache_feed_page(
+    lambda request, category_slug: category_scope(category_slug)
+)
+@conditional_page(category_validators)
 def category_posts(request, category_slug):
     """Функция для запроса страницы с ключом category_slug."""
     template_name = 'blog/category.html'
@@ -264,3 +330,47 @@ def category_posts(request, category_slug):
         'page_obj': page_obj,
     }
     return render(request, template_name, context)
+
+
+def search(request):
+    """Поиск по заголовкам и текстам видимых постов, по релевантности."""
+    template_name = 'blog/search.html'
+    query = request.GET.get('q', '').strip()
+    post_list = search_posts(get_base_request(add_conditions=True), query)
+    paginator = Paginator(post_list, settings.COUNT_OBJECT_ON_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, template_name, context)
+
+
+@staff_member_required
+def export_dataset(request, dataset):
+    """Потоковая выгрузка постов или комментариев, только для staff."""
+    # Нужна редко, а csv и zlib не стоит грузить каждому процессу.
+    from . import export
+
+    if dataset not in export.DATASETS:
+        raise Http404
+    output_format = request.GET.get('format', export.JSONL)
+    if output_format not in export.FORMATS:
+        return HttpResponseBadRequest('format: jsonl или csv')
+    compress = request.GET.get('gzip') == '1'
+    response = StreamingHttpResponse(
+        export.export(
+            dataset,
+            output_format=output_format,
+            compress=compress,
+            incremental=request.GET.get('incremental') == '1',
+            watermark_name=request.GET.get('watermark'),
+        ),
+        content_type=(
+            'application/gzip' if compress
+            else export.CONTENT_TYPES[output_format]
+        ),
+    )
+    name = export.filename(dataset, output_format, compress, timezone.now())
+    response['Content-Disposition'] = f'attachment; filename="{name}"'
+    return response
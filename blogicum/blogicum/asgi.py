@@ -9,8 +9,13 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+from blogicum.startup import startup_gc
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+with startup_gc():
+    from django.core.asgi import get_asgi_application
 
-application = get_asgi_application()
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+    # Под ASGI читающие представления работают в цикле событий.
+    os.environ.setdefault('BLOGICUM_ASYNC_VIEWS', '1')
+
+    application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -37,12 +38,15 @@ CSRF_FAILURE_VIEW = 'pages.views.csrf_fail'
 
 COUNT_OBJECT_ON_PAGE = 10
 
+COUNT_COMMENTS_ON_PAGE = 50
+
 # Application definition
 
 INSTALLED_APPS = [
     'pages.apps.PagesConfig',
     'blog.apps.BlogConfig',
     'core.apps.CoreConfig',
+    'benchmarks.apps.BenchmarksConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -53,6 +57,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.PublishDueMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,8 +66,38 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
 ]
 
+# Замеры стоимости представлений (core.metrics, core.middleware).
+QUERY_METRICS_ENABLED = True
+
+QUERY_METRICS_BUFFER_SIZE = 10000
+
+# Куда периодически сохранять буфер для manage.py query_report; каждый
+# процесс пишет свой файл рядом: query_metrics.<pid>.json.
+QUERY_METRICS_SNAPSHOT_PATH = BASE_DIR / 'query_metrics.json'
+
+QUERY_METRICS_SNAPSHOT_EVERY = 100
+
+# Бюджеты SQL-запросов по имени URL; 'log' или 'raise' при превышении.
+QUERY_BUDGETS = {
+    'blog:index': 6,
+    'blog:category_posts': 6,
+    'blog:profile': 8,
+    'blog:post_detail': 6,
+    'blog:comments': 4,
+    'blog:search': 6,
+    # Действия модерации ещё пересчитывают UserStats авторов (blog.stats).
+    'admin:blog_post_changelist': 14,
+    # Очистка комментариев: горсть запросов на пачку delete_comments.
+    'admin:blog_comment_changelist': 16,
+}
+
+QUERY_BUDGET_DEFAULT = None
+
+QUERY_BUDGET_ACTION = 'log'
+
 ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -72,16 +108,77 @@ STATICFILES_DIRS = [
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Уменьшенные копии фото публикаций (blog.images).
+POST_IMAGE_WIDTHS = (320, 640, 1280)
+
+POST_IMAGE_QUALITY = 80
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
+# Очередь исходящей почты (core.mail). С MAIL_OUTBOX_BACKGROUND письма
+# отправляет задача очереди core.jobs, без него — manage.py drain_outbox.
+MAIL_OUTBOX_BACKGROUND = True
+
+MAIL_OUTBOX_BATCH_SIZE = 100
+
+MAIL_OUTBOX_MAX_ATTEMPTS = 5
+
+# Письмо, взятое отправителем дольше этого, считается брошенным.
+MAIL_OUTBOX_LOCK_TIMEOUT = 60 * 15
+
+# Одинаковые оповещения об одном авторе за это время склеиваются.
+MAIL_OUTBOX_COALESCE_WINDOW = 60 * 60
+
+# Фоновые задачи (core.jobs). Выполняет manage.py run_jobs; при
+# JOBS_IN_PROCESS — ещё и поток внутри веб-процесса (для разработки).
+JOBS_IN_PROCESS = False
+
+JOBS_WORKERS = 4
+
+# 'thread' или 'process'.
+JOBS_POOL = 'thread'
+
+JOBS_POLL_INTERVAL = 5
+
+JOBS_MAX_ATTEMPTS = 5
+
+# Пауза перед повтором, секунды: удваивается с каждой попыткой.
+JOBS_RETRY_BACKOFF = 10
+
+JOBS_RETRY_BACKOFF_MAX = 60 * 60
+
+# Задача дольше этого в состоянии running считается брошенной.
+# Долгие задачи продлевают захват через core.jobs.report_progress.
+JOBS_LOCK_TIMEOUT = 60 * 15
+
+# Сколько строк удаляет одна транзакция фонового удаления постов и
+# пользователей (blog.deletion): столько же держится в памяти, и столько
+# SQLite держит блокировку записи.
+DELETION_BATCH_SIZE = 500
+
+# Инкрементальная выгрузка (blog.export) не берёт строки моложе этого,
+# секунды: транзакция, начатая раньше, успевает закоммитить свои.
+EXPORT_SAFETY_WINDOW = 60 * 5
+
+# Сколько секунд хранятся отметки об удалённых строках для выгрузки.
+EXPORT_TOMBSTONE_RETENTION = 60 * 60 * 24 * 30
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': (TEMPLATES_DIR,),
-        'APP_DIRS': True,
         'OPTIONS': {
+            # В продакшене шаблоны компилируются один раз на процесс.
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -94,17 +191,100 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
+# Асинхронные версии читающих представлений (blog.async_views).
+# blogicum/asgi.py включает их через переменную окружения.
+ASYNC_VIEWS = os.environ.get('BLOGICUM_ASYNC_VIEWS') == '1'
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # Обёртка над django.db.backends.sqlite3: PRAGMA при подключении
+        # и BEGIN IMMEDIATE для транзакций (см. core/backends/sqlite3).
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'busy_timeout': 5000,
+                'cache_size': -20000,
+                'mmap_size': 256 * 1024 * 1024,
+                'temp_store': 'MEMORY',
+            },
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+    # Локальная реплика — копия db.sqlite3 (manage.py sync_replica).
+    # В тестах это зеркало default.
+    'replica': {
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+# Чтение с реплик (core.routers, core.middleware).
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+# Алиасы реплик для чтения; пустой список — всё читается из default.
+DATABASE_REPLICAS = ['replica']
+
+# Реплика, отставшая больше чем на столько секунд, не читается: запросы
+# идут в default. Файловую реплику освежает manage.py sync_replica
+# --every N с N заметно меньше этого предела.
+DATABASE_REPLICA_MAX_LAG = 30
+
+# Представления, которым можно читать с реплик.
+DATABASE_REPLICA_VIEWS = (
+    'blog:index',
+    'blog:category_posts',
+    'blog:post_detail',
+    'blog:profile',
+)
+
+# Приложения, чьи модели можно читать с реплик.
+DATABASE_REPLICA_APPS = ('blog',)
+
+# Сколько секунд после своей записи пользователь читает из default.
+DATABASE_PRIMARY_PIN_SECONDS = 10
+
+DATABASE_PRIMARY_PIN_COOKIE = 'db_primary_pin'
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Кэш страниц лент для анонимных посетителей (blog.cache).
+FEED_CACHE_ALIAS = 'default'
+
+FEED_CACHE_TIMEOUT = 60 * 15
+
+# Отрисованные карточки постов (blog/templatetags/post_cards.py).
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Планировщик отложенных публикаций (blog.publication). Вне процесса
+# веб-сервера его запускает manage.py publish_scheduled --loop.
+PUBLICATION_SCHEDULER_IN_PROCESS = False
+
+PUBLICATION_SCHEDULER_MAX_SLEEP = 60
+
+# Открывать созревшие посты и при обработке запросов
+# (blog.middleware.PublishDueMiddleware), даже если планировщик не
+# запущен. Пост появляется не позже чем через
+# PUBLICATION_DUE_CHECK_INTERVAL секунд после pub_date.
+PUBLICATION_ON_REQUEST = True
+
+PUBLICATION_DUE_CHECK_INTERVAL = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
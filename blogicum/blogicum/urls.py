@@ -6,8 +6,17 @@ from django.contrib.auth.forms import UserCreationForm
 from django.conf.urls.static import static
 from django.conf import settings
 
+from blog.views import export_dataset
+from core.views import query_report
+
 
 urlpatterns = [
+    path('admin/query-report/', query_report, name='query_report'),
+    path(
+        'admin/export/<str:dataset>/',
+        export_dataset,
+        name='export_dataset'
+    ),
     path('admin/', admin.site.urls),
     path('', include('blog.urls')),
     path('pages/', include('pages.urls')),
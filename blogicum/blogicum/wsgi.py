@@ -9,8 +9,11 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/wsgi/
 
 import os
 
-from django.core.wsgi import get_wsgi_application
+from blogicum.startup import startup_gc
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+with startup_gc():
+    from django.core.wsgi import get_wsgi_application
 
-application = get_wsgi_application()
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+
+    application = get_wsgi_application()
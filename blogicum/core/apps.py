@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        if settings.QUERY_METRICS_ENABLED:
+            # До первого запроса: под ASGI запросы к БД идут из другого
+            # потока, чем тот, где собирается цепочка middleware.
+            from . import metrics
+            metrics.install_query_counter()
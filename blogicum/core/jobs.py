@@ -0,0 +1,409 @@
+"""Очередь фоновых задач в таблице Job.
+
+Код запроса вызывает enqueue(функция, *аргументы): строка Job пишется
+в той же транзакции, что и данные, ради которых задача ставится, —
+откат запроса откатывает и её. Выполняет задачи manage.py run_jobs
+(или поток внутри веб-процесса при JOBS_IN_PROCESS) пулом потоков
+или процессов.
+
+Задача — функция уровня модуля, помеченная декоратором job; в строке
+хранится её путь импорта и аргументы в JSON. Исполнитель забирает
+пачку задач одним запросом:
+    PostgreSQL — SELECT ... FOR UPDATE SKIP LOCKED, исполнители не
+        ждут друг друга и не берут одну задачу дважды;
+    SQLite — один UPDATE ... WHERE id IN (SELECT ... LIMIT n) с меткой
+        исполнителя: запись в SQLite сериализуется блокировкой БД, так
+        что выборка и захват атомарны.
+Упавшая задача повторяется с экспоненциальной паузой, пока не
+исчерпает max_attempts. Задача, чей исполнитель умер, возвращается в
+очередь через JOBS_LOCK_TIMEOUT; долгая задача, сообщающая о ходе
+работы через report_progress, этим же продлевает свой захват. Итог
+задачи записывается только под меткой захвата (locked_by): если
+задачу уже вернули в очередь и взял другой исполнитель, прежний
+ничего не перезаписывает, а исход считается потерей захвата (LOST).
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import (
+    IntegrityError, close_old_connections, connections, transaction,
+)
+from django.db.models import Avg, Count, F, Max, Min, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+THREAD_POOL = 'thread'
+PROCESS_POOL = 'process'
+POOLS = (THREAD_POOL, PROCESS_POOL)
+
+# Исходы выполнения для метрик исполнителя.
+SUCCEEDED = 'succeeded'
+RETRIED = 'retried'
+FAILED = 'failed'
+LOST = 'lost'
+
+# Задача, которую выполняет текущий поток (для report_progress).
+_running = threading.local()
+
+
+def job(func):
+    """Разрешить ставить функцию в очередь; имя задачи — путь импорта."""
+    func.job_name = f'{func.__module__}.{func.__qualname__}'
+    return func
+
+
+def enqueue(func, *args, priority=0, delay=None, unique=False,
+            max_attempts=None):
+    """Поставить func(*args) в очередь и вернуть Job.
+
+    delay — секунды или timedelta до запуска. unique — не ставить
+    задачу, если такая же (имя и аргументы) уже ждёт в очереди; гонку
+    параллельных вызовов решает частичный уникальный индекс
+    job_unique_queued.
+    """
+    name = getattr(func, 'job_name', None)
+    if name is None:
+        raise ValueError(f'{func!r} не помечена декоратором core.jobs.job')
+    args = list(args)
+    unique_key = _unique_key(name, args) if unique else ''
+    if unique:
+        waiting = _waiting(unique_key)
+        if waiting is not None:
+            return waiting
+    if isinstance(delay, (int, float)):
+        delay = timedelta(seconds=delay)
+    try:
+        with transaction.atomic():
+            queued = Job.objects.create(
+                name=name,
+                args=args,
+                priority=priority,
+                run_at=timezone.now() + (delay or timedelta()),
+                max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+                unique_key=unique_key,
+            )
+    except IntegrityError:
+        if not unique:
+            raise
+        # Такую же задачу только что поставил параллельный запрос.
+        return _waiting(unique_key)
+    transaction.on_commit(wake_worker)
+    return queued
+
+
+def _unique_key(name, args):
+    payload = json.dumps([name, args], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _waiting(unique_key):
+    return Job.objects.filter(
+        unique_key=unique_key, status=Job.QUEUED
+    ).first()
+
+
+def _resolve(name):
+    func = import_string(name)
+    # В БД может оказаться что угодно: исполняются только задачи.
+    if getattr(func, 'job_name', None) != name:
+        raise LookupError(f'{name} не помечена декоратором core.jobs.job')
+    return func
+
+
+def retry_delay(attempts):
+    """Пауза перед следующей попыткой: удвоение с разбросом ±20 %."""
+    delay = min(
+        settings.JOBS_RETRY_BACKOFF * 2 ** max(attempts - 1, 0),
+        settings.JOBS_RETRY_BACKOFF_MAX,
+    )
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def _ready(now):
+    return Job.objects.filter(
+        status=Job.QUEUED, run_at__lte=now
+    ).order_by('-priority', 'run_at', 'pk')
+
+
+def claim(limit, worker='', now=None):
+    """Забрать до limit готовых задач и вернуть их списком."""
+    now = now or timezone.now()
+    token = f'{worker}:{uuid.uuid4().hex}' if worker else uuid.uuid4().hex
+    taken = dict(
+        status=Job.RUNNING,
+        locked_by=token,
+        locked_at=now,
+        started_at=now,
+        attempts=F('attempts') + 1,
+        # Взятая задача больше не ждёт: такую же снова можно ставить.
+        unique_key='',
+    )
+    ready = _ready(now)
+    if connections[ready.db].features.has_select_for_update_skip_locked:
+        with transaction.atomic(using=ready.db):
+            ids = list(ready.select_for_update(skip_locked=True).values_list(
+                'pk', flat=True
+            )[:limit])
+            Job.objects.filter(pk__in=ids).update(**taken)
+    else:
+        Job.objects.filter(
+            pk__in=ready.values('pk')[:limit], status=Job.QUEUED
+        ).update(**taken)
+    return list(
+        Job.objects.filter(status=Job.RUNNING, locked_by=token).order_by(
+            '-priority', 'run_at', 'pk'
+        )
+    )
+
+
+def release_stale(now=None):
+    """Вернуть в очередь задачи, чей исполнитель пропал. Вернуть число."""
+    now = now or timezone.now()
+    return Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT),
+    ).update(status=Job.QUEUED, locked_by='', run_at=now)
+
+
+def _settle(job, **fields):
+    """Записать итог задачи, если она всё ещё за этим исполнителем.
+
+    Вернуть False, если захват потерян: release_stale вернул задачу в
+    очередь, и её, возможно, уже выполняет другой исполнитель.
+    """
+    if Job.objects.filter(
+        pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by
+    ).update(**fields):
+        return True
+    logger.warning(
+        'Задача %s потеряла захват: итог этого исполнителя не записан', job
+    )
+    return False
+
+
+def _failed(job, error):
+    now = timezone.now()
+    message = f'{type(error).__name__}: {error}'
+    if job.attempts < job.max_attempts:
+        if not _settle(
+            job,
+            status=Job.QUEUED,
+            locked_by='',
+            run_at=now + retry_delay(job.attempts),
+            last_error=message,
+        ):
+            return LOST
+        logger.warning(
+            'Задача %s упала (попытка %s из %s): %s',
+            job, job.attempts, job.max_attempts, message,
+        )
+        return RETRIED
+    if not _settle(
+        job, status=Job.FAILED, finished_at=now, last_error=message
+    ):
+        return LOST
+    logger.error('Задача %s не удалась: %s', job, message)
+    return FAILED
+
+
+def report_progress(done, total):
+    """Записать ход текущей задачи в Job.progress и продлить её захват.
+
+    Вне исполнителя (задачу вызвали напрямую) ничего не делает.
+    """
+    current = getattr(_running, 'job', None)
+    if current is None:
+        return
+    Job.objects.filter(pk=current.pk, locked_by=current.locked_by).update(
+        progress={'done': done, 'total': total}, locked_at=timezone.now()
+    )
+
+
+def execute(job):
+    """Выполнить взятую задачу. Вернуть (имя, исход, секунды)."""
+    close_old_connections()
+    started = time.perf_counter()
+    _running.job = job
+    try:
+        _resolve(job.name)(*job.args)
+    except Exception as error:
+        outcome = _failed(job, error)
+    else:
+        outcome = SUCCEEDED if _settle(
+            job, status=Job.DONE, finished_at=timezone.now(), last_error=''
+        ) else LOST
+    finally:
+        _running.job = None
+        close_old_connections()
+    return job.name, outcome, time.perf_counter() - started
+
+
+class WorkerMetrics:
+    """Счётчики исполнителя по типам задач."""
+
+    def __init__(self):
+        self.by_name = {}
+
+    def add(self, name, outcome, seconds):
+        row = self.by_name.setdefault(name, {
+            SUCCEEDED: 0, RETRIED: 0, FAILED: 0, LOST: 0,
+            'runs': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+        })
+        row[outcome] += 1
+        row['runs'] += 1
+        row['seconds'] += seconds
+        row['max_seconds'] = max(row['max_seconds'], seconds)
+
+    def rows(self):
+        """[(имя, выполнено, повторов, отказов, потерь, ср. мс, макс. мс)]."""
+        return [
+            (
+                name, row[SUCCEEDED], row[RETRIED], row[FAILED], row[LOST],
+                row['seconds'] * 1000 / row['runs'],
+                row['max_seconds'] * 1000,
+            )
+            for name, row in sorted(self.by_name.items())
+        ]
+
+
+class Worker:
+    """Цикл исполнителя: забирает задачи и раздаёт их пулу.
+
+    Задач в работе не больше, чем workers: новые забираются только
+    под свободные места пула, остальные ждут в таблице.
+    """
+
+    def __init__(self, workers=None, pool=None, poll_interval=None):
+        self.workers = workers or settings.JOBS_WORKERS
+        self.pool = pool or settings.JOBS_POOL
+        if self.pool not in POOLS:
+            raise ValueError(f'Пул задач должен быть одним из {POOLS}')
+        self.poll_interval = (
+            settings.JOBS_POLL_INTERVAL if poll_interval is None
+            else poll_interval
+        )
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self.metrics = WorkerMetrics()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+
+    def _executor(self):
+        if self.pool == PROCESS_POOL:
+            # Не на старте: модуль импортирует каждый веб-процесс.
+            from concurrent.futures import ProcessPoolExecutor
+            from multiprocessing import get_context
+
+            import django
+
+            # spawn, а не fork: дочерний процесс не должен унаследовать
+            # открытые соединения с БД родителя.
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=get_context('spawn'),
+                # Сам инициализатор распаковывается до setup(), поэтому
+                # он из django, а не из модуля с моделями.
+                initializer=django.setup,
+                initargs=(False,),
+            )
+        return ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='job'
+        )
+
+    def _collect(self, finished):
+        for future in finished:
+            try:
+                self.metrics.add(*future.result())
+            except Exception:
+                logger.exception('Сбой исполнителя задач')
+
+    def run(self, until_empty=False):
+        """Работать до stop(); until_empty — выйти, когда очередь пуста."""
+        in_flight = set()
+        with self._executor() as executor:
+            while not self._stopping.is_set():
+                release_stale()
+                free = self.workers - len(in_flight)
+                for queued in claim(free, self.name) if free else ():
+                    in_flight.add(executor.submit(execute, queued))
+                if until_empty and not in_flight:
+                    break
+                self._wait(in_flight)
+            self._collect(wait(in_flight)[0])
+
+    def _wait(self, in_flight):
+        """Ждать места в пуле, новых задач или таймера опроса."""
+        self._wakeup.clear()
+        if in_flight:
+            finished, pending = wait(
+                in_flight, self.poll_interval, FIRST_COMPLETED
+            )
+            in_flight.intersection_update(pending)
+            self._collect(finished)
+        else:
+            self._wakeup.wait(self.poll_interval)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def wake_worker():
+    """Разбудить исполнитель внутри процесса, при необходимости запустив."""
+    global _worker
+    if not settings.JOBS_IN_PROCESS:
+        return
+    with _worker_lock:
+        if _worker is None:
+            _worker = Worker(pool=THREAD_POOL)
+            threading.Thread(
+                target=_worker.run, name='jobs', daemon=True
+            ).start()
+    _worker.wake()
+
+
+def stats(now=None):
+    """Сводка очереди по типам задач из таблицы Job."""
+    now = now or timezone.now()
+    rows = Job.objects.values('name').annotate(
+        queued=Count('pk', filter=Q(status=Job.QUEUED)),
+        running=Count('pk', filter=Q(status=Job.RUNNING)),
+        done=Count('pk', filter=Q(status=Job.DONE)),
+        failed=Count('pk', filter=Q(status=Job.FAILED)),
+        retries=Count('pk', filter=Q(attempts__gt=1)),
+        oldest_due=Min('run_at', filter=Q(
+            status=Job.QUEUED, run_at__lte=now
+        )),
+        average_run=Avg(
+            F('finished_at') - F('started_at'), filter=Q(status=Job.DONE)
+        ),
+        last_finished=Max('finished_at'),
+    ).order_by('name')
+    return [
+        {
+            **row,
+            # Насколько очередь отстаёт: сколько ждёт самая старая задача.
+            'lag': now - row['oldest_due'] if row['oldest_due'] else None,
+        }
+        for row in rows
+    ]
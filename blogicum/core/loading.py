@@ -0,0 +1,232 @@
+"""Потоковая загрузка фикстур формата dumpdata.
+
+В отличие от loaddata файл не читается целиком: элементы JSON-массива
+разбираются по одному, раскладываются по буферам моделей и вставляются
+через bulk_create. В памяти одновременно держится не больше batch_size
+объектов на модель, сколько бы строк ни было в файле.
+
+bulk_create не вызывает save() и сигналы моделей, поэтому по окончании
+загрузки отправляется сигнал objects_loaded — приложения досчитывают
+по нему денормализованные поля и сбрасывают кэши.
+"""
+import gzip
+import json
+import time
+from graphlib import CycleError, TopologicalSorter
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .signals import objects_loaded
+
+LOAD_BATCH_SIZE = 2000
+READ_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\r\n'
+
+
+class _ArrayReader:
+    """Окно в поток с JSON: дочитывает куски по мере разбора."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.decoder = json.JSONDecoder()
+        self.buffer, self.position, self.eof = '', 0, False
+
+    def _refill(self):
+        if self.eof:
+            raise ValueError('Файл оборвался внутри JSON-массива.')
+        chunk = self.stream.read(READ_SIZE)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        self.eof = not chunk
+
+    def peek(self):
+        """Следующий символ после пробелов."""
+        while True:
+            while (self.position < len(self.buffer)
+                   and self.buffer[self.position] in _WHITESPACE):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            self._refill()
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f'Ожидался {char!r}, найдено {found!r}.')
+        self.position += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                item, end = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._refill()
+                continue
+            # Число на границе куска могло прочитаться не полностью.
+            if end < len(self.buffer) or self.eof:
+                self.position = end
+                return item
+            self._refill()
+
+
+def iter_json_array(stream):
+    """Поочерёдно выдать элементы JSON-массива верхнего уровня."""
+    reader = _ArrayReader(stream)
+    reader.expect('[')
+    if reader.peek() == ']':
+        return
+    while True:
+        yield reader.value()
+        if reader.peek() == ']':
+            return
+        reader.expect(',')
+
+
+def open_fixture(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+def dependency_order(models):
+    """Модели так, чтобы цели внешних ключей шли раньше ссылающихся."""
+    graph = {
+        model: {
+            field.related_model
+            for field in model._meta.concrete_fields
+            if field.many_to_one or field.one_to_one
+            if field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
+    try:
+        return list(TopologicalSorter(graph).static_order())
+    except CycleError:
+        # Взаимные ссылки: порядок не важен, ключи проверяются в конце.
+        return list(models)
+
+
+def _matches(label, excluded):
+    app_label = label.split('.')[0]
+    return label in excluded or app_label in excluded
+
+
+class ModelLoadStats:
+    def __init__(self):
+        self.rows = 0
+        self.seconds = 0.0
+
+    @property
+    def rate(self):
+        return self.rows / max(self.seconds, 1e-9)
+
+
+class BulkLoader:
+    """Загрузка одного или нескольких файлов в одной транзакции."""
+
+    def __init__(self, using=DEFAULT_DB_ALIAS, batch_size=LOAD_BATCH_SIZE,
+                 exclude=()):
+        self.using = using
+        self.batch_size = batch_size
+        self.exclude = {label.lower() for label in exclude}
+        self.stats = {}
+        self.elapsed = 0.0
+        self._order = dependency_order(apps.get_models())
+        self._buffers = {}
+        self._through_buffers = {}
+
+    def load(self, paths):
+        """Загрузить файлы; вернуть словарь модель → ModelLoadStats."""
+        connection = connections[self.using]
+        started = time.perf_counter()
+        with transaction.atomic(using=self.using):
+            # SQLite: PRAGMA foreign_keys = OFF, проверка в конце.
+            # PostgreSQL: внешние ключи Django и так DEFERRABLE INITIALLY
+            # DEFERRED, проверяются при COMMIT.
+            with connection.constraint_checks_disabled():
+                for path in paths:
+                    with open_fixture(path) as stream:
+                        self._load_stream(stream)
+                self._flush_all()
+            connection.check_constraints(
+                table_names=[model._meta.db_table for model in self.stats]
+            )
+            self._reset_sequences(connection)
+        # Один сигнал на загрузку: досчёт по всей таблице не должен
+        # повторяться для каждой загруженной модели.
+        objects_loaded.send(
+            sender=type(self), models=frozenset(self.stats), using=self.using
+        )
+        self.elapsed = time.perf_counter() - started
+        return self.stats
+
+    def _load_stream(self, stream):
+        records = (
+            record for record in iter_json_array(stream)
+            if not _matches(record['model'].lower(), self.exclude)
+        )
+        for deserialized in Deserializer(records, using=self.using):
+            self._add(deserialized)
+
+    def _add(self, deserialized):
+        instance = deserialized.object
+        model = type(instance)
+        buffer = self._buffers.setdefault(model, [])
+        buffer.append(instance)
+        for name, related_ids in (deserialized.m2m_data or {}).items():
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            rows = self._through_buffers.setdefault(through, [])
+            rows.extend(
+                through(**{
+                    field.m2m_field_name() + '_id': instance.pk,
+                    field.m2m_reverse_field_name() + '_id': related_id,
+                })
+                for related_id in related_ids
+            )
+            if len(rows) >= self.batch_size:
+                self._flush_all()
+        if len(buffer) >= self.batch_size:
+            self._flush_until(model)
+
+    def _flush_until(self, model):
+        """Сбросить буфер модели и буферы всех моделей раньше неё."""
+        for candidate in self._order:
+            self._flush(candidate)
+            if candidate is model:
+                return
+
+    def _flush_all(self):
+        for model in self._order:
+            self._flush(model)
+        for through in list(self._through_buffers):
+            self._flush(through, self._through_buffers)
+
+    def _flush(self, model, buffers=None):
+        buffers = self._buffers if buffers is None else buffers
+        batch = buffers.pop(model, None)
+        if not batch:
+            return
+        started = time.perf_counter()
+        model._default_manager.db_manager(self.using).bulk_create(batch)
+        stats = self.stats.setdefault(model, ModelLoadStats())
+        stats.rows += len(batch)
+        stats.seconds += time.perf_counter() - started
+
+    def _reset_sequences(self, connection):
+        sequence_sql = connection.ops.sequence_reset_sql(
+            no_style(), list(self.stats)
+        )
+        with connection.cursor() as cursor:
+            for line in sequence_sql:
+                cursor.execute(line)
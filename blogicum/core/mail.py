@@ -0,0 +1,181 @@
+"""Очередь исходящей почты.
+
+Код запроса только кладёт письмо в таблицу OutgoingMail. Отправляет
+задача фоновой очереди deliver_outbox (MAIL_OUTBOX_BACKGROUND) или
+manage.py drain_outbox, пачками через одно соединение с почтовым
+бэкендом. Задача ставится одна на всю очередь, а не на письмо.
+
+Пачку отправитель сначала забирает себе условным UPDATE с меткой
+claimed_by, как исполнитель core.jobs забирает задачи, и только потом
+шлёт: параллельные drain_outbox и задачи не отправят письмо дважды.
+Захват старше MAIL_OUTBOX_LOCK_TIMEOUT считается брошенным. Письмо,
+которое не ушло, откладывается через next_attempt_at с той же
+нарастающей паузой, что и задачи (core.jobs.retry_delay), пока не
+исчерпает MAIL_OUTBOX_MAX_ATTEMPTS.
+"""
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, transaction
+from django.db.models import F, Min, Q
+from django.utils import timezone
+
+from .jobs import enqueue, job, retry_delay
+from .models import OutgoingMail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_mail(subject, message, from_email, recipient_list,
+                 dedup_key='', coalesce_window=None):
+    """Поставить письмо в очередь и вернуть его OutgoingMail.
+
+    Если за последние coalesce_window секунд уже поставлено и ещё не
+    отправлено письмо с тем же dedup_key, новое не создаётся: у прежнего
+    растёт repeat_count. Ушедшее письмо повтор уже не покажет.
+    """
+    if dedup_key:
+        if coalesce_window is None:
+            coalesce_window = settings.MAIL_OUTBOX_COALESCE_WINDOW
+        since = timezone.now() - timedelta(seconds=coalesce_window)
+        previous = OutgoingMail.objects.filter(
+            dedup_key=dedup_key, created_at__gte=since, sent_at__isnull=True
+        ).order_by('-created_at').first()
+        # Письмо могли отправить между выборкой и UPDATE — тогда новое.
+        if previous is not None and OutgoingMail.objects.filter(
+            pk=previous.pk, sent_at__isnull=True
+        ).update(repeat_count=F('repeat_count') + 1):
+            return previous
+    mail = OutgoingMail.objects.create(
+        subject=subject,
+        message=message,
+        from_email=from_email,
+        recipients='\n'.join(recipient_list),
+        dedup_key=dedup_key,
+    )
+    if settings.MAIL_OUTBOX_BACKGROUND:
+        enqueue(deliver_outbox, unique=True)
+    return mail
+
+
+def _build_message(mail, connection):
+    body = mail.message
+    if mail.repeat_count > 1:
+        body += f'\n\nПовторов за период: {mail.repeat_count}.'
+    return EmailMessage(
+        subject=mail.subject,
+        body=body,
+        from_email=mail.from_email,
+        to=mail.recipients.split('\n'),
+        connection=connection,
+    )
+
+
+def _unsent():
+    return OutgoingMail.objects.filter(
+        sent_at__isnull=True,
+        attempts__lt=settings.MAIL_OUTBOX_MAX_ATTEMPTS,
+    )
+
+
+def _pending(now):
+    stale = now - timedelta(seconds=settings.MAIL_OUTBOX_LOCK_TIMEOUT)
+    return _unsent().filter(
+        Q(claimed_by='') | Q(locked_at__lt=stale),
+        next_attempt_at__lte=now,
+    ).order_by('next_attempt_at', 'pk')
+
+
+def _claim(batch_size, now):
+    """Пометить до batch_size писем своей меткой и вернуть их списком."""
+    token = uuid.uuid4().hex
+    taken = dict(claimed_by=token, locked_at=now)
+    ready = _pending(now)
+    if connections[ready.db].features.has_select_for_update_skip_locked:
+        with transaction.atomic(using=ready.db):
+            ids = list(ready.select_for_update(skip_locked=True).values_list(
+                'pk', flat=True
+            )[:batch_size])
+            OutgoingMail.objects.filter(pk__in=ids).update(**taken)
+    else:
+        # Условие выборки повторено во внешнем UPDATE: письмо, которое
+        # успел взять параллельный отправитель, ему уже не подходит.
+        ready.filter(pk__in=ready.values('pk')[:batch_size]).update(**taken)
+    return list(
+        OutgoingMail.objects.filter(claimed_by=token).order_by(
+            'next_attempt_at', 'pk'
+        )
+    )
+
+
+def send_pending(batch_size=None, now=None):
+    """Отправить одну пачку писем. Вернуть (отправлено, с ошибкой)."""
+    batch_size = batch_size or settings.MAIL_OUTBOX_BATCH_SIZE
+    now = now or timezone.now()
+    batch = _claim(batch_size, now)
+    if not batch:
+        return 0, 0
+    sent, failed = [], []
+    with get_connection() as connection:
+        for mail in batch:
+            try:
+                _build_message(mail, connection).send()
+            except Exception as error:
+                mail.last_error = f'{type(error).__name__}: {error}'
+                failed.append(mail)
+            else:
+                sent.append(mail.pk)
+    # Итог пишется только под своей меткой: письмо, чей захват
+    # просрочен и перехвачен, досылает и отмечает другой отправитель.
+    claimed = OutgoingMail.objects.filter(claimed_by=batch[0].claimed_by)
+    released = dict(claimed_by='', locked_at=None, attempts=F('attempts') + 1)
+    claimed.filter(pk__in=sent).update(sent_at=timezone.now(), **released)
+    for mail in failed:
+        claimed.filter(pk=mail.pk).update(
+            last_error=mail.last_error,
+            next_attempt_at=now + retry_delay(mail.attempts + 1),
+            **released,
+        )
+    if failed:
+        logger.warning('Не отправлено писем: %s', len(failed))
+    return len(sent), len(failed)
+
+
+def drain(batch_size=None):
+    """Отправлять пачки, пока есть готовые письма. Вернуть число отправленных.
+
+    Не отправленное письмо уходит в конец очереди до своего
+    next_attempt_at, поэтому пачка из одних ошибок не останавливает
+    отправку: следующая берёт письма за ними.
+    """
+    total = 0
+    while True:
+        sent, failed = send_pending(batch_size)
+        total += sent
+        if not sent + failed:
+            return total
+
+
+@job
+def deliver_outbox(retry=False):
+    """Задача очереди: отправить всё, что ждёт.
+
+    Если остались письма, ждущие повтора, задача ставит себя снова на
+    время ближайшего из них. retry отличает такую задачу от поставленной
+    новым письмом: уникальны они порознь, и отложенный повтор не
+    задерживает свежую почту.
+    """
+    drain()
+    next_attempt_at = _unsent().filter(claimed_by='').aggregate(
+        next_attempt_at=Min('next_attempt_at')
+    )['next_attempt_at']
+    if next_attempt_at is not None:
+        enqueue(
+            deliver_outbox,
+            True,
+            unique=True,
+            delay=max(next_attempt_at - timezone.now(), timedelta()),
+        )
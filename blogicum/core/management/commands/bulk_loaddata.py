@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+
+from core.loading import LOAD_BATCH_SIZE, BulkLoader
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает фикстуры dumpdata (.json или .json.gz) потоково, '
+        'пачками bulk_create. Память не зависит от размера файла.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Файлы фикстур.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=LOAD_BATCH_SIZE,
+            help='Сколько строк одной модели вставлять за раз.',
+        )
+        parser.add_argument(
+            '-e', '--exclude',
+            action='append',
+            default=[],
+            help='Пропустить приложение или модель (app_label[.ModelName]).',
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Алиас базы данных для загрузки.',
+        )
+
+    def handle(self, *args, **options):
+        loader = BulkLoader(
+            using=options['database'],
+            batch_size=options['batch_size'],
+            exclude=options['exclude'],
+        )
+        try:
+            stats = loader.load(options['paths'])
+        except (OSError, ValueError, DeserializationError,
+                DatabaseError) as error:
+            raise CommandError(f'Загрузка отменена: {error}')
+        for model, model_stats in stats.items():
+            self.stdout.write(
+                f'{model._meta.label}: {model_stats.rows} строк, '
+                f'{model_stats.rate:.0f} строк/с'
+            )
+        total = sum(model_stats.rows for model_stats in stats.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено строк: {total} за {loader.elapsed:.1f} с '
+            f'({total / max(loader.elapsed, 1e-9):.0f} строк/с)'
+        ))
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.mail import drain
+
+
+class Command(BaseCommand):
+    help = 'Отправляет все письма из очереди OutgoingMail.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.MAIL_OUTBOX_BATCH_SIZE,
+            help='Сколько писем отправлять через одно соединение.',
+        )
+
+    def handle(self, *args, **options):
+        sent = drain(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Отправлено писем: {sent}'))
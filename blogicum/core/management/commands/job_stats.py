@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from core.jobs import stats
+from core.models import Job
+
+
+def _seconds(duration):
+    return '—' if duration is None else f'{duration.total_seconds():.1f}'
+
+
+class Command(BaseCommand):
+    help = 'Сводка очереди фоновых задач по типам: состояния, отставание.'
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"задача":<48}{"ждёт":>7}{"идёт":>7}{"готово":>8}'
+            f'{"отказ":>7}{"повтор":>8}{"отстав. с":>11}{"ср. с":>8}'
+        )
+        for row in stats():
+            self.stdout.write(
+                f'{row["name"]:<48}{row["queued"]:>7}{row["running"]:>7}'
+                f'{row["done"]:>8}{row["failed"]:>7}{row["retries"]:>8}'
+                f'{_seconds(row["lag"]):>11}'
+                f'{_seconds(row["average_run"]):>8}'
+            )
+        for running in Job.objects.filter(
+            status=Job.RUNNING
+        ).order_by('started_at'):
+            if running.progress:
+                self.stdout.write(
+                    f'{running}: {running.progress["done"]} '
+                    f'из {running.progress["total"]}'
+                )
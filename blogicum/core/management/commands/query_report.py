@@ -0,0 +1,54 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import metrics
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает стоимость представлений по снимку замеров, '
+        'который пишет QueryBudgetMiddleware.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--snapshot',
+            default=settings.QUERY_METRICS_SNAPSHOT_PATH,
+            help='Путь к снимку (по умолчанию QUERY_METRICS_SNAPSHOT_PATH).',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Вывести сводку в JSON.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['snapshot']:
+            raise CommandError(
+                'Не задан путь к снимку: укажите --snapshot или '
+                'QUERY_METRICS_SNAPSHOT_PATH.'
+            )
+        try:
+            samples = metrics.load_snapshot(options['snapshot'])
+        except FileNotFoundError:
+            raise CommandError(f'Снимок {options["snapshot"]} не найден.')
+        report = metrics.report(samples)
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        header = (
+            f'{"URL":<28}{"запросов":>9}{"SQL ср.":>9}{"SQL max":>9}'
+            f'{"БД мс":>9}{"шабл. мс":>10}{"p95 мс":>9}{"КБ":>8}'
+        )
+        self.stdout.write(header)
+        for view_name, row in report.items():
+            self.stdout.write(
+                f'{view_name:<28}{row["requests"]:>9}'
+                f'{row["queries_avg"]:>9.1f}{row["queries_max"]:>9}'
+                f'{row["db_time_avg"] * 1000:>9.1f}'
+                f'{row["template_time_avg"] * 1000:>10.1f}'
+                f'{row["time_p95"] * 1000:>9.1f}'
+                f'{row["response_size_avg"] / 1024:>8.1f}'
+            )
@@ -0,0 +1,67 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.jobs import POOLS, Worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Исполнитель фоновых задач из таблицы Job: забирает готовые '
+        'задачи и выполняет их пулом потоков или процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.JOBS_WORKERS,
+            help='Сколько задач выполнять одновременно.',
+        )
+        parser.add_argument(
+            '--pool',
+            choices=POOLS,
+            default=settings.JOBS_POOL,
+            help='Потоки или процессы (для задач, упирающихся в CPU).',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.JOBS_POLL_INTERVAL,
+            help='Как часто проверять очередь, секунды.',
+        )
+        parser.add_argument(
+            '--until-empty',
+            action='store_true',
+            help='Выйти, когда готовых задач не останется (для cron).',
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers должен быть не меньше 1.')
+        worker = Worker(
+            workers=options['workers'],
+            pool=options['pool'],
+            poll_interval=options['poll_interval'],
+        )
+        # SIGTERM от супервизора: дождаться начатых задач и выйти.
+        signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+        try:
+            worker.run(until_empty=options['until_empty'])
+        except KeyboardInterrupt:
+            worker.stop()
+        self.write_metrics(worker.metrics)
+
+    def write_metrics(self, metrics):
+        self.stdout.write(
+            f'{"задача":<48}{"готово":>8}{"повтор":>8}{"отказ":>8}'
+            f'{"потеря":>8}{"ср. мс":>9}{"макс. мс":>10}'
+        )
+        for (
+            name, done, retried, failed, lost, average, longest
+        ) in metrics.rows():
+            self.stdout.write(
+                f'{name:<48}{done:>8}{retried:>8}{failed:>8}{lost:>8}'
+                f'{average:>9.1f}{longest:>10.1f}'
+            )
@@ -0,0 +1,67 @@
+import os
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.routers import sync_stamp_path
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную SQLite-базу в файл реплики. Копия делается '
+        'через backup API и согласована даже под нагрузкой. Рядом '
+        'остаётся метка времени: по ней core.routers ограничивает '
+        'отставание реплики (DATABASE_REPLICA_MAX_LAG).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default='replica',
+            help='Алиас реплики из DATABASES.',
+        )
+        parser.add_argument(
+            '--every',
+            type=float,
+            default=None,
+            help='Повторять копирование раз в столько секунд.',
+        )
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        if alias not in connections or alias == DEFAULT_DB_ALIAS:
+            raise CommandError(f'Неизвестная реплика: {alias}')
+        if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+            raise CommandError(
+                'Копированием реплика делается только для SQLite; '
+                'для других СУБД настройте репликацию сервера.'
+            )
+        while True:
+            self.sync(alias)
+            if options['every'] is None:
+                return
+            time.sleep(options['every'])
+
+    def sync(self, alias):
+        primary = connections[DEFAULT_DB_ALIAS]
+        target_path = connections[alias].settings_dict['NAME']
+        connections[alias].close()
+        primary.ensure_connection()
+        # Копия согласована на момент начала backup: от него и считается
+        # отставание.
+        started = time.time()
+        target = sqlite3.connect(target_path)
+        try:
+            primary.connection.backup(target)
+        finally:
+            target.close()
+        stamp = sync_stamp_path(alias)
+        with open(f'{stamp}.tmp', 'w') as stamp_file:
+            stamp_file.write(f'{started}\n')
+        os.utime(f'{stamp}.tmp', (started, started))
+        os.replace(f'{stamp}.tmp', stamp)
+        self.stdout.write(
+            self.style.SUCCESS(f'Реплика {alias} обновлена: {target_path}')
+        )
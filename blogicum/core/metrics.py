@@ -0,0 +1,265 @@
+"""Замеры стоимости запросов к сайту по именам URL.
+
+Каждый запрос даёт один RequestSample в кольцевом буфере. Буфер —
+collections.deque с maxlen: append и copy атомарны под GIL, поэтому
+запись идёт без блокировок, а старые замеры вытесняются сами.
+
+Счётчики текущего запроса лежат в contextvars: asgiref копирует
+контекст в потоки sync_to_async, поэтому запросы к БД и шаблоны
+асинхронного представления считаются так же, как синхронного.
+
+Буфер у каждого процесса свой, и снимок каждый процесс пишет в свой
+файл рядом с QUERY_METRICS_SNAPSHOT_PATH: query_metrics.json даёт
+query_metrics.<pid>.json. Файл пишется во временный и подменяется
+os.replace, так что читатель не увидит его наполовину записанным.
+load_snapshot сливает снимки всех процессов.
+"""
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from statistics import quantiles
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.base import Template
+
+logger = logging.getLogger(__name__)
+
+
+class RequestSample(NamedTuple):
+    view_name: str
+    status: int
+    queries: int
+    db_time: float
+    template_time: float
+    total_time: float
+    response_size: int
+
+
+_buffer = deque(maxlen=settings.QUERY_METRICS_BUFFER_SIZE)
+
+
+def record(sample):
+    _buffer.append(sample)
+
+
+def samples():
+    return list(_buffer.copy())
+
+
+def clear():
+    _buffer.clear()
+
+
+class QueryCollector:
+    """execute_wrapper, считающий запросы и время в БД."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+_query_collector = contextvars.ContextVar('query_collector', default=None)
+
+
+def _collect_queries(execute, sql, params, many, context):
+    collector = _query_collector.get()
+    if collector is None:
+        return execute(sql, params, many, context)
+    return collector(execute, sql, params, many, context)
+
+
+def _add_query_wrapper(connection):
+    if _collect_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _collect_queries)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    _add_query_wrapper(connection)
+
+
+def install_query_counter():
+    """Подключить счётчик запросов ко всем соединениям с БД.
+
+    Соединения свои у каждого потока, поэтому кроме уже открытых
+    обёртка ставится и на каждое новое через сигнал connection_created.
+    """
+    connection_created.connect(_on_connection_created)
+    for connection in connections.all():
+        _add_query_wrapper(connection)
+
+
+class TemplateTimer:
+    """Время отрисовки шаблонов за запрос, без двойного счёта include."""
+
+    def __init__(self):
+        self.total = 0.0
+        self.depth = 0
+
+
+_template_timer = contextvars.ContextVar('template_timer', default=None)
+_original_render = Template.render
+
+
+def _timed_render(self, context):
+    timer = _template_timer.get()
+    if timer is None:
+        return _original_render(self, context)
+    timer.depth += 1
+    start = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        timer.depth -= 1
+        if not timer.depth:
+            timer.total += time.perf_counter() - start
+
+
+def install_template_timer():
+    """Обернуть Template.render; вне замеряемого запроса обёртка пуста."""
+    Template.render = _timed_render
+
+
+class RequestMeasurement:
+    """Запросы к БД, время шаблонов и общее время между start и stop."""
+
+    def start(self):
+        self.queries = QueryCollector()
+        self.templates = TemplateTimer()
+        self._tokens = (
+            _query_collector.set(self.queries),
+            _template_timer.set(self.templates),
+        )
+        self.started = time.perf_counter()
+        self.total_time = 0.0
+        return self
+
+    def stop(self):
+        self.total_time = time.perf_counter() - self.started
+        query_token, timer_token = self._tokens
+        _template_timer.reset(timer_token)
+        _query_collector.reset(query_token)
+
+
+def percentile(values, percent):
+    if len(values) == 1:
+        return values[0]
+    return quantiles(values, n=100, method='inclusive')[percent - 1]
+
+
+def report(sample_list=None):
+    """Сводка по каждому имени URL: число запросов к сайту и к БД, время."""
+    grouped = {}
+    for sample in samples() if sample_list is None else sample_list:
+        grouped.setdefault(sample.view_name, []).append(sample)
+    result = {}
+    for view_name, view_samples in sorted(grouped.items()):
+        count = len(view_samples)
+        times = sorted(s.total_time for s in view_samples)
+        result[view_name] = {
+            'requests': count,
+            'queries_avg': sum(s.queries for s in view_samples) / count,
+            'queries_max': max(s.queries for s in view_samples),
+            'db_time_avg': sum(s.db_time for s in view_samples) / count,
+            'template_time_avg': sum(
+                s.template_time for s in view_samples
+            ) / count,
+            'response_size_avg': sum(
+                s.response_size for s in view_samples
+            ) / count,
+            'time_p50': percentile(times, 50),
+            'time_p95': percentile(times, 95),
+        }
+    return result
+
+
+def process_snapshot_path(path):
+    """Файл снимка этого процесса для общего пути path."""
+    path = Path(path)
+    return path.with_name(f'{path.stem}.{os.getpid()}{path.suffix}')
+
+
+def save_snapshot(path, sample_list=None):
+    """Записать буфер в JSON для manage.py query_report."""
+    target = process_snapshot_path(path)
+    temporary = target.with_name(f'{target.name}.tmp')
+    rows = samples() if sample_list is None else sample_list
+    with open(temporary, 'w', encoding='utf-8') as snapshot:
+        json.dump([sample._asdict() for sample in rows], snapshot)
+    os.replace(temporary, target)
+
+
+def load_snapshot(path):
+    """Замеры из снимков всех процессов, записанных для пути path."""
+    path = Path(path)
+    name = re.compile(
+        rf'{re.escape(path.stem)}\.\d+{re.escape(path.suffix)}'
+    )
+    files = [
+        candidate
+        for candidate in path.parent.glob(f'{path.stem}.*{path.suffix}')
+        if name.fullmatch(candidate.name)
+    ]
+    if not files:
+        raise FileNotFoundError(path)
+    merged = []
+    for file in sorted(files):
+        with open(file, encoding='utf-8') as snapshot:
+            merged.extend(RequestSample(**row) for row in json.load(snapshot))
+    return merged
+
+
+class SnapshotWriter:
+    """Пишет снимки в фоновом потоке, чтобы запрос не ждал диска.
+
+    Буфер копируется сразу, а JSON и запись идут в потоке. Пока
+    прежний снимок пишется, новые пропускаются.
+    """
+
+    def __init__(self):
+        self._busy = threading.Lock()
+        self._thread = None
+
+    def schedule(self, path):
+        if not self._busy.acquire(blocking=False):
+            return False
+        self._thread = threading.Thread(
+            target=self._write,
+            args=(path, samples()),
+            name='query-metrics-snapshot',
+            daemon=True,
+        )
+        self._thread.start()
+        return True
+
+    def _write(self, path, sample_list):
+        try:
+            save_snapshot(path, sample_list)
+        except OSError:
+            logger.exception('Не удалось записать снимок замеров %s', path)
+        finally:
+            self._busy.release()
+
+    def join(self, timeout=None):
+        """Дождаться записи текущего снимка."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+snapshot_writer = SnapshotWriter()
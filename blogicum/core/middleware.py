@@ -0,0 +1,171 @@
+"""Промежуточные слои проекта.
+
+Слои умеют работать и в синхронной, и в асинхронной цепочке: под
+ASGI Django не оборачивает их в sync_to_async, и запрос не платит
+лишний переход в поток за каждый из них.
+"""
+import abc
+import asyncio
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics, routers
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление сделало больше SQL-запросов, чем ему позволено."""
+
+
+class HybridMiddleware(abc.ABC):
+    """Основа для слоёв с общей логикой до и после get_response.
+
+    __call__ выбирает синхронный или асинхронный путь по get_response,
+    и на обоих порядок один:
+        state = before(request) — до представления, обязателен;
+        finish(state) — сразу после представления, даже если оно
+            упало: здесь освобождается то, что занял before;
+        after(request, response, state) — только при успешном ответе,
+            возвращает ответ (тот же или другой).
+    before и after синхронны и в асинхронной цепочке вызываются прямо
+    в цикле событий, поэтому не должны ходить в БД; слою, которому это
+    нужно, придётся переопределить _acall.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Так Django распознаёт экземпляр как асинхронный слой.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self._acall(request)
+        state = self.before(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.finish(state)
+        return self.after(request, response, state)
+
+    async def _acall(self, request):
+        state = self.before(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.finish(state)
+        return self.after(request, response, state)
+
+    @abc.abstractmethod
+    def before(self, request):
+        """Подготовить запрос и вернуть состояние для finish и after."""
+
+    def finish(self, state):
+        """Вызывается всегда, даже если представление упало."""
+
+    def after(self, request, response, state):
+        """Дополнить ответ; по умолчанию он возвращается как есть."""
+        return response
+
+
+class QueryBudgetMiddleware(HybridMiddleware):
+    """Считает SQL-запросы, время БД и шаблонов для каждого запроса.
+
+    Замеры складываются в core.metrics. Если у имени URL есть бюджет
+    в QUERY_BUDGETS (или задан QUERY_BUDGET_DEFAULT) и он превышен,
+    пишется предупреждение, а при QUERY_BUDGET_ACTION = 'raise'
+    выбрасывается QueryBudgetExceeded — так ловятся N+1.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.requests_seen = 0
+        metrics.install_template_timer()
+
+    def before(self, request):
+        return metrics.RequestMeasurement().start()
+
+    def finish(self, measurement):
+        measurement.stop()
+
+    def after(self, request, response, measurement):
+        match = request.resolver_match
+        view_name = match.view_name if match else '<unresolved>'
+        metrics.record(metrics.RequestSample(
+            view_name=view_name,
+            status=response.status_code,
+            queries=measurement.queries.queries,
+            db_time=measurement.queries.db_time,
+            template_time=measurement.templates.total,
+            total_time=measurement.total_time,
+            response_size=(
+                0 if response.streaming else len(response.content)
+            ),
+        ))
+        self._maybe_snapshot()
+        self._check_budget(view_name, measurement.queries.queries)
+        return response
+
+    def _maybe_snapshot(self):
+        path = settings.QUERY_METRICS_SNAPSHOT_PATH
+        if not path:
+            return
+        self.requests_seen += 1
+        if self.requests_seen % settings.QUERY_METRICS_SNAPSHOT_EVERY == 0:
+            metrics.snapshot_writer.schedule(path)
+
+    def _check_budget(self, view_name, queries):
+        budget = settings.QUERY_BUDGETS.get(
+            view_name, settings.QUERY_BUDGET_DEFAULT
+        )
+        if budget is None or queries <= budget:
+            return
+        message = (
+            f'{view_name}: {queries} SQL-запросов при бюджете {budget}'
+        )
+        if settings.QUERY_BUDGET_ACTION == 'raise':
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    """Включает чтение с реплик и «прилипание» к основной БД.
+
+    После запроса, который что-то записал, ставится cookie на
+    DATABASE_PRIMARY_PIN_SECONDS: пока она жива, все чтения этого
+    браузера идут в default, и пользователь видит свои изменения,
+    даже если реплика отстаёт. Должен стоять в MIDDLEWARE раньше всех
+    слоёв, которые пишут от имени посетителя, чтобы заметить и запись
+    сессии.
+    """
+
+    def before(self, request):
+        return routers.start_request(
+            request,
+            pinned=settings.DATABASE_PRIMARY_PIN_COOKIE in request.COOKIES,
+        )
+
+    def finish(self, state):
+        _, token = state
+        routers.finish_request(token)
+
+    def after(self, request, response, state):
+        routing, _ = state
+        if routing.wrote:
+            response.set_cookie(
+                settings.DATABASE_PRIMARY_PIN_COOKIE,
+                '1',
+                max_age=settings.DATABASE_PRIMARY_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingMail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=256, verbose_name='Тема')),
+                ('message', models.TextField(verbose_name='Текст')),
+                ('from_email', models.CharField(max_length=256, verbose_name='Отправитель')),
+                ('recipients', models.TextField(help_text='Адреса через перевод строки.', verbose_name='Получатели')),
+                ('dedup_key', models.CharField(blank=True, help_text='Одинаковые письма с этим ключом в пределах окна склеиваются в одно.', max_length=256, verbose_name='Ключ склейки')),
+                ('repeat_count', models.PositiveIntegerField(default=1, verbose_name='Склеено повторов')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток отправки')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Отправлено')),
+            ],
+            options={
+                'verbose_name': 'исходящее письмо',
+                'verbose_name_plural': 'Исходящие письма',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outgoingmail',
+            index=models.Index(condition=models.Q(('sent_at__isnull', True)), fields=['created_at'], name='mail_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outgoingmail',
+            index=models.Index(fields=['dedup_key', '-created_at'], name='mail_dedup_idx'),
+        ),
+    ]
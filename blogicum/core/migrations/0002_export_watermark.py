@@ -0,0 +1,27 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True, verbose_name='Выгрузка')),
+                ('last_created_at', models.DateTimeField(blank=True, null=True, verbose_name='Добавлено последней строкой')),
+                ('last_pk', models.BigIntegerField(null=True, verbose_name='id последней строки')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'водяной знак выгрузки',
+                'verbose_name_plural': 'Водяные знаки выгрузок',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='progress',
+            field=models.JSONField(blank=True, default=dict, help_text='{"done": …, "total": …} из core.jobs.report_progress.', verbose_name='Ход выполнения'),
+        ),
+    ]
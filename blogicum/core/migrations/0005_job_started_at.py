@@ -0,0 +1,23 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_job_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='started_at',
+            field=models.DateTimeField(blank=True, help_text='Начало последней попытки; по нему считается длительность.', null=True, verbose_name='Взята'),
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, help_text='Ставит claim(), продлевает report_progress().', null=True, verbose_name='Блокировка продлена'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_job_started_at'),
+    ]
+
+    operations = [
+        # Прежний знак по created_at не новее updated_at тех же строк:
+        # после переименования изменённые строки просто выгрузятся ещё раз.
+        migrations.RenameField(
+            model_name='exportwatermark',
+            old_name='last_created_at',
+            new_name='last_updated_at',
+        ),
+        migrations.AlterField(
+            model_name='exportwatermark',
+            name='last_updated_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Изменена последняя строка'),
+        ),
+    ]
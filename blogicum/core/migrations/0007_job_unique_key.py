@@ -0,0 +1,22 @@
+# Generated by Django 3.2.16 on 2026-10-18 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_export_watermark_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='unique_key',
+            field=models.CharField(blank=True, help_text='enqueue(unique=True): хеш имени и аргументов, пока задача ждёт в очереди.', max_length=40, verbose_name='Ключ уникальности'),
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'queued'), models.Q(('unique_key', ''), _negated=True)), fields=('unique_key',), name='job_unique_queued'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.16 on 2026-10-18 06:11
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_job_unique_key'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='outgoingmail',
+            name='mail_pending_idx',
+        ),
+        migrations.AddField(
+            model_name='outgoingmail',
+            name='claimed_by',
+            field=models.CharField(blank=True, help_text='Метка пачки, которой отправитель забрал письмо.', max_length=128, verbose_name='Взято отправителем'),
+        ),
+        migrations.AddField(
+            model_name='outgoingmail',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, help_text='Захват старше MAIL_OUTBOX_LOCK_TIMEOUT считается брошенным.', null=True, verbose_name='Взято'),
+        ),
+        migrations.AddField(
+            model_name='outgoingmail',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='После ошибки отправки сдвигается вперёд.', verbose_name='Отправить не раньше'),
+        ),
+        migrations.AddIndex(
+            model_name='outgoingmail',
+            index=models.Index(condition=models.Q(('sent_at__isnull', True)), fields=['next_attempt_at', 'id'], name='mail_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.16 on 2026-10-18 06:15
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_mail_claim'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, verbose_name='Набор')),
+                ('object_id', models.BigIntegerField(verbose_name='id удалённой строки')),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Удалена')),
+            ],
+            options={
+                'verbose_name': 'удалённая строка выгрузки',
+                'verbose_name_plural': 'Удалённые строки выгрузок',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='exporttombstone',
+            index=models.Index(fields=['name', 'deleted_at', 'object_id'], name='export_tombstone_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 """Для избежания от повторов."""
 from django.db import models
+from django.utils import timezone
 
 
 class PublishedModel(models.Model):
@@ -20,3 +21,206 @@ class PublishedModel(models.Model):
         """Абстрактный класс Meta."""
 
         abstract = True
+
+
+class OutgoingMail(models.Model):
+    """Письмо в очереди на отправку (см. core.mail)."""
+
+    subject = models.CharField('Тема', max_length=256)
+    message = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=256)
+    recipients = models.TextField(
+        'Получатели',
+        help_text='Адреса через перевод строки.'
+    )
+    dedup_key = models.CharField(
+        'Ключ склейки',
+        max_length=256,
+        blank=True,
+        help_text='Одинаковые письма с этим ключом в пределах окна '
+                  'склеиваются в одно.'
+    )
+    repeat_count = models.PositiveIntegerField(
+        'Склеено повторов', default=1
+    )
+    attempts = models.PositiveSmallIntegerField(
+        'Попыток отправки', default=0
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    next_attempt_at = models.DateTimeField(
+        'Отправить не раньше',
+        default=timezone.now,
+        help_text='После ошибки отправки сдвигается вперёд.'
+    )
+    claimed_by = models.CharField(
+        'Взято отправителем',
+        max_length=128,
+        blank=True,
+        help_text='Метка пачки, которой отправитель забрал письмо.'
+    )
+    locked_at = models.DateTimeField(
+        'Взято',
+        null=True,
+        blank=True,
+        help_text='Захват старше MAIL_OUTBOX_LOCK_TIMEOUT считается брошенным.'
+    )
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = (
+            models.Index(
+                fields=('next_attempt_at', 'id'),
+                name='mail_pending_idx',
+                condition=models.Q(sent_at__isnull=True),
+            ),
+            models.Index(
+                fields=('dedup_key', '-created_at'),
+                name='mail_dedup_idx',
+            ),
+        )
+
+    def __str__(self):
+        return self.subject
+
+
+class ExportWatermark(models.Model):
+    """Докуда выгружена таблица в инкрементальном режиме (см. blog.export)."""
+
+    name = models.CharField('Выгрузка', max_length=64, unique=True)
+    last_updated_at = models.DateTimeField(
+        'Изменена последняя строка', null=True, blank=True
+    )
+    last_pk = models.BigIntegerField('id последней строки', null=True)
+    updated_at = models.DateTimeField('Обновлено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'водяной знак выгрузки'
+        verbose_name_plural = 'Водяные знаки выгрузок'
+
+    def __str__(self):
+        return self.name
+
+
+class ExportTombstone(models.Model):
+    """Строка, удалённая из выгружаемой таблицы (см. blog.export)."""
+
+    name = models.CharField('Набор', max_length=64)
+    object_id = models.BigIntegerField('id удалённой строки')
+    deleted_at = models.DateTimeField('Удалена', default=timezone.now)
+
+    class Meta:
+        verbose_name = 'удалённая строка выгрузки'
+        verbose_name_plural = 'Удалённые строки выгрузок'
+        indexes = (
+            models.Index(
+                fields=('name', 'deleted_at', 'object_id'),
+                name='export_tombstone_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name}:{self.object_id}'
+
+
+class Job(models.Model):
+    """Отложенная задача в очереди (см. core.jobs)."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Не удалась'),
+    )
+
+    name = models.CharField(
+        'Задача',
+        max_length=256,
+        help_text='Путь импорта функции, помеченной core.jobs.job.'
+    )
+    args = models.JSONField('Аргументы', default=list, blank=True)
+    priority = models.SmallIntegerField(
+        'Приоритет',
+        default=0,
+        help_text='Задачи с большим приоритетом берутся раньше.'
+    )
+    run_at = models.DateTimeField(
+        'Выполнить не раньше',
+        help_text='При повторе после ошибки сдвигается вперёд.'
+    )
+    status = models.CharField(
+        'Состояние', max_length=16, choices=STATUS_CHOICES, default=QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField('Попыток не больше')
+    locked_by = models.CharField(
+        'Взята исполнителем',
+        max_length=128,
+        blank=True,
+        help_text='Метка выборки, которой исполнитель забрал задачу.'
+    )
+    locked_at = models.DateTimeField(
+        'Блокировка продлена',
+        null=True,
+        blank=True,
+        help_text='Ставит claim(), продлевает report_progress().'
+    )
+    started_at = models.DateTimeField(
+        'Взята',
+        null=True,
+        blank=True,
+        help_text='Начало последней попытки; по нему считается длительность.'
+    )
+    finished_at = models.DateTimeField('Завершена', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    progress = models.JSONField(
+        'Ход выполнения',
+        default=dict,
+        blank=True,
+        help_text='{"done": …, "total": …} из core.jobs.report_progress.'
+    )
+    unique_key = models.CharField(
+        'Ключ уникальности',
+        max_length=40,
+        blank=True,
+        help_text='enqueue(unique=True): хеш имени и аргументов, пока '
+                  'задача ждёт в очереди.'
+    )
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'задача'
+        verbose_name_plural = 'Задачи'
+        constraints = (
+            # Две одинаковые задачи не ждут в очереди одновременно, даже
+            # если их ставят параллельные запросы.
+            models.UniqueConstraint(
+                fields=('unique_key',),
+                name='job_unique_queued',
+                condition=models.Q(status='queued') & ~models.Q(
+                    unique_key=''
+                ),
+            ),
+        )
+        indexes = (
+            # Выборка исполнителя: порядок совпадает с ORDER BY в claim().
+            models.Index(
+                fields=('-priority', 'run_at', 'id'),
+                name='job_queue_idx',
+                condition=models.Q(status='queued'),
+            ),
+            models.Index(
+                fields=('locked_by',),
+                name='job_claim_idx',
+                condition=models.Q(status='running'),
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
@@ -0,0 +1,135 @@
+"""Маршрутизация запросов между основной БД и репликами.
+
+Запись всегда идёт в default. Чтение уходит на случайную реплику из
+DATABASE_REPLICAS, только если одновременно:
+    — запрос обрабатывает представление из DATABASE_REPLICA_VIEWS;
+    — модель из приложения из DATABASE_REPLICA_APPS: сессии и
+      пользователи читаются с основной БД, иначе отставание реплики
+      разлогинивало бы только что вошедших;
+    — пользователь недавно ничего не записывал (см. PrimaryPin);
+    — код не попросил основную БД явно (primary_reads): так читают
+      то, что потом живёт дольше запроса, — страницы для кэша лент и
+      валидаторы ETag;
+    — реплика отстаёт не больше DATABASE_REPLICA_MAX_LAG секунд.
+Вне HTTP-запросов (команды, фоновые потоки) всё идёт в default.
+
+Отставание SQLite-реплики — возраст метки, которую оставляет
+manage.py sync_replica рядом с файлом реплики. Нет метки или она
+старше предела — чтение идёт в default. Для других СУБД отставание
+здесь не измеряется, и их реплики не используются.
+"""
+import contextvars
+import os
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class RequestRouting:
+    """Состояние маршрутизации одного HTTP-запроса."""
+
+    def __init__(self, request, pinned):
+        self.request = request
+        self.pinned = pinned
+        self.wrote = False
+
+    @property
+    def replica_view(self):
+        # resolver_match появляется, когда URL уже разобран, — до вызова
+        # представления, но после middleware, которая начала запрос.
+        match = getattr(self.request, 'resolver_match', None)
+        return (
+            match is not None
+            and match.view_name in settings.DATABASE_REPLICA_VIEWS
+        )
+
+
+_routing = contextvars.ContextVar('db_routing', default=None)
+
+
+def current():
+    """Состояние текущего HTTP-запроса или None."""
+    return _routing.get()
+
+
+def start_request(request, pinned):
+    routing = RequestRouting(request, pinned)
+    return routing, _routing.set(routing)
+
+
+def finish_request(token):
+    _routing.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Внутри блока текущий запрос читает только из default."""
+    routing = current()
+    if routing is None:
+        yield
+        return
+    pinned, routing.pinned = routing.pinned, True
+    try:
+        yield
+    finally:
+        routing.pinned = pinned
+
+
+def sync_stamp_path(alias):
+    """Файл-метка последней синхронизации SQLite-реплики alias."""
+    return f'{connections[alias].settings_dict["NAME"]}.synced'
+
+
+def replica_lag(alias):
+    """Отставание реплики в секундах или None, если оно неизвестно."""
+    if connections[alias].vendor != 'sqlite':
+        return None
+    try:
+        synced_at = os.path.getmtime(sync_stamp_path(alias))
+    except OSError:
+        return None
+    return time.time() - synced_at
+
+
+def fresh_replicas():
+    """Реплики, которые отстают не больше DATABASE_REPLICA_MAX_LAG."""
+    fresh = []
+    for alias in settings.DATABASE_REPLICAS:
+        lag = replica_lag(alias)
+        if lag is not None and lag <= settings.DATABASE_REPLICA_MAX_LAG:
+            fresh.append(alias)
+    return fresh
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        routing = current()
+        if (
+            routing is None
+            or routing.pinned
+            or not routing.replica_view
+            or model._meta.app_label not in settings.DATABASE_REPLICA_APPS
+        ):
+            return DEFAULT_DB_ALIAS
+        replicas = fresh_replicas()
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        routing = current()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема приходит на реплики вместе с данными.
+        return db == DEFAULT_DB_ALIAS
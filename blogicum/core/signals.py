@@ -0,0 +1,11 @@
+"""Сигналы проекта, на которые подписываются приложения.
+
+Отдельный лёгкий модуль: приложения подключают обработчики в ready(),
+и импорт не должен тянуть за собой модули, где сигналы отправляются.
+"""
+from django.dispatch import Signal
+
+# Отправляет core.loading.BulkLoader один раз по окончании загрузки:
+# sender — класс загрузчика, models — множество моделей, в которые
+# загружены строки, using — алиас БД.
+objects_loaded = Signal()
@@ -0,0 +1,13 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from . import metrics
+
+
+@staff_member_required
+def query_report(request):
+    """Сводка core.metrics этого процесса в JSON, только для staff."""
+    return JsonResponse(metrics.report(), json_dumps_params={
+        'ensure_ascii': False,
+        'indent': 2,
+    })
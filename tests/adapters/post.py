@@ -33,6 +33,10 @@ class PostModelAdapter(StudentModelAdapter):
             "author",
             "category",
             "location",
+            "is_live",
+            "comment_count",
+            "updated_at",
+            "deleted_at",
             "refresh_from_db",
         ]
 
@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,45 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def no_in_process_jobs(settings):
+    # Фоновые потоки пережили бы тестовую БД и очистку media.
+    settings.JOBS_IN_PROCESS = False
+
+
+@pytest.fixture(autouse=True)
+def no_publication_on_request(settings):
+    # Проверка раз в несколько секунд добавляла бы запросы к случайным
+    # тестам, которые их считают.
+    settings.PUBLICATION_ON_REQUEST = False
+
+
+@pytest.fixture(autouse=True)
+def no_background_mail_sender(settings):
+    settings.MAIL_OUTBOX_BACKGROUND = False
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    # Превышение бюджета SQL-запросов (N+1) роняет тест.
+    settings.QUERY_BUDGET_ACTION = "raise"
+    settings.QUERY_METRICS_SNAPSHOT_PATH = None
+
+
+@pytest.fixture(autouse=True)
+def no_read_replicas(settings):
+    # Зеркало default — отдельное соединение вне транзакции теста.
+    settings.DATABASE_REPLICAS = []
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # БД откатывается после каждого теста, а кэш нет.
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -363,6 +403,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,68 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.admin import TEXT_PREVIEW_LENGTH
+from blog.models import Post
+from core.pagination import EstimatedCountPaginator
+
+pytestmark = [pytest.mark.django_db]
+
+
+def changelist_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(queries), response.content.decode()
+
+
+@pytest.mark.parametrize("model", ("post", "comment"))
+def test_changelist_queries_do_not_grow_with_rows(model, admin_client, mixer):
+    url = f"/admin/blog/{model}/"
+    mixer.cycle(2).blend(f"blog.{model}", text="а" * 200)
+    few, _ = changelist_queries(admin_client, url)
+    mixer.cycle(10).blend(f"blog.{model}", text="а" * 200)
+    many, content = changelist_queries(admin_client, url)
+    assert many == few
+    assert "а" * TEXT_PREVIEW_LENGTH + "…<" in content
+    assert "а" * (TEXT_PREVIEW_LENGTH + 1) not in content
+
+
+def test_estimated_count_comes_from_table_statistics(mixer):
+    mixer.cycle(5).blend("blog.Post")
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    mixer.cycle(3).blend("blog.Post")
+
+    class Paginator(EstimatedCountPaginator):
+        exact_count_threshold = 1
+
+    paginator = Paginator(Post.objects.order_by("-pk"), 2)
+    assert paginator.count == 5
+    assert paginator.estimated
+    # За оценочным концом страница пустая, а не ошибка.
+    assert len(paginator.page(4)) == 2
+    assert len(paginator.page(10)) == 0
+
+    filtered = Paginator(Post.objects.filter(pk__gt=0).order_by("-pk"), 2)
+    assert filtered.count == 8
+    assert not filtered.estimated
+
+
+def test_search_and_autocomplete_use_full_text_index(admin_client, mixer):
+    mixer.blend("blog.Post", title="Прогулка по набережной")
+    mixer.blend("blog.Post", title="Рецепт пирога")
+
+    response = admin_client.get("/admin/blog/post/", {"q": "набережн"})
+    assert "Прогулка по набережной" in response.content.decode()
+    assert "Рецепт пирога" not in response.content.decode()
+
+    response = admin_client.get("/admin/autocomplete/", {
+        "term": "пирог",
+        "app_label": "blog",
+        "model_name": "comment",
+        "field_name": "post",
+    })
+    assert [row["text"] for row in response.json()["results"]] == [
+        "Рецепт пирога"
+    ]
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.test import AsyncRequestFactory
+
+from blog import async_views, cache
+from core import metrics
+from core.middleware import HybridMiddleware
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _anonymous_get(path):
+    request = AsyncRequestFactory().get(path)
+    request.user = AnonymousUser()
+    return request
+
+
+def test_async_detail_and_comments(mixer, post_with_published_location):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, text="Асинхронный")
+    response = async_to_sync(async_views.post_detail)(
+        _anonymous_get(f"/posts/{post.id}/"), post_id=post.id
+    )
+    assert response.status_code == 200
+    assert post.title in response.content.decode()
+
+    response = async_to_sync(async_views.comments_fragment)(
+        _anonymous_get(f"/posts/{post.id}/comments/"), post_id=post.id
+    )
+    assert comment.text in response.content.decode()
+
+
+def test_async_feed_cache_hit_skips_database(
+    post_with_published_location, django_assert_num_queries
+):
+    first = async_to_sync(async_views.index)(_anonymous_get("/"))
+    with django_assert_num_queries(0):
+        second = async_to_sync(async_views.index)(_anonymous_get("/"))
+    assert second.content == first.content
+
+
+def test_async_feed_cache_off_loop_for_non_locmem(
+    settings, tmp_path, monkeypatch, post_with_published_location
+):
+    settings.CACHES = {
+        **settings.CACHES,
+        "feed": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        },
+    }
+    settings.FEED_CACHE_ALIAS = "feed"
+    in_loop = []
+    lookup = cache._lookup
+
+    def spy(*args):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            in_loop.append(False)
+        else:
+            in_loop.append(True)
+        return lookup(*args)
+
+    monkeypatch.setattr(cache, "_lookup", spy)
+    first = async_to_sync(async_views.index)(_anonymous_get("/"))
+    second = async_to_sync(async_views.index)(_anonymous_get("/"))
+
+    assert second.content == first.content
+    assert in_loop == [False, False]
+
+
+def test_async_middleware_records_queries(
+    async_client, post_with_published_location
+):
+    metrics.clear()
+    response = async_to_sync(async_client.get)(
+        f"/posts/{post_with_published_location.id}/"
+    )
+    assert response.status_code == 200
+    detail = metrics.report()["blog:post_detail"]
+    assert detail["queries_max"] > 0
+    assert detail["template_time_avg"] > 0
+    metrics.clear()
+
+
+class RecordingMiddleware(HybridMiddleware):
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.calls = []
+
+    def before(self, request):
+        self.calls.append("before")
+        return "state"
+
+    def finish(self, state):
+        self.calls.append(f"finish:{state}")
+
+    def after(self, request, response, state):
+        self.calls.append("after")
+        return response
+
+
+def test_hybrid_middleware_contract():
+    class NoBefore(HybridMiddleware):
+        pass
+
+    with pytest.raises(TypeError):
+        NoBefore(lambda request: None)
+
+    def failing_view(request):
+        raise ValueError
+
+    async def failing_async_view(request):
+        raise ValueError
+
+    for view in (failing_view, failing_async_view):
+        middleware = RecordingMiddleware(view)
+        with pytest.raises(ValueError):
+            result = middleware(None)
+            if asyncio.iscoroutine(result):
+                asyncio.run(result)
+        # finish освобождает состояние и при ошибке, after — только ответу.
+        assert middleware.calls == ["before", "finish:state"]
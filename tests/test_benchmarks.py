@@ -0,0 +1,58 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from benchmarks import runner
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+TINY = [
+    "--users=20", "--categories=4", "--locations=3",
+    "--posts=60", "--comments=200",
+]
+
+
+@pytest.fixture
+def seeded():
+    call_command("bench_seed", *TINY, stdout=StringIO())
+
+
+def test_seed_fills_tables_and_counters(seeded):
+    assert Post.objects.count() == 60
+    assert Comment.objects.count() == 200
+    post = Post.objects.order_by("-comment_count").first()
+    assert post.comment_count == post.comments.count()
+
+
+def test_seed_refuses_non_empty_database(seeded):
+    with pytest.raises(CommandError):
+        call_command("bench_seed", *TINY)
+
+
+def test_run_reports_every_scenario(seeded):
+    report = runner.run(iterations=3, warmup=1)
+    assert set(report["scenarios"]) == set(runner.SCENARIOS)
+    for name, result in report["scenarios"].items():
+        assert result["errors"] == 0, name
+        assert result["p50_ms"] <= result["p99_ms"]
+        assert result["queries_avg"] > 0
+
+
+def test_baseline_regression_fails_command(seeded, tmp_path):
+    baseline = tmp_path / "baseline.json"
+    args = ["--only", "post_detail", "--iterations=3", "--warmup=0"]
+    call_command(
+        "bench_run", *args, f"--baseline={baseline}", "--save-baseline",
+        stdout=StringIO(),
+    )
+    saved = json.loads(baseline.read_text())
+    saved["scenarios"]["post_detail"]["queries_avg"] = 0
+    baseline.write_text(json.dumps(saved))
+    with pytest.raises(CommandError, match="SQL"):
+        call_command(
+            "bench_run", *args, f"--baseline={baseline}",
+            stdout=StringIO(),
+        )
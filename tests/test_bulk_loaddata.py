@@ -0,0 +1,96 @@
+import gzip
+import io
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from blog import counters, publication, search, stats
+from blog.models import Category, Location, Post
+from core import loading
+
+pytestmark = [pytest.mark.django_db]
+
+DB_JSON = Path(__file__).resolve().parent.parent / "blogicum" / "db.json"
+EXCLUDE = ["-e", "auth.permission", "-e", "admin", "-e", "sessions"]
+
+
+def test_iter_json_array_across_read_boundaries(monkeypatch):
+    monkeypatch.setattr(loading, "READ_SIZE", 3)
+    items = [{"a": 12345}, [1, 2], "строка, с ]", 678, None]
+    stream = io.StringIO(json.dumps(items, indent=2))
+    assert list(loading.iter_json_array(stream)) == items
+
+
+@pytest.mark.parametrize("text", ["{}", "[1 2]", "[1,", "[{\"a\": }]"])
+def test_iter_json_array_rejects_malformed(text):
+    with pytest.raises(ValueError):
+        list(loading.iter_json_array(io.StringIO(text)))
+
+
+def test_dependency_order_puts_targets_first():
+    order = loading.dependency_order([Post, Category, Location])
+    assert order.index(Category) < order.index(Post)
+    assert order.index(Location) < order.index(Post)
+
+
+def test_loads_db_json_in_small_batches(tmp_path):
+    fixture = tmp_path / "db.json.gz"
+    with open(DB_JSON, "rb") as source, gzip.open(fixture, "wb") as target:
+        shutil.copyfileobj(source, target)
+    out = io.StringIO()
+    call_command(
+        "bulk_loaddata", str(fixture), "--batch-size=5", *EXCLUDE,
+        stdout=out,
+    )
+    assert Post.objects.count() == 39
+    assert Category.objects.count() == 6
+    assert Location.objects.count() == 12
+    # Сигнал objects_loaded досчитал то, что обычно делает Post.save().
+    assert not Post.objects.filter(is_live=False).exists()
+    assert "строк/с" in out.getvalue()
+
+
+def test_whole_table_passes_run_once_per_load(monkeypatch):
+    calls = []
+    for module, name in (
+        (publication, "publish_due"),
+        (search, "rebuild_index"),
+        (counters, "recount_comment_counts"),
+        (stats, "reconcile"),
+    ):
+        monkeypatch.setattr(
+            module, name,
+            lambda name=name, **kwargs: calls.append(
+                (name, kwargs["using"])
+            ),
+        )
+
+    loading.BulkLoader(exclude=EXCLUDE[1::2]).load([str(DB_JSON)])
+
+    assert sorted(calls) == [
+        ("publish_due", "default"),
+        ("rebuild_index", "default"),
+        ("reconcile", "default"),
+        ("recount_comment_counts", "default"),
+    ]
+
+
+def test_broken_fixture_rolls_back(tmp_path):
+    fixture = tmp_path / "broken.json"
+    fixture.write_text(json.dumps([
+        {"model": "blog.location", "pk": 1, "fields": {
+            "name": "Где-то", "is_published": True,
+            "created_at": "2022-12-18T23:03:52Z",
+        }},
+        {"model": "blog.post", "pk": 1, "fields": {
+            "title": "Пост", "text": "Текст", "author": 999,
+            "pub_date": "2022-12-18T23:03:52Z", "is_published": True,
+            "created_at": "2022-12-18T23:03:52Z",
+        }},
+    ]))
+    with pytest.raises(CommandError):
+        call_command("bulk_loaddata", str(fixture), stdout=io.StringIO())
+    assert not Location.objects.exists()
@@ -0,0 +1,50 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _refresh_count(post):
+    post.refresh_from_db(fields=["comment_count"])
+    return post.comment_count
+
+
+def test_counter_follows_comments(mixer: Mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    assert _refresh_count(post) == 3
+
+    comments[0].delete()
+    assert _refresh_count(post) == 2
+
+
+def test_counter_follows_author_cascade(
+    mixer: Mixer, post_with_published_location, another_user
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post, author=another_user)
+    mixer.blend("blog.Comment", post=post)
+    another_user.delete()
+    assert _refresh_count(post) == 1
+
+
+def test_feed_query_has_no_comment_join(client, post_with_published_location):
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/")
+    sql = " ".join(q["sql"] for q in ctx.captured_queries)
+    assert "blog_comment" not in sql
+    assert "GROUP BY" not in sql
+
+
+def test_recount_command_fixes_drift(
+    mixer: Mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=40)
+
+    call_command("recount_comments", batch_size=1)
+    assert _refresh_count(post) == 2
@@ -0,0 +1,48 @@
+import pytest
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def long_thread(settings, mixer: Mixer, post_with_published_location):
+    settings.COUNT_COMMENTS_ON_PAGE = 4
+    return mixer.cycle(10).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+
+
+def test_detail_ships_first_batch_only(
+    user_client, post_with_published_location, long_thread
+):
+    response = user_client.get(f"/posts/{post_with_published_location.id}/")
+    comments = response.context["comments"]
+    assert [c.id for c in comments] == [c.id for c in long_thread[:4]]
+    assert "Показать ещё комментарии" in response.content.decode()
+
+
+def test_fragment_walks_the_rest_of_thread(
+    client, post_with_published_location, long_thread
+):
+    url = f"/posts/{post_with_published_location.id}/comments/"
+    first = client.get(f"/posts/{post_with_published_location.id}/")
+    cursor = first.context["comments"].next_cursor
+    seen = [c.id for c in first.context["comments"]]
+    while cursor:
+        response = client.get(url, {"cursor": cursor})
+        assert "<html" not in response.content.decode()
+        page = response.context["comments"]
+        seen.extend(c.id for c in page)
+        cursor = page.next_cursor
+    assert seen == [c.id for c in long_thread]
+
+
+def test_fragment_hides_unpublished_post(
+    client, post_with_published_location, long_thread
+):
+    post_with_published_location.is_published = False
+    post_with_published_location.save()
+    response = client.get(
+        f"/posts/{post_with_published_location.id}/comments/"
+    )
+    assert response.status_code == 404
@@ -0,0 +1,80 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _revalidate(client, url, response):
+    return client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+
+def test_post_detail_not_modified_until_commented(
+    mixer, client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.has_header("Last-Modified")
+
+    assert _revalidate(client, url, first).status_code == 304
+
+    mixer.blend("blog.Comment", post=post_with_published_location)
+    assert _revalidate(client, url, first).status_code == 200
+
+
+def test_not_modified_skips_rendering(
+    user_client, post_with_published_location, django_assert_max_num_queries
+):
+    url = f"/category/{post_with_published_location.category.slug}/"
+    first = user_client.get(url)
+    # Сессия и пользователь; ETag ленты — поколение из кэша.
+    with django_assert_max_num_queries(2):
+        response = _revalidate(user_client, url, first)
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_category_changes_validators(
+    user_client, post_with_published_location
+):
+    category = post_with_published_location.category
+    url = f"/category/{category.slug}/"
+    first = user_client.get(url)
+
+    category.title = "Новое название"
+    category.save()
+    assert _revalidate(user_client, url, first).status_code == 200
+
+
+def test_etag_depends_on_viewer(
+    user_client, another_user_client, post_with_published_location
+):
+    url = f"/profile/{post_with_published_location.author.username}/"
+    own = user_client.get(url)
+    assert _revalidate(user_client, url, own).status_code == 304
+    assert _revalidate(another_user_client, url, own).status_code == 200
+
+
+def test_feed_post_changes_category_and_profile(
+    mixer, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    other_category = mixer.blend("blog.Category", is_published=True)
+    location = mixer.blend("blog.Location", is_published=True)
+    urls = [
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    ]
+    pages = [user_client.get(url) for url in urls]
+
+    # Чужой пост в другой категории эти ленты не трогает.
+    mixer.blend(
+        "blog.Post", category=other_category, location=location,
+        is_published=True,
+    )
+    for url, page in zip(urls, pages):
+        assert _revalidate(user_client, url, page).status_code == 304
+
+    post.title = "Новый заголовок"
+    post.save()
+    for url, page in zip(urls, pages):
+        assert _revalidate(user_client, url, page).status_code == 200
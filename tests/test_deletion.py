@@ -0,0 +1,137 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import deletion
+from blog.models import Comment, Post, UserStats
+from core import jobs
+from core.models import Job
+
+pytestmark = [pytest.mark.django_db]
+
+User = get_user_model()
+
+
+def deletion_job():
+    return Job.objects.get(name__startswith="blog.deletion.")
+
+
+def run_queued():
+    return {
+        name: outcome for name, outcome, _ in map(
+            jobs.execute, jobs.claim(10)
+        )
+    }
+
+
+def test_delete_post_hides_it_at_once(user_client, user, mixer):
+    post = mixer.blend(Post, author=user)
+    mixer.cycle(5).blend(Comment, post=post)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.post(f"/posts/{post.pk}/delete/")
+
+    assert response.status_code == 302
+    assert not any(
+        '"blog_comment"."post_id"' in query["sql"] for query in queries
+    )
+    assert not Post.objects.filter(pk=post.pk).exists()
+    assert Post.all_objects.get(pk=post.pk).deleted_at is not None
+    assert user_client.get(f"/posts/{post.pk}/").status_code == 404
+    assert Comment.objects.filter(post_id=post.pk).count() == 5
+    assert deletion_job().name == deletion.purge_post.job_name
+
+
+def test_purge_post_in_batches_reports_progress(settings, user, mixer):
+    settings.DELETION_BATCH_SIZE = 2
+    post = mixer.blend(Post, author=user)
+    mixer.cycle(5).blend(Comment, post=post)
+    mixer.blend("blog.PostImageVariant", post=post)
+    other = mixer.blend(Comment)
+    deletion.delete_post(post)
+
+    assert set(run_queued().values()) == {jobs.SUCCEEDED}
+
+    assert not Post.all_objects.filter(pk=post.pk).exists()
+    assert list(Comment.objects.all()) == [other]
+    assert deletion_job().progress == {"done": 6, "total": 6}
+
+
+def test_delete_user_through_admin_is_batched(admin_client, user, mixer):
+    post = mixer.blend(Post, author=user)
+    mixer.cycle(3).blend(Comment, post=post)
+    mixer.cycle(2).blend(Comment, author=user)
+    kept = mixer.blend(Post)
+
+    page = admin_client.get(f"/admin/auth/user/{user.pk}/delete/")
+    assert page.status_code == 200
+    response = admin_client.post(
+        f"/admin/auth/user/{user.pk}/delete/", {"post": "yes"}
+    )
+
+    assert response.status_code == 302
+    user.refresh_from_db()
+    assert not user.is_active
+    assert not Post.objects.filter(author=user).exists()
+    assert Post.objects.filter(pk=kept.pk).exists()
+
+    assert set(run_queued().values()) == {jobs.SUCCEEDED}
+
+    assert not User.objects.filter(pk=user.pk).exists()
+    assert not Post.all_objects.filter(pk=post.pk).exists()
+    assert not Comment.objects.filter(post=post).exists()
+    assert deletion_job().progress == {"done": 7, "total": 7}
+
+
+def test_progress_extends_lock(mixer):
+    post = mixer.blend(Post)
+    deletion.delete_post(post)
+    taken, = [
+        queued for queued in jobs.claim(10)
+        if queued.name == deletion.purge_post.job_name
+    ]
+    stale = taken.locked_at - timedelta(hours=1)
+    Job.objects.filter(pk=taken.pk).update(locked_at=stale)
+
+    jobs.execute(taken)
+
+    finished = deletion_job()
+    assert finished.status == Job.DONE
+    assert finished.locked_at > stale
+
+
+def test_comment_batches_are_set_based(settings, user, mixer):
+    settings.DELETION_BATCH_SIZE = 50
+    post = mixer.blend(Post, author=user)
+    commenters = mixer.cycle(3).blend(User)
+    mixer.cycle(60).blend(Comment, post=post, author=(
+        commenters[number % 3] for number in range(60)
+    ))
+    deletion.delete_post(post)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert set(run_queued().values()) == {jobs.SUCCEEDED}
+
+    # Не по запросу на комментарий: одна пачка — горсть запросов.
+    assert len(queries) < 45
+    assert not Comment.objects.exists()
+    assert [
+        UserStats.objects.get(pk=commenter.pk).comment_count
+        for commenter in commenters
+    ] == [0, 0, 0]
+
+
+def test_purge_user_fixes_counters_of_other_posts(user, mixer):
+    other_post = mixer.blend(Post)
+    mixer.cycle(3).blend(Comment, post=other_post, author=user)
+    kept = mixer.blend(Comment, post=other_post)
+    deletion.delete_user(user)
+
+    assert set(run_queued().values()) == {jobs.SUCCEEDED}
+
+    other_post.refresh_from_db()
+    assert other_post.comment_count == 1
+    assert list(Comment.objects.all()) == [kept]
@@ -0,0 +1,124 @@
+import pytest
+from django.test import override_settings
+from mixer.backend.django import Mixer
+
+from blog import cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(params=("locmem", "filebased"))
+def feed_cache(request, tmp_path):
+    backends = {
+        "locmem": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+        "filebased": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path / "feed_cache"),
+        },
+    }
+    with override_settings(CACHES={"default": backends[request.param]}):
+        yield
+
+
+@pytest.fixture
+def two_categories_posts(
+    mixer: Mixer, user, published_category, another_category
+):
+    first = mixer.blend("blog.Post", author=user, category=published_category)
+    second = mixer.blend("blog.Post", author=user, category=another_category)
+    return first, second
+
+
+def _category_url(post):
+    return f"/category/{post.category.slug}/"
+
+
+def test_anonymous_hit_skips_database(
+    feed_cache, client, two_categories_posts, django_assert_num_queries
+):
+    first, _ = two_categories_posts
+    for url in ("/", _category_url(first)):
+        content = client.get(url).content
+        with django_assert_num_queries(0):
+            assert client.get(url).content == content
+
+
+def test_hit_keeps_headers_and_validates(
+    feed_cache, client, two_categories_posts, django_assert_num_queries
+):
+    url = _category_url(two_categories_posts[0])
+    miss = client.get(url)
+    hit = client.get(url)
+    for name in ("Content-Type", "ETag"):
+        assert hit[name] == miss[name]
+
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH=miss["ETag"])
+    assert response.status_code == 304
+
+
+def test_generation_keys_expire(settings, monkeypatch, client):
+    settings.FEED_CACHE_TIMEOUT = 60
+    timeouts = []
+    feed_cache = cache.get_feed_cache()
+    add = feed_cache.add
+
+    def recording_add(key, value, timeout=None, **kwargs):
+        timeouts.append(timeout)
+        return add(key, value, timeout, **kwargs)
+
+    monkeypatch.setattr(feed_cache, "add", recording_add)
+    assert client.get("/category/no-such-category/").status_code == 404
+    assert timeouts and set(timeouts) == {60}
+
+
+def test_comment_bumps_only_its_feeds(
+    feed_cache, mixer: Mixer, client, two_categories_posts,
+    django_assert_num_queries,
+):
+    first, second = two_categories_posts
+    for url in ("/", _category_url(first), _category_url(second)):
+        client.get(url)
+
+    mixer.blend("blog.Comment", post=first)
+
+    assert "Комментарии (1)" in client.get("/").content.decode()
+    assert "Комментарии (1)" in client.get(
+        _category_url(first)
+    ).content.decode()
+    with django_assert_num_queries(0):
+        client.get(_category_url(second))
+
+
+def test_category_change_invalidates_every_feed(
+    feed_cache, client, two_categories_posts
+):
+    first, _ = two_categories_posts
+    client.get("/")
+    first.category.title = "Переименованная категория"
+    first.category.save()
+    assert "Переименованная категория" in client.get("/").content.decode()
+
+
+def test_moving_post_updates_both_categories(
+    feed_cache, client, two_categories_posts
+):
+    first, second = two_categories_posts
+    old_url, new_url = _category_url(first), _category_url(second)
+    client.get(old_url)
+    client.get(new_url)
+
+    first.category = second.category
+    first.save()
+
+    assert first.title not in client.get(old_url).content.decode()
+    assert first.title in client.get(new_url).content.decode()
+
+
+def test_authenticated_pages_are_not_cached(
+    feed_cache, user_client, two_categories_posts
+):
+    user_client.get("/")
+    assert user_client.get("/").context is not None
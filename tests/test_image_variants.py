@@ -0,0 +1,79 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+from blog.images import generate_variants
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.POST_IMAGE_WIDTHS = (320, 640)
+
+
+@pytest.fixture
+def post_with_big_image(mixer: Mixer, user, published_category):
+    img_io = BytesIO()
+    Image.new("RGB", (1000, 500), color=(73, 109, 137)).save(
+        img_io, format="JPEG"
+    )
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        image=ImageFile(img_io, name="big.jpg"),
+    )
+
+
+def test_variants_keep_aspect_ratio(post_with_big_image):
+    variants = generate_variants(post_with_big_image.id)
+    assert sorted((v.format, v.width, v.height) for v in variants) == [
+        ("JPEG", 320, 160),
+        ("JPEG", 640, 320),
+        ("WEBP", 320, 160),
+        ("WEBP", 640, 320),
+    ]
+    for variant in variants:
+        with Image.open(variant.image.path) as image:
+            assert image.size == (variant.width, variant.height)
+            assert image.format == variant.format
+
+
+def test_new_image_replaces_stale_variants(post_with_big_image):
+    old_paths = [v.image.path for v in generate_variants(
+        post_with_big_image.id
+    )]
+    img_io = BytesIO()
+    Image.new("RGB", (200, 100)).save(img_io, format="PNG")
+    post_with_big_image.image = ImageFile(img_io, name="small.png")
+    post_with_big_image.save()
+
+    variants = generate_variants(post_with_big_image.id)
+    assert {(v.format, v.width) for v in variants} == {
+        ("JPEG", 200), ("WEBP", 200)
+    }
+    assert post_with_big_image.image_variants.count() == 2
+    assert old_paths
+
+
+def test_feed_card_renders_srcset(client, post_with_big_image):
+    generate_variants(post_with_big_image.id)
+    content = client.get("/").content.decode()
+    assert 'type="image/webp"' in content
+    assert "640w" in content
+    assert 'width="640" height="320"' in content
+
+
+@pytest.mark.django_db(transaction=True)
+def test_backfill_command_is_idempotent(post_with_big_image):
+    # Пул потоков работает через свои соединения с БД, поэтому
+    # данные теста должны быть закоммичены.
+    call_command("build_image_variants", workers=2)
+    call_command("build_image_variants", workers=2)
+    assert post_with_big_image.image_variants.count() == 4
@@ -0,0 +1,51 @@
+import pytest
+from django.db import connection
+
+from blog.pagination import KeysetPaginator
+from blog.views import get_base_request
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite",
+        reason="Разбор плана написан под EXPLAIN QUERY PLAN SQLite.",
+    ),
+]
+
+
+def _page_plan(queryset):
+    paginator = KeysetPaginator(queryset, 10)
+    return queryset.order_by(*paginator.ordering)[:11].explain()
+
+
+def _assert_uses_index(plan, index_name):
+    assert index_name in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_index_feed_uses_index(many_posts_with_published_locations):
+    plan = _page_plan(get_base_request(add_conditions=True, add_sorting=True))
+    _assert_uses_index(plan, "post_feed_idx")
+
+
+def test_category_feed_uses_index(
+    many_posts_with_published_locations, published_category
+):
+    plan = _page_plan(
+        get_base_request(add_conditions=True, add_sorting=True).filter(
+            category__slug=published_category.slug
+        )
+    )
+    _assert_uses_index(plan, "post_category_feed_idx")
+
+
+@pytest.mark.parametrize("add_conditions", (True, False))
+def test_profile_feed_uses_index(
+    many_posts_with_published_locations, user, add_conditions
+):
+    plan = _page_plan(
+        get_base_request(
+            add_conditions=add_conditions, add_sorting=True
+        ).filter(author=user)
+    )
+    _assert_uses_index(plan, "post_author_feed_idx")
@@ -0,0 +1,179 @@
+from datetime import timedelta
+
+import pytest
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core import jobs
+from core.mail import deliver_outbox, enqueue_mail
+from core.models import Job
+
+pytestmark = [pytest.mark.django_db]
+
+CALLS = []
+
+
+@jobs.job
+def remember(value):
+    CALLS.append(value)
+
+
+@jobs.job
+def explode():
+    raise ValueError("сбой")
+
+
+@jobs.job
+def halfway():
+    jobs.report_progress(1, 2)
+
+
+def not_a_job():
+    pass
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    CALLS.clear()
+
+
+def test_only_marked_functions_are_queued():
+    with pytest.raises(ValueError):
+        jobs.enqueue(not_a_job)
+
+
+def test_claim_by_priority_and_never_twice():
+    low = jobs.enqueue(remember, "low")
+    high = jobs.enqueue(remember, "high", priority=5)
+    later = jobs.enqueue(remember, "later", delay=60)
+
+    first = jobs.claim(1, "w1")
+    second = jobs.claim(5, "w2")
+
+    assert [job.pk for job in first] == [high.pk]
+    assert [job.pk for job in second] == [low.pk]
+    assert jobs.claim(5, "w3") == []
+    later.refresh_from_db()
+    assert later.status == Job.QUEUED
+    assert first[0].attempts == 1
+    assert first[0].locked_by.startswith("w1:")
+
+
+def test_success_and_retry_with_backoff(settings):
+    settings.JOBS_MAX_ATTEMPTS = 2
+    jobs.enqueue(remember, 42)
+    failing = jobs.enqueue(explode)
+
+    outcomes = {
+        name: outcome for name, outcome, _ in map(
+            jobs.execute, jobs.claim(5)
+        )
+    }
+    assert outcomes == {
+        remember.job_name: jobs.SUCCEEDED, explode.job_name: jobs.RETRIED,
+    }
+    assert CALLS == [42]
+    failing.refresh_from_db()
+    assert failing.status == Job.QUEUED
+    assert failing.run_at > timezone.now()
+    assert "ValueError: сбой" in failing.last_error
+
+    # Вторая попытка последняя.
+    _, outcome, _ = jobs.execute(
+        jobs.claim(1, now=timezone.now() + timedelta(hours=1))[0]
+    )
+    assert outcome == jobs.FAILED
+    failing.refresh_from_db()
+    assert failing.status == Job.FAILED
+    assert failing.attempts == 2
+
+
+def test_stale_running_jobs_return_to_queue(settings):
+    jobs.enqueue(remember, 1)
+    taken, = jobs.claim(1)
+    later = timezone.now() + timedelta(seconds=settings.JOBS_LOCK_TIMEOUT + 1)
+    assert jobs.release_stale(now=later) == 1
+    assert jobs.claim(1, now=later)[0].pk == taken.pk
+
+
+def test_average_run_counts_from_claim_not_progress():
+    minute_ago = timezone.now() - timedelta(minutes=1)
+    queued = jobs.enqueue(halfway)
+    Job.objects.filter(pk=queued.pk).update(run_at=minute_ago)
+
+    jobs.execute(jobs.claim(1, now=minute_ago)[0])
+
+    finished = Job.objects.get(pk=queued.pk)
+    assert finished.started_at == minute_ago < finished.locked_at
+    stats, = jobs.stats()
+    assert stats["average_run"] >= timedelta(minutes=1)
+
+
+def test_stale_worker_does_not_overwrite_new_claim(settings):
+    queued = jobs.enqueue(remember, 1)
+    slow, = jobs.claim(1, "slow")
+    later = timezone.now() + timedelta(seconds=settings.JOBS_LOCK_TIMEOUT + 1)
+    jobs.release_stale(now=later)
+    fresh, = jobs.claim(1, "fresh", now=later)
+
+    assert jobs.execute(slow)[1] == jobs.LOST
+    queued.refresh_from_db()
+    assert (queued.status, queued.locked_by) == (Job.RUNNING, fresh.locked_by)
+
+    assert jobs.execute(fresh)[1] == jobs.SUCCEEDED
+    assert CALLS == [1, 1]
+
+
+def test_unique_enqueue_is_backed_by_index():
+    first = jobs.enqueue(remember, "один", unique=True)
+    assert jobs.enqueue(remember, "один", unique=True).pk == first.pk
+    with pytest.raises(IntegrityError):
+        with transaction.atomic():
+            Job.objects.create(
+                name=first.name, args=first.args, run_at=first.run_at,
+                max_attempts=1, unique_key=first.unique_key,
+            )
+
+    jobs.claim(1)
+    assert jobs.enqueue(remember, "один", unique=True).pk != first.pk
+
+
+def test_concurrent_unique_enqueue_returns_existing(monkeypatch):
+    first = jobs.enqueue(remember, "гонка", unique=True)
+    waiting = jobs._waiting
+    # Второй вызов не увидел строку первого, пока тот не закоммитил.
+    lookups = iter([None])
+    monkeypatch.setattr(
+        jobs, "_waiting", lambda key: next(lookups, None) or waiting(key)
+    )
+    assert jobs.enqueue(remember, "гонка", unique=True).pk == first.pk
+    assert Job.objects.filter(name=first.name).count() == 1
+
+
+def test_outbox_delivery_is_one_queued_job(settings, mailoutbox):
+    settings.MAIL_OUTBOX_BACKGROUND = True
+    for number in range(3):
+        enqueue_mail(f"Письмо {number}", "Текст", "a@b.c", ["d@e.f"])
+    queued = Job.objects.get()
+    assert queued.name == deliver_outbox.job_name
+
+    jobs.execute(jobs.claim(1)[0])
+    assert len(mailoutbox) == 3
+    stats, = jobs.stats()
+    assert stats["done"] == 1 and stats["queued"] == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_runs_queue_until_empty():
+    for value in range(6):
+        jobs.enqueue(remember, value)
+    jobs.enqueue(explode, max_attempts=1)
+
+    worker = jobs.Worker(workers=3, poll_interval=0.01)
+    worker.run(until_empty=True)
+
+    assert sorted(CALLS) == list(range(6))
+    assert dict(
+        (name, (done, failed))
+        for name, done, _, failed, _, _, _ in worker.metrics.rows()
+    ) == {remember.job_name: (6, 0), explode.job_name: (0, 1)}
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.mail import deliver_outbox, drain, enqueue_mail, send_pending
+from core.models import Job, OutgoingMail
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _post_comment(client, post, text):
+    return client.post(f"/posts/{post.id}/comment/", {"text": text})
+
+
+def test_one_word_comment_only_enqueues(
+    user_client, post_with_published_location
+):
+    _post_comment(user_client, post_with_published_location, "Спам")
+    assert len(mail.outbox) == 0
+    assert OutgoingMail.objects.filter(sent_at__isnull=True).count() == 1
+
+
+def test_alerts_for_same_author_are_coalesced(
+    user_client, another_user_client, post_with_published_location
+):
+    for text in ("Раз", "Два", "Три"):
+        _post_comment(user_client, post_with_published_location, text)
+    _post_comment(another_user_client, post_with_published_location, "Ещё")
+
+    assert OutgoingMail.objects.count() == 2
+    assert sorted(
+        OutgoingMail.objects.values_list("repeat_count", flat=True)
+    ) == [1, 3]
+
+    call_command("drain_outbox")
+    assert len(mail.outbox) == 2
+    assert any("Повторов за период: 3" in m.body for m in mail.outbox)
+    assert not OutgoingMail.objects.filter(sent_at__isnull=True).exists()
+
+
+def test_sent_mail_is_not_coalesced():
+    first = enqueue_mail("Тема", "Раз", "a@acme.not", ["b@acme.not"], "key")
+    send_pending()
+    second = enqueue_mail("Тема", "Два", "a@acme.not", ["b@acme.not"], "key")
+
+    assert second.pk != first.pk
+    first.refresh_from_db()
+    assert first.repeat_count == 1
+    assert send_pending() == (1, 0)
+
+
+def test_send_pending_respects_batch_size():
+    for number in range(5):
+        enqueue_mail("Тема", f"Письмо {number}", "a@acme.not", ["b@acme.not"])
+    assert send_pending(batch_size=2) == (2, 0)
+    assert send_pending(batch_size=10) == (3, 0)
+    assert send_pending() == (0, 0)
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError("SMTP недоступен")
+
+
+def test_failed_mail_is_retried_later(settings):
+    enqueue_mail("Тема", "Текст", "a@acme.not", ["b@acme.not"])
+    settings.EMAIL_BACKEND = "test_mail_outbox.FailingBackend"
+    assert send_pending() == (0, 1)
+    failed = OutgoingMail.objects.get()
+    assert failed.attempts == 1
+    assert "SMTP недоступен" in failed.last_error
+
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    assert failed.next_attempt_at > timezone.now()
+    assert send_pending() == (0, 0)
+    assert send_pending(now=failed.next_attempt_at) == (1, 0)
+
+
+def test_claimed_mail_is_not_sent_twice(settings):
+    enqueue_mail("Тема", "Текст", "a@acme.not", ["b@acme.not"])
+    OutgoingMail.objects.update(claimed_by="other", locked_at=timezone.now())
+    assert send_pending() == (0, 0)
+
+    stale = timezone.now() + timedelta(
+        seconds=settings.MAIL_OUTBOX_LOCK_TIMEOUT + 1
+    )
+    assert send_pending(now=stale) == (1, 0)
+    assert len(mail.outbox) == 1
+
+
+class FirstFailsBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        if email_messages[0].body == "Сбой":
+            raise ConnectionError("Адрес отклонён")
+        return len(email_messages)
+
+
+def test_failing_head_does_not_block_drain(settings):
+    settings.EMAIL_BACKEND = "test_mail_outbox.FirstFailsBackend"
+    enqueue_mail("Тема", "Сбой", "a@acme.not", ["b@acme.not"])
+    for number in range(3):
+        enqueue_mail("Тема", f"Письмо {number}", "a@acme.not", ["b@acme.not"])
+    assert drain(batch_size=1) == 3
+    assert OutgoingMail.objects.filter(sent_at__isnull=True).count() == 1
+
+
+def test_deliver_outbox_reschedules_retry(settings):
+    settings.EMAIL_BACKEND = "test_mail_outbox.FailingBackend"
+    enqueue_mail("Тема", "Текст", "a@acme.not", ["b@acme.not"])
+    deliver_outbox()
+    retry = Job.objects.get(name=deliver_outbox.job_name, args=[True])
+    next_attempt_at = OutgoingMail.objects.get().next_attempt_at
+    assert abs(retry.run_at - next_attempt_at) < timedelta(seconds=1)
@@ -0,0 +1,109 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import cache, moderation
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def run_action(client, model, action, objects, **data):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(f"/admin/blog/{model}/", {
+            "action": action,
+            "_selected_action": [obj.pk for obj in objects],
+            **data,
+        }, follow=True)
+    assert response.status_code == 200
+    return response, queries
+
+
+def writes(queries):
+    """Записи в посты и комментарии; сводки UserStats не в счёт."""
+    return [
+        query["sql"] for query in queries
+        if query["sql"].startswith(("UPDATE", "DELETE"))
+        and '"blog_userstats"' not in query["sql"]
+    ]
+
+
+def test_unpublish_is_one_update(admin_client, mixer):
+    posts = mixer.cycle(5).blend(Post, is_published=True)
+    generation, = cache.get_generations([cache.BASE_SCOPE])
+
+    response, queries = run_action(admin_client, "post", "unpublish", posts)
+
+    assert len(writes(queries)) == 1
+    assert not Post.objects.filter(is_published=True).exists()
+    assert "Снято с публикации постов: 5." in response.content.decode()
+    assert cache.get_generations([cache.BASE_SCOPE]) != [generation]
+
+
+def test_move_to_category(admin_client, mixer):
+    posts = mixer.cycle(3).blend(Post)
+    category = mixer.blend("blog.Category")
+
+    response, queries = run_action(
+        admin_client, "post", "move_to_category", posts,
+        category=category.pk,
+    )
+
+    assert len(writes(queries)) == 1
+    assert Post.objects.filter(category=category).count() == 3
+
+    response, _ = run_action(admin_client, "post", "move_to_category", posts)
+    assert "Выберите категорию" in response.content.decode()
+
+
+def test_purge_author_comments_keeps_counters(admin_client, mixer, user):
+    post = mixer.blend(Post)
+    spam = mixer.cycle(4).blend(Comment, post=post, author=user)
+    kept = mixer.blend(Comment, post=post)
+
+    response, queries = run_action(
+        admin_client, "comment", "purge_authors_comments", spam[:1]
+    )
+
+    assert len(writes(queries)) == 2
+    assert list(Comment.objects.all()) == [kept]
+    post.refresh_from_db()
+    assert post.comment_count == 1
+    assert "Удалено комментариев: 4." in response.content.decode()
+
+
+def test_purge_deletes_by_id_in_batches(settings, mixer, user):
+    settings.DELETION_BATCH_SIZE = 2
+    posts = mixer.cycle(2).blend(Post)
+    mixer.cycle(5).blend(Comment, post=(posts[n % 2] for n in range(5)),
+                         author=user)
+
+    with CaptureQueriesContext(connection) as queries:
+        purged = moderation.purge_comments_by_authors(
+            get_user_model().objects.filter(pk=user.pk)
+        )
+
+    assert purged == 5
+    deletes = [q for q in writes(queries) if q.startswith("DELETE")]
+    assert len(deletes) == 3
+    # MySQL не удаляет из таблицы с подзапросом к ней же.
+    assert not any("SELECT" in sql for sql in deletes)
+    assert [
+        post.comment_count for post in Post.objects.order_by("pk")
+    ] == [0, 0]
+    assert user.stats.comment_count == 0
+
+
+def test_unpublish_location(admin_client, mixer):
+    location = mixer.blend("blog.Location")
+    mixer.cycle(3).blend(Post, location=location, is_published=True)
+    other = mixer.blend(Post, is_published=True)
+
+    with CaptureQueriesContext(connection) as queries:
+        admin_client.post("/admin/blog/location/", {
+            "action": "unpublish_posts", "_selected_action": [location.pk],
+        })
+
+    assert len(writes(queries)) == 1
+    assert list(Post.objects.filter(is_published=True)) == [other]
@@ -0,0 +1,34 @@
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+
+def _render(page_number, num_pages=10_000, query="q=слово"):
+    paginator = Paginator(range(num_pages), 1)
+    request = RequestFactory().get(f"/search/?{query}")
+    return render_to_string(
+        "includes/paginator.html",
+        {"page_obj": paginator.page(page_number)},
+        request=request,
+    )
+
+
+def test_window_size_does_not_grow_with_page_count():
+    small = _render(500, num_pages=1000).count("<li")
+    large = _render(5000).count("<li")
+    assert small == large
+    assert large < 20
+
+
+def test_window_keeps_ends_and_neighbours():
+    html = _render(5000)
+    for number in (1, 4998, 4999, 5000, 5001, 5002, 10_000):
+        assert f">{number}</" in html
+    assert ">2500</" not in html
+    assert "…" in html
+
+
+def test_links_keep_other_query_params():
+    html = _render(2)
+    assert "page=3" in html
+    assert "q=%D1%81%D0%BB%D0%BE%D0%B2%D0%BE" in html
@@ -0,0 +1,105 @@
+import base64
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    # Половина публикаций с одинаковым pub_date: порядок внутри
+    # такой группы должен определяться id.
+    now = timezone.now()
+    dates = (
+        now - timedelta(minutes=i // 2)
+        for i in range(N_PER_PAGE * 2 + 5)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=dates,
+    )
+
+
+def _walk(client, url, cursor_attr):
+    seen, pages = [], 0
+    response = client.get(url)
+    while True:
+        page_obj = response.context["page_obj"]
+        seen.extend(post.id for post in page_obj)
+        pages += 1
+        cursor = getattr(page_obj, cursor_attr)
+        if cursor is None:
+            return seen, pages
+        response = client.get(url, {"cursor": cursor})
+
+
+def test_cursor_walk_covers_feed_once(client, feed_posts):
+    expected = [
+        post.id for post in sorted(
+            feed_posts, key=lambda p: (p.pub_date, p.id), reverse=True
+        )
+    ]
+    seen, pages = _walk(client, "/", "next_cursor")
+    assert seen == expected
+    assert pages == 3
+
+
+def test_backward_walk_from_last_page(client, feed_posts):
+    response = client.get("/")
+    last_cursor = response.context["page_obj"].last_cursor
+    response = client.get("/", {"cursor": last_cursor})
+    last_page = response.context["page_obj"]
+    assert not last_page.has_next()
+    assert len(last_page) == N_PER_PAGE
+
+    seen = list(post.id for post in last_page)
+    while last_page.has_previous():
+        response = client.get("/", {"cursor": last_page.previous_cursor})
+        last_page = response.context["page_obj"]
+        seen = [post.id for post in last_page] + seen
+    assert len(seen) == len(feed_posts)
+    assert len(set(seen)) == len(feed_posts)
+
+
+def test_feed_never_counts_or_offsets(client, feed_posts):
+    first = client.get("/").context["page_obj"]
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/", {"cursor": first.next_cursor})
+    sql = " ".join(q["sql"].upper() for q in ctx.captured_queries)
+    assert "COUNT(*)" not in sql
+    assert "OFFSET" not in sql
+
+
+def test_broken_cursor_falls_back_to_first_page(client, feed_posts):
+    response = client.get("/", {"cursor": "не-курсор"})
+    assert response.status_code == 200
+    assert not response.context["page_obj"].has_previous()
+
+
+@pytest.mark.parametrize("payload", [
+    '["n", 5]',
+    '["n", [[1], 2]]',
+    '["n", [null, null]]',
+    '["n", [{"a": 1}, 2]]',
+    '["n", ["", 2]]',
+    '["n", ["2024-01-01T00:00:00", "x"]]',
+    '["p", [1, 2, 3]]',
+    '[["n"], null]',
+])
+def test_malformed_cursor_falls_back_to_first_page(
+    client, feed_posts, payload
+):
+    cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+    for url in ("/", f"/profile/{feed_posts[0].author.username}/"):
+        response = client.get(url, {"cursor": cursor})
+        assert response.status_code == 200
+        assert not response.context["page_obj"].has_previous()
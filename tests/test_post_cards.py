@@ -0,0 +1,40 @@
+import pytest
+from django.contrib.auth import get_user_model
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_cards_are_reused_until_post_changes(
+    user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.title in user_client.get("/").content.decode()
+
+    # update() не ставит отметку — карточка берётся из кэша.
+    Post.objects.filter(pk=post.pk).update(title="Тихая правка")
+    assert "Тихая правка" not in user_client.get("/").content.decode()
+
+    post.refresh_from_db()
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок" in user_client.get("/").content.decode()
+
+
+@pytest.mark.parametrize("change", ("category", "author"))
+def test_cards_follow_related_objects(
+    change, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get("/")
+    if change == "category":
+        post.category.title = "Переименованная"
+        post.category.save()
+        expected = "Переименованная"
+    else:
+        get_user_model().objects.filter(pk=post.author_id).update(
+            username="renamed_author"
+        )
+        expected = "@renamed_author"
+    assert expected in user_client.get("/").content.decode()
@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog import publication
+from blog.publication import PublicationScheduler, publish_due
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+def _make_due(post):
+    # Время «наступило»: сдвигаем дату в обход save(), как если бы
+    # час прошёл, а is_live ещё никто не переключил.
+    type(post).objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+
+
+def test_save_materializes_visibility(scheduled_post):
+    assert not scheduled_post.is_live
+    scheduled_post.pub_date = timezone.now()
+    scheduled_post.save(update_fields=["pub_date"])
+    scheduled_post.refresh_from_db()
+    assert scheduled_post.is_live
+
+
+def test_publish_due_opens_post_and_drops_cached_feed(client, scheduled_post):
+    assert scheduled_post.title not in client.get("/").content.decode()
+    _make_due(scheduled_post)
+    # Страница закэширована и фильтр не зависит от now().
+    assert scheduled_post.title not in client.get("/").content.decode()
+
+    assert publish_due() == 1
+    assert scheduled_post.title in client.get("/").content.decode()
+    assert publish_due() == 0
+
+
+def test_requests_open_due_posts_without_scheduler(
+    client, settings, monkeypatch, scheduled_post
+):
+    settings.PUBLICATION_ON_REQUEST = True
+    monkeypatch.setattr(publication, "due_check", publication.DueCheck())
+    assert scheduled_post.title not in client.get("/").content.decode()
+
+    # Срок наступил: запрос сам открывает пост, не дожидаясь интервала.
+    publication.due_check.expect(timezone.now())
+    _make_due(scheduled_post)
+    assert scheduled_post.title in client.get("/").content.decode()
+    scheduled_post.refresh_from_db()
+    assert scheduled_post.is_live
+
+
+def test_command_publishes_due_posts(scheduled_post):
+    _make_due(scheduled_post)
+    call_command("publish_scheduled")
+    scheduled_post.refresh_from_db()
+    assert scheduled_post.is_live
+
+
+def test_scheduler_sleeps_until_next_publication(scheduled_post):
+    scheduler = PublicationScheduler(max_sleep=24 * 60 * 60)
+    sleep = scheduler.run_once()
+    assert 0 < sleep <= timedelta(hours=1).total_seconds()
+
+    scheduler = PublicationScheduler(max_sleep=30)
+    assert scheduler.run_once() == 30
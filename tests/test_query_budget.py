@@ -0,0 +1,76 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from core import metrics
+from core.middleware import QueryBudgetExceeded
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def empty_buffer():
+    metrics.clear()
+    yield
+    metrics.clear()
+
+
+def test_samples_are_grouped_by_url_name(client, post_with_published_location):
+    client.get("/")
+    client.get("/")
+    client.get(f"/posts/{post_with_published_location.id}/")
+
+    report = metrics.report()
+    assert report["blog:index"]["requests"] == 2
+    assert report["blog:post_detail"]["requests"] == 1
+    detail = report["blog:post_detail"]
+    assert detail["queries_max"] > 0
+    assert detail["template_time_avg"] > 0
+    assert detail["response_size_avg"] > 0
+
+
+def test_budget_overrun_raises(settings, client):
+    settings.QUERY_BUDGETS = {"blog:index": 0}
+    with pytest.raises(QueryBudgetExceeded):
+        client.get("/")
+
+
+def test_budget_overrun_logs(settings, client, caplog):
+    settings.QUERY_BUDGETS = {"blog:index": 0}
+    settings.QUERY_BUDGET_ACTION = "log"
+    assert client.get("/").status_code == 200
+    assert "blog:index" in caplog.text
+
+
+def test_report_endpoint_is_staff_only(client, admin_client):
+    assert client.get("/admin/query-report/").status_code == 302
+    admin_client.get("/")
+    response = admin_client.get("/admin/query-report/")
+    assert response.status_code == 200
+    assert "blog:index" in response.json()
+
+
+def test_command_reads_snapshot(settings, tmp_path, client, capsys):
+    snapshot = tmp_path / "metrics.json"
+    settings.QUERY_METRICS_SNAPSHOT_PATH = snapshot
+    settings.QUERY_METRICS_SNAPSHOT_EVERY = 1
+    client.get("/")
+    metrics.snapshot_writer.join()
+
+    assert [path.name for path in tmp_path.iterdir()] == [
+        metrics.process_snapshot_path(snapshot).name
+    ]
+    call_command("query_report", "--json")
+    assert '"blog:index"' in capsys.readouterr().out
+
+
+def test_snapshots_of_processes_are_merged(tmp_path):
+    snapshot = tmp_path / "metrics.json"
+    sample = metrics.RequestSample("blog:index", 200, 3, 0.1, 0.1, 0.2, 10)
+    metrics.save_snapshot(snapshot, [sample])
+    other = tmp_path / "metrics.999999999.json"
+    other.write_text(json.dumps([sample._asdict()]), encoding="utf-8")
+    (tmp_path / "metrics.999999999.json.tmp").write_text("[", encoding="utf-8")
+
+    assert metrics.load_snapshot(snapshot) == [sample, sample]
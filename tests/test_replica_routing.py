@@ -0,0 +1,130 @@
+import sqlite3
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+
+from core import routers
+from core.routers import PrimaryReplicaRouter
+
+pytestmark = [
+    pytest.mark.django_db(transaction=True, databases=["default", "replica"]),
+]
+
+
+class SqlLog:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+    def touched(self, table):
+        return any(f'"{table}"' in sql for sql in self.statements)
+
+
+@pytest.fixture
+def replicas(settings, monkeypatch):
+    settings.DATABASE_REPLICAS = ["replica"]
+    monkeypatch.setattr(routers, "replica_lag", lambda alias: 0)
+
+
+def request_logs(client, method, url, data=None):
+    primary, replica = SqlLog(), SqlLog()
+    with connections["default"].execute_wrapper(primary):
+        with connections["replica"].execute_wrapper(replica):
+            response = getattr(client, method)(url, data or {})
+    return response, primary, replica
+
+
+def test_feed_reads_go_to_replica(
+    replicas, user_client, post_with_published_location
+):
+    response, primary, replica = request_logs(user_client, "get", "/")
+    assert response.status_code == 200
+    assert replica.touched("blog_post")
+    assert not primary.touched("blog_post")
+
+
+def test_cached_pages_and_validators_read_primary(
+    replicas, client, post_with_published_location
+):
+    # Аноним: страница ляжет в кэш ленты.
+    _, primary, replica = request_logs(client, "get", "/")
+    assert primary.touched("blog_post")
+    assert not replica.statements
+
+    # Валидаторы ETag — с основной БД, сама страница — с реплики.
+    url = f"/posts/{post_with_published_location.id}/"
+    _, primary, replica = request_logs(client, "get", url)
+    assert primary.touched("blog_post")
+    assert replica.touched("blog_post")
+
+
+def test_stale_replica_is_not_read(
+    settings, monkeypatch, user_client, post_with_published_location
+):
+    settings.DATABASE_REPLICAS = ["replica"]
+    lag = settings.DATABASE_REPLICA_MAX_LAG + 1
+    monkeypatch.setattr(routers, "replica_lag", lambda alias: lag)
+    _, primary, replica = request_logs(user_client, "get", "/")
+    assert primary.touched("blog_post")
+    assert not replica.statements
+
+    monkeypatch.setattr(routers, "replica_lag", lambda alias: None)
+    _, _, replica = request_logs(user_client, "get", "/")
+    assert not replica.statements
+
+
+def test_other_views_read_primary(
+    replicas, client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/comments/"
+    _, primary, replica = request_logs(client, "get", url)
+    assert primary.touched("blog_post")
+    assert not replica.statements
+
+
+def test_user_reads_primary_after_own_write(
+    replicas, user_client, post_with_published_location, settings
+):
+    post_id = post_with_published_location.id
+    _, _, replica = request_logs(user_client, "get", f"/posts/{post_id}/")
+    assert replica.touched("blog_post")
+
+    response, _, _ = request_logs(
+        user_client, "post", f"/posts/{post_id}/comment/",
+        {"text": "Свежий комментарий"},
+    )
+    pin = response.cookies[settings.DATABASE_PRIMARY_PIN_COOKIE]
+    assert pin["max-age"] == settings.DATABASE_PRIMARY_PIN_SECONDS
+
+    _, primary, replica = request_logs(user_client, "get", f"/posts/{post_id}/")
+    assert primary.touched("blog_comment")
+    assert not replica.statements
+
+
+def test_replicas_are_not_migrated():
+    router = PrimaryReplicaRouter()
+    assert router.allow_migrate("default", "blog") is True
+    assert router.allow_migrate("replica", "blog") is False
+
+
+def test_sync_replica_copies_primary(
+    monkeypatch, tmp_path, post_with_published_location
+):
+    path = tmp_path / "replica.sqlite3"
+    replica = connections["replica"]
+    monkeypatch.setattr(
+        replica, "settings_dict", {**replica.settings_dict, "NAME": path}
+    )
+    call_command("sync_replica", stdout=StringIO())
+    copy = sqlite3.connect(path)
+    try:
+        ids = copy.execute("SELECT id FROM blog_post").fetchall()
+    finally:
+        copy.close()
+    assert ids == [(post_with_published_location.id,)]
+    assert 0 <= routers.replica_lag("replica") < 5
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from blog.models import Post
+from blog.search import fts5_query, search_posts
+from blog.views import get_base_request
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(title, text="Обычный текст", **fields):
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            title=title, text=text, **fields,
+        )
+    return make
+
+
+def found(query):
+    return list(search_posts(get_base_request(add_conditions=True), query))
+
+
+def test_title_match_ranks_above_text_match(make_post):
+    in_text = make_post("Про погоду", "Вчера гуляли по набережной")
+    in_title = make_post("Набережная вечером")
+    make_post("Совсем другое")
+    assert found("набережн") == [in_title, in_text]
+
+
+def test_hidden_posts_are_not_found(make_post):
+    visible = make_post("Маяк")
+    make_post("Маяк скрытый", is_published=False)
+    make_post("Маяк будущий", pub_date=timezone.now() + timedelta(days=1))
+    assert found("маяк") == [visible]
+
+
+def test_index_follows_edits_and_deletes(make_post):
+    post = make_post("Старый заголовок")
+    post.title = "Новый заголовок"
+    post.save()
+    assert found("старый") == []
+    assert found("новый") == [post]
+    post.delete()
+    assert found("новый") == []
+
+
+def test_query_syntax_is_not_passed_through(make_post):
+    make_post("Кофе")
+    assert fts5_query('кофе" OR (*') == '"кофе"* "OR"*'
+    assert found('кофе" (') == found("кофе")
+    assert found("  ") == []
+
+
+def test_rebuild_restores_index(make_post):
+    post = make_post("Восстановление")
+    hidden = make_post("Удаляется в фоне")
+    Post.all_objects.filter(pk=hidden.pk).update(deleted_at=timezone.now())
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM blog_post_search")
+    assert found("восстановление") == []
+    out = StringIO()
+    call_command("rebuild_search_index", "--batch-size", "1", stdout=out)
+    assert found("восстановление") == [post]
+    assert "Проиндексировано постов: 2" in out.getvalue()
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="План SQLite.")
+def test_search_starts_from_inverted_index(make_post):
+    make_post("Маршрут")
+    plan = search_posts(
+        get_base_request(add_conditions=True), "маршрут"
+    ).explain()
+    first_step = plan.splitlines()[0]
+    assert "blog_post_search VIRTUAL TABLE" in first_step, plan
+
+
+def test_search_view_paginates(client, make_post, settings):
+    for number in range(settings.COUNT_OBJECT_ON_PAGE + 2):
+        make_post(f"Путешествие {number}")
+    response = client.get("/search/", {"q": "путешествие"})
+    assert response.status_code == 200
+    page_obj = response.context["page_obj"]
+    assert page_obj.paginator.count == settings.COUNT_OBJECT_ON_PAGE + 2
+    assert len(page_obj) == settings.COUNT_OBJECT_ON_PAGE
+    second = client.get("/search/", {"q": "путешествие", "page": 2})
+    assert len(second.context["page_obj"]) == 2
+    assert "page=2" in response.content.decode()
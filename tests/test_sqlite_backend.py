@@ -0,0 +1,51 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+
+from benchmarks import sqlite_load
+from core.backends.sqlite3.base import DEFAULT_PRAGMAS, pragma_statements
+
+pytestmark = [
+    pytest.mark.skipif(
+        connection.vendor != "sqlite", reason="Только для SQLite."
+    ),
+]
+
+
+@pytest.mark.django_db
+def test_connection_gets_configured_pragmas():
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone()[0] == DEFAULT_PRAGMAS["busy_timeout"]
+        cursor.execute("PRAGMA temp_store")
+        assert cursor.fetchone()[0] == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_atomic_begins_immediate():
+    executed = []
+
+    def remember(execute, sql, params, many, context):
+        executed.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(remember):
+        with transaction.atomic():
+            pass
+    assert executed[0] == f"BEGIN {connection.transaction_mode}"
+
+
+def test_pragmas_are_validated():
+    assert pragma_statements({"cache_size": -2000, "mmap_size": None}) == [
+        "PRAGMA cache_size = -2000"
+    ]
+    with pytest.raises(ImproperlyConfigured):
+        pragma_statements({"journal_mode": "WAL; DROP TABLE blog_post"})
+
+
+def test_tuned_mode_has_no_lock_errors():
+    report = sqlite_load.run(readers=2, writers=2, seconds=0.3)
+    tuned = report["tuned"]
+    assert tuned["writes"]["errors"] == 0
+    assert tuned["writes"]["ops_per_second"] > 0
+    assert tuned["reads"]["ops_per_second"] > 0
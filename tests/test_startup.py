@@ -0,0 +1,41 @@
+from benchmarks import startup
+
+LOG = """\
+import time: self [us] | cumulative | imported package
+import time:       150 |        150 |   _io
+import time:      2000 |       2500 |   django.contrib.admin.sites
+import time:      1200 |       4700 | blog.models
+"""
+
+
+def test_importtime_log_is_grouped_by_app():
+    modules = startup.parse_importtime(LOG)
+    assert modules == [
+        ("_io", 0.15, 0.15),
+        ("django.contrib.admin.sites", 2.0, 2.5),
+        ("blog.models", 1.2, 4.7),
+    ]
+    assert [startup.import_group(name) for name, _, _ in modules] == [
+        startup.STDLIB, "django.contrib.admin", "blog",
+    ]
+
+
+def test_compare_ignores_noise_and_reports_growth():
+    baseline = {"phases": {"wsgi": 100.0, "urlconf": 2.0}, "ready": {}}
+    report = {
+        "phases": {"wsgi": 130.0, "urlconf": 4.0},
+        "ready": {"blog": 3.0},
+        "imports": {},
+    }
+    assert startup.compare(report, baseline) == [
+        "phases/wsgi: 130.0 мс > 100.0 мс"
+    ]
+
+
+def test_probe_measures_real_startup():
+    report = startup.run(repeat=1, top=3)
+    assert list(report["phases"])[:2] == ["setup", "wsgi"]
+    assert report["phases"]["setup"] < report["phases"]["wsgi"]
+    assert "blog" in report["ready"]
+    assert len(report["slowest_imports"]) == 3
+    assert startup.STDLIB in report["imports"]
@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import moderation, stats
+from blog.models import Comment, Post, UserStats
+
+pytestmark = [pytest.mark.django_db]
+
+
+def stats_of(user):
+    return UserStats.objects.get(pk=user.pk)
+
+
+def test_signals_keep_stats(mixer, user):
+    travel, food = mixer.cycle(2).blend("blog.Category", is_published=True)
+    now = timezone.now()
+    first = mixer.blend(
+        Post, author=user, category=travel, pub_date=now - timedelta(days=9)
+    )
+    mixer.blend(
+        Post, author=user, category=travel, pub_date=now - timedelta(days=1)
+    )
+    last = mixer.blend(Post, author=user, category=food, pub_date=now)
+    mixer.blend(Post, author=user, category=food, is_published=False)
+    comments = mixer.cycle(2).blend(Comment, author=user)
+
+    row = stats_of(user)
+    assert row.post_count == 3
+    assert row.comment_count == 2
+    assert row.first_post_at == first.pub_date
+    assert row.last_post_at == last.pub_date
+    assert [category["slug"] for category in row.top_categories] == [
+        travel.slug, food.slug,
+    ]
+
+    comments[0].delete()
+    first.delete()
+    row = stats_of(user)
+    assert row.comment_count == 1
+    assert row.post_count == 2
+
+
+def test_post_edits_adjust_stats_without_aggregates(mixer, user):
+    category = mixer.blend("blog.Category", is_published=True)
+    now = timezone.now()
+    mixer.blend(
+        Post, author=user, category=category, pub_date=now - timedelta(days=2)
+    )
+    post = mixer.blend(
+        Post, author=user, category=category, pub_date=now - timedelta(days=1)
+    )
+    middle = mixer.blend(
+        Post, author=user, category=category, pub_date=now - timedelta(days=3),
+        is_published=False,
+    )
+
+    with CaptureQueriesContext(connection) as queries:
+        post.title = "Правка без смены видимости"
+        post.save()
+        middle.pub_date = now - timedelta(hours=36)
+        middle.is_published = True
+        middle.save()
+    assert not any("COUNT(" in query["sql"] for query in queries)
+    row = stats_of(user)
+    assert row.post_count == 3
+    assert row.top_categories[0]["count"] == 3
+
+    # Ушёл последний пост: крайние даты пересчитываются.
+    post.delete()
+    row = stats_of(user)
+    assert row.post_count == 2
+    assert row.last_post_at == middle.pub_date
+
+
+def test_moderation_refreshes_stats(mixer, user):
+    category = mixer.blend("blog.Category", is_published=True)
+    mixer.cycle(2).blend(Post, author=user, category=category)
+    mixer.cycle(3).blend(Comment, author=user)
+
+    moderation.set_published(Post.objects.filter(author=user), False)
+    moderation.purge_comments_by_authors(
+        get_user_model().objects.filter(pk=user.pk)
+    )
+
+    row = stats_of(user)
+    assert (row.post_count, row.comment_count) == (0, 0)
+
+
+def test_profile_reads_stats_by_primary_key(client, mixer, user):
+    mixer.cycle(2).blend(Comment, author=user)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f"/profile/{user.username}/")
+
+    stats_queries = [
+        query["sql"] for query in queries
+        if '"blog_userstats"' in query["sql"]
+    ]
+    assert len(stats_queries) == 2  # ETag профиля и сама строка
+    assert 'WHERE "blog_userstats"."user_id" =' in stats_queries[-1]
+    assert "Комментариев: 2" in response.content.decode()
+
+
+def test_reconcile_fixes_bulk_edits(mixer, user):
+    post = mixer.blend(
+        Post, author=user, category__is_published=True, is_published=True
+    )
+    Post.objects.filter(pk=post.pk).update(is_published=False)
+    UserStats.objects.filter(pk=user.pk).update(comment_count=7)
+
+    assert stats.reconcile() >= 1
+    row = stats_of(user)
+    assert (row.post_count, row.comment_count) == (0, 0)
+
+    call_command("reconcile_user_stats", "--batch-size", "1")
+    assert stats.reconcile() == 0